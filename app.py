@@ -1,44 +1,860 @@
-from flask import Flask, request, jsonify, render_template, redirect, session, send_file, abort
+from flask import Flask, request, jsonify, render_template, redirect, session, send_file, send_from_directory, abort, Response, g, has_request_context, stream_with_context, url_for
 import os
 from flask_cors import CORS
-from datetime import datetime
+from datetime import datetime, timezone
+from decimal import Decimal
 import re
-import pandas as pd
-from io import BytesIO
+import io
+import base64
+import csv
+import zlib
+import json
+import hashlib
+import time
+import threading
+import bisect
+import heapq
+import unicodedata
+import tempfile
+import atexit
+import glob
+import mimetypes
+import fcntl
+from contextlib import contextmanager
+from collections import OrderedDict, deque
 import sqlite3
+import click
 
 app = Flask(__name__, template_folder='templates', static_folder='static')
 app.secret_key = 'your_secret_key_here'
 CORS(app, supports_credentials=True)  # ✅ allow cookies across requests
 
+# ✅ Fingerprinted static assets (built by build_assets.py)
+# Templates link assets through asset_url(): the content-hashed copy under
+# /assets/ when static/dist/manifest.json lists it, otherwise plain /static/.
+# Hashed names never change content, so they are cached for a year as immutable
+# and served as the prebuilt .br/.gz variant the client accepts.
+ASSET_DIR = os.path.join(app.static_folder, 'dist')
+ASSET_MAX_AGE = 365 * 24 * 3600
+ASSET_ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+def load_asset_manifest():
+    try:
+        with open(os.path.join(ASSET_DIR, 'manifest.json'), encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except ValueError as e:
+        print(f"⚠️ Ignoring unreadable asset manifest: {e}")
+        return {}
+
+asset_manifest = load_asset_manifest()
+hashed_assets = set(asset_manifest.values())
+
+@app.template_global()
+def asset_url(filename):
+    hashed = asset_manifest.get(filename)
+    if hashed is None:
+        return url_for('static', filename=filename)
+    return url_for('hashed_asset', filename=hashed)
+
+@app.route('/assets/<path:filename>')
+def hashed_asset(filename):
+    if filename not in hashed_assets:
+        abort(404)
+    mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+    served, encoding = filename, None
+    for name, suffix in ASSET_ENCODINGS:
+        if request.accept_encodings[name] and os.path.exists(os.path.join(ASSET_DIR, filename + suffix)):
+            served, encoding = filename + suffix, name
+            break
+    response = send_from_directory(ASSET_DIR, served, mimetype=mimetype, max_age=ASSET_MAX_AGE)
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
+
+# ✅ Response compression (br / zstd / gzip, negotiated by Accept-Encoding)
+# Text responses of at least COMPRESS_MIN_SIZE bytes are compressed with the
+# best encoding the client accepts; brotli and zstd are used when their packages
+# are installed. Streamed responses (exports) are compressed chunk by chunk with
+# a flush after each, so they keep streaming. Bodies of responses that carry an
+# ETag (the cached snapshots and catalogs) are kept compressed in a small LRU so
+# a hot payload is compressed once per encoding, not once per request. Responses
+# that already have a Content-Encoding (/assets/) are left alone.
+COMPRESS_MIN_SIZE = int(os.environ.get('COMPRESS_MIN_SIZE', 1024))
+COMPRESS_CACHE_ENTRIES = int(os.environ.get('COMPRESS_CACHE_ENTRIES', 256))
+COMPRESSIBLE_MIMETYPES = ('application/json', 'application/javascript', 'application/x-ndjson', 'image/svg+xml')
+ENCODING_PREFERENCE = ('br', 'zstd', 'gzip')  # server order when the client rates them equally
+
+def gzip_encoders():
+    def compress(data):
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+        return compressor.compress(data) + compressor.flush()
+
+    def stream():
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+        return (lambda data: compressor.compress(data) + compressor.flush(zlib.Z_SYNC_FLUSH)), compressor.flush
+    return compress, stream
+
+def brotli_encoders(brotli):
+    def stream():
+        compressor = brotli.Compressor(quality=5)
+        return (lambda data: compressor.process(data) + compressor.flush()), compressor.finish
+    return (lambda data: brotli.compress(data, quality=5)), stream
+
+def zstd_encoders(zstandard):
+    def stream():
+        compressor = zstandard.ZstdCompressor(level=3).compressobj()
+        return (lambda data: compressor.compress(data) + compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)), compressor.flush
+    return (lambda data: zstandard.ZstdCompressor(level=3).compress(data)), stream
+
+response_encoders = None
+
+def available_encoders():
+    """encoding -> (compress bytes, start a stream); optional packages load on first use"""
+    global response_encoders
+    if response_encoders is None:
+        encoders = {'gzip': gzip_encoders()}
+        try:
+            import brotli
+            encoders['br'] = brotli_encoders(brotli)
+        except ImportError:
+            pass
+        try:
+            import zstandard
+            encoders['zstd'] = zstd_encoders(zstandard)
+        except ImportError:
+            pass
+        response_encoders = encoders
+    return response_encoders
+
+def choose_encoding(encoders):
+    best, best_quality = None, 0
+    for name in ENCODING_PREFERENCE:
+        if name in encoders and request.accept_encodings[name] > best_quality:
+            best, best_quality = name, request.accept_encodings[name]
+    return best
+
+class CompressedBodyCache:
+    """LRU of compressed bodies keyed by (path, ETag, encoding)"""
+    def __init__(self, max_entries):
+        self.lock = threading.Lock()
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+
+    def get(self, key):
+        with self.lock:
+            body = self.entries.get(key)
+            if body is not None:
+                self.entries.move_to_end(key)
+            return body
+
+    def put(self, key, body):
+        with self.lock:
+            self.entries[key] = body
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+compressed_bodies = CompressedBodyCache(COMPRESS_CACHE_ENTRIES)
+
+def compressed_stream(source, compress_chunk, finish):
+    try:
+        for chunk in source:
+            if isinstance(chunk, str):
+                chunk = chunk.encode('utf-8')
+            data = compress_chunk(chunk)
+            if data:
+                yield data
+        yield finish()
+    finally:
+        if hasattr(source, 'close'):
+            source.close()
+
+def weaken_etag(response):
+    # The compressed bytes differ from the identity body; a weak tag still
+    # matches the route's own tag on revalidation (If-None-Match is weak)
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+
+@app.after_request
+def compress_response(response):
+    if (request.method == 'HEAD' or response.status_code < 200 or response.status_code in (204, 206, 304)
+            or response.direct_passthrough or 'Content-Encoding' in response.headers
+            or 'no-transform' in response.headers.get('Cache-Control', '')
+            or not (response.mimetype.startswith('text/') or response.mimetype in COMPRESSIBLE_MIMETYPES)):
+        return response
+
+    encoders = available_encoders()
+    encoding = choose_encoding(encoders)
+    if response.is_streamed:
+        response.vary.add('Accept-Encoding')
+        if encoding is not None:
+            compress_chunk, finish = encoders[encoding][1]()
+            response.response = compressed_stream(response.response, compress_chunk, finish)
+            response.headers.pop('Content-Length', None)
+            response.headers['Content-Encoding'] = encoding
+            weaken_etag(response)
+        return response
+
+    body = response.get_data()
+    if len(body) < COMPRESS_MIN_SIZE:
+        return response
+    response.vary.add('Accept-Encoding')
+    if encoding is None:
+        return response
+    etag = response.get_etag()[0]
+    key = (request.full_path, etag, encoding) if etag else None
+    compressed = compressed_bodies.get(key) if key else None
+    if compressed is None:
+        compressed = encoders[encoding][0](body)
+        if key:
+            compressed_bodies.put(key, compressed)
+    if len(compressed) < len(body):
+        response.set_data(compressed)
+        response.headers['Content-Encoding'] = encoding
+        weaken_etag(response)
+    return response
+
+# ✅ Metrics (Prometheus text format on /metrics, merged across workers)
+# Every worker keeps its own counters/histograms and writes a snapshot to
+# METRICS_DIR at most every METRICS_FLUSH_SECONDS; /metrics sums all snapshots.
+# Snapshots of dead workers are folded into one file so their counts survive.
+METRICS_DIR = os.environ.get('METRICS_DIR', 'metrics_data')
+METRICS_FLUSH_SECONDS = float(os.environ.get('METRICS_FLUSH_SECONDS', 5))
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN')  # require "Authorization: Bearer <token>" when set
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5, 1, 5)
+# name -> (type, help, histogram buckets)
+METRIC_TYPES = {
+    'tg_http_requests_total': ('counter', 'Requests by endpoint, method and status', None),
+    'tg_http_request_duration_seconds': ('histogram', 'Request latency by endpoint', LATENCY_BUCKETS),
+    'tg_http_requests_in_flight': ('gauge', 'Requests being handled, per worker', None),
+    'tg_db_queries_per_request': ('histogram', 'DB statements run per request', (0, 1, 2, 5, 10, 20, 50, 100)),
+    'tg_db_time_per_request_seconds': ('histogram', 'Time spent in DB statements per request', LATENCY_BUCKETS),
+    'tg_db_query_duration_seconds': ('histogram', 'Duration of each named query', QUERY_BUCKETS),
+    'tg_db_pool_wait_seconds': ('histogram', 'Time spent waiting for a DB connection', QUERY_BUCKETS),
+    'tg_db_pool_connections': ('gauge', 'Postgres pool connections by state, per worker', None),
+    'tg_db_pool_requests_waiting': ('gauge', 'Requests queued for a pool connection, per worker', None),
+    'tg_export_duration_seconds': ('histogram', 'Time to build an export', (0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)),
+}
+
+class Metrics:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters = {}    # (name, labels) -> value
+        self.gauges = {}      # (name, labels) -> value
+        self.histograms = {}  # (name, labels) -> [bucket counts..., sum, count]
+        self.flushed_at = 0
+
+    def inc(self, name, labels=(), value=1):
+        key = (name, labels)
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def set_gauge(self, name, labels=(), value=0):
+        with self.lock:
+            self.gauges[(name, labels)] = value
+
+    def add_gauge(self, name, labels=(), value=1):
+        key = (name, labels)
+        with self.lock:
+            self.gauges[key] = self.gauges.get(key, 0) + value
+
+    def observe(self, name, value, labels=()):
+        buckets = METRIC_TYPES[name][2]
+        key = (name, labels)
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = [0] * (len(buckets) + 2)
+            for i, bound in enumerate(buckets):
+                if value <= bound:
+                    histogram[i] += 1
+            histogram[-2] += value
+            histogram[-1] += 1
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                'counters': [[n, l, v] for (n, l), v in self.counters.items()],
+                'gauges': [[n, l, v] for (n, l), v in self.gauges.items()],
+                'histograms': [[n, l, list(v)] for (n, l), v in self.histograms.items()],
+                'slow_queries': slow_query_log.snapshot(),
+            }
+
+    def flush(self):
+        """Write this worker's snapshot (atomically) for /metrics in any worker"""
+        self.flushed_at = time.monotonic()
+        record_pool_stats()
+        os.makedirs(METRICS_DIR, exist_ok=True)
+        path = os.path.join(METRICS_DIR, f'worker-{os.getpid()}.json')
+        with open(path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(self.snapshot(), f)
+        os.replace(path + '.tmp', path)
+
+    def maybe_flush(self):
+        if time.monotonic() - self.flushed_at >= METRICS_FLUSH_SECONDS:
+            try:
+                self.flush()
+            except OSError as e:
+                print(f"⚠️ Metrics flush failed: {e}")
+
+metrics = Metrics()
+
+def merge_snapshot(merged, snapshot, live=True):
+    for name, labels, value in snapshot['counters']:
+        key = (name, tuple(map(tuple, labels)))
+        merged['counters'][key] = merged['counters'].get(key, 0) + value
+    for name, labels, values in snapshot['histograms']:
+        key = (name, tuple(map(tuple, labels)))
+        current = merged['histograms'].get(key)
+        merged['histograms'][key] = values if current is None else [a + b for a, b in zip(current, values)]
+    if live:
+        for name, labels, value in snapshot['gauges']:
+            merged['gauges'][(name, tuple(map(tuple, labels)))] = value
+    for entry in snapshot.get('slow_queries', []):
+        merge_slow_query(merged.setdefault('slow_queries', {}), entry)
+
+def worker_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+def collect_metrics():
+    """Merge every worker's snapshot; retire snapshots of dead workers into retired.json"""
+    merged = {'counters': {}, 'gauges': {}, 'histograms': {}, 'slow_queries': {}}
+    os.makedirs(METRICS_DIR, exist_ok=True)
+    with open(os.path.join(METRICS_DIR, 'metrics.lock'), 'a') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        retired_path = os.path.join(METRICS_DIR, 'retired.json')
+        retired = {'counters': {}, 'gauges': {}, 'histograms': {}, 'slow_queries': {}}
+        if os.path.exists(retired_path):
+            with open(retired_path, encoding='utf-8') as f:
+                merge_snapshot(retired, json.load(f), live=False)
+        
+        dead = []
+        for path in glob.glob(os.path.join(METRICS_DIR, 'worker-*.json')):
+            pid = int(os.path.basename(path)[len('worker-'):-len('.json')])
+            try:
+                with open(path, encoding='utf-8') as f:
+                    snapshot = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if worker_alive(pid):
+                # Gauges are per worker, so label them with the pid
+                for gauge in snapshot['gauges']:
+                    gauge[1] = gauge[1] + [['worker', str(pid)]]
+                merge_snapshot(merged, snapshot)
+            else:
+                merge_snapshot(retired, snapshot, live=False)
+                dead.append(path)
+        
+        if dead:
+            with open(retired_path + '.tmp', 'w', encoding='utf-8') as f:
+                json.dump({
+                    'counters': [[n, l, v] for (n, l), v in retired['counters'].items()],
+                    'gauges': [],
+                    'histograms': [[n, l, v] for (n, l), v in retired['histograms'].items()],
+                    'slow_queries': list(retired['slow_queries'].values()),
+                }, f)
+            os.replace(retired_path + '.tmp', retired_path)
+            for path in dead:
+                os.remove(path)
+    
+    for key, value in retired['counters'].items():
+        merged['counters'][key] = merged['counters'].get(key, 0) + value
+    for key, values in retired['histograms'].items():
+        current = merged['histograms'].get(key)
+        merged['histograms'][key] = values if current is None else [a + b for a, b in zip(current, values)]
+    for entry in retired['slow_queries'].values():
+        merge_slow_query(merged['slow_queries'], entry)
+    return merged
+
+def format_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ''
+    escaped = [(k, str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')) for k, v in pairs]
+    return '{' + ','.join(f'{k}="{v}"' for k, v in escaped) + '}'
+
+def render_metrics(merged):
+    lines = []
+    for name, (metric_type, help_text, buckets) in METRIC_TYPES.items():
+        source = {'counter': 'counters', 'gauge': 'gauges', 'histogram': 'histograms'}[metric_type]
+        series = sorted((labels, value) for (n, labels), value in merged[source].items() if n == name)
+        if not series:
+            continue
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {metric_type}")
+        for labels, value in series:
+            if metric_type != 'histogram':
+                lines.append(f"{name}{format_labels(labels)} {value}")
+                continue
+            for bound, count in zip(buckets, value):
+                lines.append(f"{name}_bucket{format_labels(labels, [('le', bound)])} {count}")
+            lines.append(f"{name}_bucket{format_labels(labels, [('le', '+Inf')])} {value[-1]}")
+            lines.append(f"{name}_sum{format_labels(labels)} {value[-2]}")
+            lines.append(f"{name}_count{format_labels(labels)} {value[-1]}")
+    return '\n'.join(lines) + '\n'
+
+def record_query_time(name, seconds):
+    """Called for every named query: the per-query histogram"""
+    metrics.observe('tg_db_query_duration_seconds', seconds, (('query', name),))
+
+def record_db_statement(seconds):
+    """Called by the timed cursor/connection for every statement, named or not: the request's DB totals"""
+    if has_request_context():
+        g.db_queries = g.get('db_queries', 0) + 1
+        g.db_time = g.get('db_time', 0) + seconds
+
+def record_pool_stats():
+    if DB_TYPE != 'postgres':
+        return
+    stats = pool.get_stats()
+    size, available = stats.get('pool_size', 0), stats.get('pool_available', 0)
+    metrics.set_gauge('tg_db_pool_connections', (('state', 'in_use'),), size - available)
+    metrics.set_gauge('tg_db_pool_connections', (('state', 'idle'),), available)
+    metrics.set_gauge('tg_db_pool_requests_waiting', (), stats.get('requests_waiting', 0))
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+    g.db_queries = 0
+    g.db_time = 0
+    metrics.add_gauge('tg_http_requests_in_flight', (), 1)
+
+@app.after_request
+def record_request_metrics(response):
+    started = g.get('request_started')
+    if started is not None:
+        endpoint = request.endpoint or 'unmatched'
+        labels = (('endpoint', endpoint),)
+        metrics.inc('tg_http_requests_total', (('endpoint', endpoint), ('method', request.method), ('status', str(response.status_code))))
+        metrics.observe('tg_http_request_duration_seconds', time.perf_counter() - started, labels)
+    return response
+
+@app.teardown_request
+def finish_request_metrics(exc):
+    if g.pop('request_started', None) is not None:
+        # Observed at teardown so a body streamed with stream_with_context counts the statements it runs
+        labels = (('endpoint', request.endpoint or 'unmatched'),)
+        metrics.observe('tg_db_queries_per_request', g.get('db_queries', 0), labels)
+        metrics.observe('tg_db_time_per_request_seconds', g.get('db_time', 0), labels)
+        metrics.add_gauge('tg_http_requests_in_flight', (), -1)
+    metrics.maybe_flush()
+
+@app.route('/metrics')
+def metrics_endpoint():
+    if METRICS_TOKEN and request.headers.get('Authorization') != f'Bearer {METRICS_TOKEN}':
+        return abort(403)
+    metrics.flush()
+    body = render_metrics(collect_metrics())
+    return Response(body, mimetype='text/plain; version=0.0.4')
+
+atexit.register(metrics.flush)
+
+# ✅ Slow-query log
+# Every statement run through a DB connection is timed. Ones slower than
+# SLOW_QUERY_MS are logged and aggregated by normalized SQL (literals -> ?,
+# repeated VALUES/IN groups collapsed), with their parameter shape and routes.
+# The first slow run of each distinct statement also captures its plan:
+# EXPLAIN QUERY PLAN on SQLite, EXPLAIN (ANALYZE, BUFFERS) on Postgres (inside a
+# savepoint that is rolled back, so DML is not applied twice).
+# Listed on /admin/slow-queries, merged across workers with the metrics.
+SLOW_QUERY_MS = float(os.environ.get('SLOW_QUERY_MS', 200))
+SLOW_QUERY_EXPLAIN = os.environ.get('SLOW_QUERY_EXPLAIN', '1') == '1'
+SLOW_QUERY_MAX_STATEMENTS = 200
+EXPLAINABLE = ('select', 'with', 'insert', 'update', 'delete')
+
+def normalize_sql(sql):
+    sql = re.sub(r"'(?:[^']|'')*'", '?', sql)
+    sql = re.sub(r'(?<![\w.])\d+(?:\.\d+)?\b', '?', sql)
+    sql = re.sub(r'%s|(?<!:):[A-Za-z_]\w*', '?', sql)
+    sql = re.sub(r'\s+', ' ', sql).strip()
+    # (?, ?), (?, ?), ... -> (?, ?), ...
+    return re.sub(r'(\([^()]*\))(?:, ?\1)+', r'\1, ...', sql)
+
+def params_shape(params, many=False):
+    if many:
+        if not isinstance(params, (list, tuple)):
+            return 'many'
+        return f"{len(params)} x {params_shape(params[0]) if params else '()'}"
+    if isinstance(params, dict):
+        return '{' + ', '.join(f"{k}: {type(v).__name__}" for k, v in params.items()) + '}'
+    return '(' + ', '.join(type(v).__name__ for v in params or ()) + ')'
+
+def merge_slow_query(entries, entry):
+    current = entries.get(entry['sql'])
+    if current is None:
+        entries[entry['sql']] = dict(entry, routes=dict(entry['routes']))
+        return
+    current['count'] += entry['count']
+    current['total_ms'] += entry['total_ms']
+    current['max_ms'] = max(current['max_ms'], entry['max_ms'])
+    current['last_seen'] = max(current['last_seen'], entry['last_seen'])
+    current['plan'] = current['plan'] or entry['plan']
+    for route, count in entry['routes'].items():
+        current['routes'][route] = current['routes'].get(route, 0) + count
+
+class SlowQueryLog:
+    def __init__(self):
+        self.entries = {}
+        self.lock = threading.Lock()
+
+    def record(self, sql, params, seconds, explain, many=False):
+        """Called with every statement's duration; explain(sql, params) returns the plan text
+        (None where the caller can't run EXPLAIN synchronously, e.g. the ASGI handlers)"""
+        elapsed_ms = seconds * 1000
+        if elapsed_ms < SLOW_QUERY_MS:
+            return
+        normalized = normalize_sql(sql)
+        route = request.endpoint or 'unmatched' if has_request_context() else 'background'
+        print(f"🐢 Slow query {elapsed_ms:.0f}ms [{route}] {normalized[:300]}")
+        
+        with self.lock:
+            entry = self.entries.get(normalized)
+            if entry is None:
+                if len(self.entries) >= SLOW_QUERY_MAX_STATEMENTS:
+                    cheapest = min(self.entries, key=lambda k: self.entries[k]['total_ms'])
+                    del self.entries[cheapest]
+                entry = self.entries[normalized] = {
+                    'sql': normalized, 'params': params_shape(params, many),
+                    'count': 0, 'total_ms': 0, 'max_ms': 0, 'last_seen': '',
+                    'routes': {}, 'plan': None
+                }
+                capture_plan = True
+            else:
+                capture_plan = False
+            entry['count'] += 1
+            entry['total_ms'] += elapsed_ms
+            entry['max_ms'] = max(entry['max_ms'], elapsed_ms)
+            entry['last_seen'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            entry['routes'][route] = entry['routes'].get(route, 0) + 1
+        
+        if capture_plan and explain is not None and SLOW_QUERY_EXPLAIN and sql.lstrip().lower().startswith(EXPLAINABLE):
+            if many:
+                params = params[0] if isinstance(params, (list, tuple)) and params else None
+            if params is not None:
+                try:
+                    plan = explain(sql, params)
+                except Exception as e:
+                    plan = f"EXPLAIN failed: {e}"
+                with self.lock:
+                    entry['plan'] = plan
+
+    def snapshot(self):
+        with self.lock:
+            return [dict(entry, routes=dict(entry['routes'])) for entry in self.entries.values()]
+
+slow_query_log = SlowQueryLog()
+
 # ✅ Database Configuration - Use SQLite locally
 DB_TYPE = os.environ.get('DB_TYPE', 'sqlite')  # Set to 'postgres' in production
 
 if DB_TYPE == 'postgres':
     # PostgreSQL configuration (for Render.com)
-    from psycopg_pool import ConnectionPool
+    from psycopg_pool import ConnectionPool, PoolTimeout
+    from psycopg import IntegrityError, DataError, ProgrammingError, Cursor
     DB_URL = os.environ.get("DATABASE_URL")
-    pool = ConnectionPool(conninfo=DB_URL, min_size=1, max_size=20, timeout=60)
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 20))
+    # Fail fast when the pool is exhausted - the request gets a 503 instead of hanging
+    DB_POOL_TIMEOUT = float(os.environ.get('DB_POOL_TIMEOUT', 5))
+    DB_BUSY_ERRORS = (PoolTimeout,)
+    # A row the database can never accept (bad value, not a lost connection)
+    DB_DATA_ERRORS = (DataError, ProgrammingError, ValueError, TypeError, OverflowError)
+
+    class TimedCursor(Cursor):
+        """Client-side cursors feed the slow-query log and the request's DB totals
+        (named export cursors are counted by stream_query and never explained)"""
+        def execute(self, query, params=None, **kwargs):
+            started = time.perf_counter()
+            result = super().execute(query, params, **kwargs)
+            elapsed = time.perf_counter() - started
+            record_db_statement(elapsed)
+            slow_query_log.record(query, params, elapsed, self.explain)
+            return result
+
+        def executemany(self, query, params_seq, **kwargs):
+            started = time.perf_counter()
+            super().executemany(query, params_seq, **kwargs)
+            elapsed = time.perf_counter() - started
+            record_db_statement(elapsed)
+            slow_query_log.record(query, params_seq, elapsed, self.explain, many=True)
+
+        def explain(self, query, params):
+            # A plain cursor, and a savepoint so EXPLAIN ANALYZE of DML is undone
+            with Cursor(self.connection) as cur:
+                cur.execute("SAVEPOINT slow_query_explain")
+                try:
+                    cur.execute(f"EXPLAIN (ANALYZE, BUFFERS) {query}", params)
+                    return '\n'.join(row[0] for row in cur.fetchall())
+                finally:
+                    cur.execute("ROLLBACK TO SAVEPOINT slow_query_explain")
+                    cur.execute("RELEASE SAVEPOINT slow_query_explain")
+
+    def configure_connection(conn):
+        conn.cursor_factory = TimedCursor
+
+    pool = ConnectionPool(conninfo=DB_URL, min_size=1, max_size=DB_POOL_SIZE, timeout=DB_POOL_TIMEOUT,
+                          configure=configure_connection)
     
+    @contextmanager
     def get_conn():
-        return pool.connection()
+        started = time.perf_counter()
+        with pool.connection() as conn:
+            metrics.observe('tg_db_pool_wait_seconds', time.perf_counter() - started)
+            yield conn
 else:
     # SQLite configuration (for local development)
+    from sqlite3 import IntegrityError, DataError, ProgrammingError, InterfaceError
     DB_PATH = 'votes.db'
-    
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 20))
+    DB_BUSY_ERRORS = ()
+    DB_DATA_ERRORS = (DataError, ProgrammingError, InterfaceError, ValueError, TypeError, OverflowError)
+    SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 5000))
+    SQLITE_CACHE_SIZE_KB = int(os.environ.get('SQLITE_CACHE_SIZE_KB', 20000))
+    SQLITE_MMAP_SIZE = int(os.environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))
+    SQLITE_CACHED_STATEMENTS = 256
+    SQLITE_PRAGMAS = (
+        "PRAGMA journal_mode=WAL",
+        "PRAGMA synchronous=NORMAL",
+        f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}",
+        f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KB}",
+        f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}",
+        "PRAGMA temp_store=MEMORY",
+    )
+    # Only the ASGI mode (asgi.py) pools SQLite connections
+    DB_POOL_TIMEOUT = float(os.environ.get('DB_POOL_TIMEOUT', 5))
+
+    sqlite_local = threading.local()
+
+    class TimedSQLiteConnection(sqlite3.Connection):
+        """conn.execute/executemany feed the slow-query log and the request's DB totals"""
+        def execute(self, sql, parameters=()):
+            started = time.perf_counter()
+            cursor = super().execute(sql, parameters)
+            elapsed = time.perf_counter() - started
+            record_db_statement(elapsed)
+            slow_query_log.record(sql, parameters, elapsed, self.explain)
+            return cursor
+
+        def executemany(self, sql, seq_of_parameters):
+            started = time.perf_counter()
+            cursor = super().executemany(sql, seq_of_parameters)
+            elapsed = time.perf_counter() - started
+            record_db_statement(elapsed)
+            slow_query_log.record(sql, seq_of_parameters, elapsed, self.explain, many=True)
+            return cursor
+
+        def explain(self, sql, parameters):
+            rows = super().execute(f"EXPLAIN QUERY PLAN {sql}", parameters).fetchall()
+            depth = {0: -1}
+            lines = []
+            for node_id, parent, _, detail in rows:
+                depth[node_id] = depth.get(parent, -1) + 1
+                lines.append('  ' * depth[node_id] + detail)
+            return '\n'.join(lines)
+
+    def open_sqlite_connection():
+        """Open a tuned connection: WAL so readers never block the writer, and
+        busy_timeout so concurrent writers from other workers wait instead of
+        failing with "database is locked"."""
+        conn = sqlite3.connect(
+            DB_PATH,
+            timeout=SQLITE_BUSY_TIMEOUT_MS / 1000,
+            cached_statements=SQLITE_CACHED_STATEMENTS,
+            factory=TimedSQLiteConnection
+        )
+        conn.row_factory = sqlite3.Row
+        for pragma in SQLITE_PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    class SQLiteConnection:
+        """Hands out this thread's long-lived connection.
+
+        The connection stays open between requests (so the schema and the
+        statement cache survive). Anything left uncommitted when the outermost
+        block exits is rolled back, just like closing the connection used to do.
+        """
+        def __enter__(self):
+            conn = getattr(sqlite_local, 'conn', None)
+            # A forked worker must not reuse its parent's connection
+            if conn is None or sqlite_local.pid != os.getpid():
+                conn = open_sqlite_connection()
+                sqlite_local.conn = conn
+                sqlite_local.pid = os.getpid()
+                sqlite_local.depth = 0
+            sqlite_local.depth += 1
+            return conn
+
+        def __exit__(self, exc_type, exc_val, exc_tb):
+            sqlite_local.depth -= 1
+            conn = sqlite_local.conn
+            if sqlite_local.depth == 0 and conn.in_transaction:
+                conn.rollback()
+
     def get_conn():
         """SQLite connection context manager"""
-        class SQLiteConnection:
-            def __enter__(self):
-                self.conn = sqlite3.connect(DB_PATH)
-                self.conn.row_factory = sqlite3.Row
-                return self.conn
-            
-            def __exit__(self, exc_type, exc_val, exc_tb):
-                self.conn.close()
-        
         return SQLiteConnection()
 
+# ✅ Named queries
+# Each query is written once with '?' placeholders and compiled for the active
+# backend when it is registered, so hot paths never rebuild SQL text. Postgres
+# runs them as prepared statements (prepare=True); SQLite reuses them from the
+# connection's statement cache. Rows come back as plain tuples on both backends.
+QUERIES = {}
+
+def register_query(name, sql, postgres_sql=None):
+    """Register a named query. postgres_sql overrides the text where the dialects differ."""
+    if DB_TYPE == 'postgres':
+        sql = postgres_sql or sql.replace('?', '%s')
+    QUERIES[name] = sql
+
+def run_query(conn, name, params=()):
+    """Execute a named query and return its cursor"""
+    started = time.perf_counter()
+    try:
+        if DB_TYPE == 'postgres':
+            return conn.execute(QUERIES[name], params, prepare=True)
+        return conn.execute(QUERIES[name], params)
+    finally:
+        record_query_time(name, time.perf_counter() - started)
+
+def fetch_all(conn, name, params=()):
+    return [tuple(row) for row in run_query(conn, name, params).fetchall()]
+
+def fetch_one(conn, name, params=()):
+    cursor = run_query(conn, name, params)
+    row = cursor.fetchone()
+    # Closing resets the statement (matters for DELETE ... RETURNING on SQLite)
+    cursor.close()
+    return tuple(row) if row is not None else None
+
+def fetch_value(conn, name, params=(), default=None):
+    row = fetch_one(conn, name, params)
+    return row[0] if row is not None else default
+
+def run_many(conn, name, rows):
+    """executemany a named query; returns the number of rows it changed"""
+    started = time.perf_counter()
+    try:
+        if DB_TYPE == 'postgres':
+            with conn.cursor() as cur:
+                cur.executemany(QUERIES[name], rows)
+                return cur.rowcount
+        else:
+            return conn.executemany(QUERIES[name], rows).rowcount
+    finally:
+        record_query_time(name, time.perf_counter() - started)
+
+# ✅ Catalog ids
+# votes.item_id and vote_tallies.item_id point into the catalog table of the
+# vote's category: publishers for Best Publisher, games_2026 for Most
+# Anticipated 2026 and games for everything else.
+CATEGORY_CATALOGS = {5: 'publishers', 8: 'games_2026'}
+
+def catalog_case_sql(category_expr, per_table):
+    """CASE over a category column; per_table is formatted with each catalog table name"""
+    branches = ' '.join(f"WHEN {cat_id} THEN {per_table.format(table=table_name)}"
+                        for cat_id, table_name in CATEGORY_CATALOGS.items())
+    return f"CASE {category_expr} {branches} ELSE {per_table.format(table='games')} END"
+
+def selection_sql(category_expr, item_expr):
+    """SQL expression for the catalog name of a vote's item"""
+    return catalog_case_sql(category_expr, f"(SELECT name FROM {{table}} WHERE id = {item_expr})")
+
+def item_id_sql(category_expr, name_expr):
+    """SQL expression for the catalog id of a selection name"""
+    return catalog_case_sql(category_expr, f"(SELECT id FROM {{table}} WHERE name = {name_expr})")
+
+def catalog_categories_sql(table_name, category_expr):
+    """SQL condition matching the categories whose votes point into a catalog table"""
+    if table_name == 'games':
+        return f"{category_expr} NOT IN ({', '.join(str(c) for c in CATEGORY_CATALOGS)})"
+    cat_ids = [str(c) for c, t in CATEGORY_CATALOGS.items() if t == table_name]
+    return f"{category_expr} IN ({', '.join(cat_ids)})"
+
+register_query('categories.list', """
+    SELECT id, name_ar, name_en, description FROM categories ORDER BY display_order
+""")
+register_query('ballots.exists', "SELECT 1 FROM ballots WHERE voter_name = ?")
+register_query('ballots.count', "SELECT COUNT(*) FROM ballots")
+register_query('ballots.insert', "INSERT INTO ballots (voter_name) VALUES (?)")
+register_query('ballots.release', """
+    DELETE FROM ballots WHERE id = ?
+    AND NOT EXISTS (SELECT 1 FROM votes WHERE voter_id = ?)
+    RETURNING voter_name
+""")
+register_query('votes.insert', f"""
+    INSERT INTO votes (voter_id, category_id, rank, item_id, points)
+    SELECT v.voter_id, v.category_id, v.rank, {item_id_sql('v.category_id', 'v.selection')}, v.points
+    FROM (SELECT ? AS voter_id, ? AS category_id, ? AS rank, ? AS selection, ? AS points) v
+""")
+register_query('votes.for_voter_id', "SELECT category_id, rank, item_id, points FROM votes WHERE voter_id = ?")
+register_query('votes.count_for_voter', """
+    SELECT COUNT(*) FROM votes v JOIN ballots b ON b.id = v.voter_id WHERE b.voter_name = ?
+""")
+register_query('votes.for_voter', f"""
+    SELECT v.id, c.name_ar, v.category_id, v.rank, {selection_sql('v.category_id', 'v.item_id')},
+           v.points, v.timestamp
+    FROM ballots b
+    JOIN votes v ON v.voter_id = b.id
+    JOIN categories c ON v.category_id = c.id
+    WHERE b.voter_name = ?
+    ORDER BY c.display_order, v.rank
+""")
+register_query('votes.get', "SELECT voter_id, category_id, rank, item_id, points FROM votes WHERE id = ?")
+register_query('votes.update', "UPDATE votes SET item_id = ?, rank = ?, points = ? WHERE id = ?")
+register_query('votes.delete_returning', """
+    DELETE FROM votes WHERE id = ?
+    RETURNING voter_id, category_id, rank, item_id, points
+""")
+register_query('votes.selection_count', """
+    SELECT COUNT(*) FROM votes WHERE voter_id = ? AND category_id = ? AND item_id = ?
+""")
+register_query('votes.has_selection', """
+    SELECT 1 FROM votes WHERE voter_id = ? AND category_id = ? AND item_id = ? LIMIT 1
+""")
+register_query('tallies.apply', """
+    INSERT INTO vote_tallies (category_id, item_id, points, voters, votes, rank_sum)
+    VALUES (?, ?, ?, ?, ?, ?)
+    ON CONFLICT (category_id, item_id) DO UPDATE SET
+        points = vote_tallies.points + excluded.points,
+        voters = vote_tallies.voters + excluded.voters,
+        votes = vote_tallies.votes + excluded.votes,
+        rank_sum = vote_tallies.rank_sum + excluded.rank_sum
+""")
+register_query('tallies.prune', "DELETE FROM vote_tallies WHERE votes <= 0")
+register_query('tallies.missing', """
+    SELECT EXISTS (SELECT 1 FROM votes) AND NOT EXISTS (SELECT 1 FROM vote_tallies)
+""")
+register_query('tallies.clear', "DELETE FROM vote_tallies")
+register_query('tallies.rebuild', """
+    INSERT INTO vote_tallies (category_id, item_id, points, voters, votes, rank_sum)
+    SELECT category_id, item_id, COALESCE(SUM(points), 0), COUNT(DISTINCT voter_id),
+           COUNT(*), COALESCE(SUM(rank), 0)
+    FROM votes
+    GROUP BY category_id, item_id
+""")
+register_query('standings.list', f"""
+    SELECT c.id, c.name_ar, c.name_en, {selection_sql('t.category_id', 't.item_id')} AS selection,
+           t.points, t.voters, ROUND(t.rank_sum * 1.0 / t.votes, 2)
+    FROM categories c
+    LEFT JOIN vote_tallies t ON t.category_id = c.id
+    ORDER BY c.display_order, t.points DESC, selection
+""")
+
 # ✅ Warm-up
 def warmup_db():
     try:
@@ -59,14 +875,16 @@ ADMIN_USERNAME = "adminU"
 ADMIN_PASSWORD = "amdinSF"
 
 # ✅ Load games from text file
+GAMES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'games.txt')
+
 def load_games_from_file():
     try:
-        with open('game.txt', 'r', encoding='utf-8') as f:
+        with open(GAMES_FILE, 'r', encoding='utf-8') as f:
             games = [line.strip() for line in f if line.strip()]
-        print(f"✅ Loaded {len(games)} games from game.txt")
+        print(f"✅ Loaded {len(games)} games from {GAMES_FILE}")
         return games
     except FileNotFoundError:
-        print("⚠️ game.txt not found, using default game list")
+        print(f"⚠️ {GAMES_FILE} not found, using default game list")
         return [
             "The Legend of Zelda: Ocarina of Time", "Super Mario World", "Minecraft",
             "The Witcher 3: Wild Hunt", "Tetris", "Red Dead Redemption 2",
@@ -74,6 +892,113 @@ def load_games_from_file():
             "Mass Effect 2", "BioShock", "Metal Gear Solid", "Halo: Combat Evolved"
         ]
 
+# ✅ Votes schema
+# votes holds integer keys only: the voter's ballots row and the catalog row of
+# the selection (see CATEGORY_CATALOGS). vote_details joins the names back in
+# for the admin table view and the exports.
+VOTES_TABLE_SQL = {
+    'postgres': """
+    CREATE TABLE IF NOT EXISTS votes (
+        id SERIAL PRIMARY KEY,
+        voter_id INTEGER NOT NULL,
+        category_id INTEGER NOT NULL,
+        rank INTEGER CHECK (rank BETWEEN 1 AND 5),
+        item_id INTEGER NOT NULL,
+        points INTEGER DEFAULT 0,
+        timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE(voter_id, category_id, rank)
+    )""",
+    'sqlite': """
+    CREATE TABLE IF NOT EXISTS votes (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        voter_id INTEGER NOT NULL,
+        category_id INTEGER NOT NULL,
+        rank INTEGER CHECK (rank BETWEEN 1 AND 5),
+        item_id INTEGER NOT NULL,
+        points INTEGER DEFAULT 0,
+        timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE(voter_id, category_id, rank)
+    )""",
+}
+
+VOTE_DETAILS_SQL = f"""
+    SELECT v.id, b.voter_name, v.category_id, v.rank,
+           {selection_sql('v.category_id', 'v.item_id')} AS selection, v.points, v.timestamp
+    FROM votes v
+    JOIN ballots b ON b.id = v.voter_id
+"""
+
+def upgrade_legacy_votes(conn):
+    """Move a votes table keyed by voter_name/selection text onto voter_id/item_id.
+
+    Backfills ballots and the catalogs from the old rows, copies the votes over
+    (ids kept) and drops the old table; vote_tallies is dropped too and rebuilt
+    by init_db. Does nothing once the table has been upgraded.
+    """
+    if DB_TYPE == 'postgres':
+        with conn.cursor() as cur:
+            cur.execute("""
+                SELECT 1 FROM information_schema.columns
+                WHERE table_name = 'votes' AND column_name = 'voter_name'
+            """)
+            if cur.fetchone() is None:
+                return
+            cur.execute("""
+                INSERT INTO ballots (voter_name)
+                SELECT DISTINCT voter_name FROM votes
+                ON CONFLICT DO NOTHING
+            """)
+            for table_name in AUTOCOMPLETE_TABLES:
+                cur.execute(f"""
+                    INSERT INTO {table_name} (name)
+                    SELECT DISTINCT selection FROM votes WHERE {catalog_categories_sql(table_name, 'category_id')}
+                    ON CONFLICT DO NOTHING
+                """)
+            cur.execute("DROP VIEW IF EXISTS vote_details")
+            cur.execute("ALTER TABLE votes RENAME TO votes_legacy")
+            cur.execute(VOTES_TABLE_SQL['postgres'])
+            cur.execute(f"""
+                INSERT INTO votes (id, voter_id, category_id, rank, item_id, points, timestamp)
+                SELECT l.id, b.id, l.category_id, l.rank, {item_id_sql('l.category_id', 'l.selection')},
+                       l.points, l.timestamp
+                FROM votes_legacy l
+                JOIN ballots b ON b.voter_name = l.voter_name
+            """)
+            cur.execute("DROP TABLE votes_legacy")
+            cur.execute("SELECT setval(pg_get_serial_sequence('votes', 'id'), COALESCE(MAX(id), 0) + 1, false) FROM votes")
+            cur.execute("DROP TABLE IF EXISTS vote_tallies")
+    else:
+        # SQLite
+        columns = [row[1] for row in conn.execute("PRAGMA table_info(votes)").fetchall()]
+        if 'voter_name' not in columns:
+            return
+        conn.execute("""
+            INSERT OR IGNORE INTO ballots (voter_name)
+            SELECT DISTINCT voter_name FROM votes
+        """)
+        for table_name in AUTOCOMPLETE_TABLES:
+            conn.execute(f"""
+                INSERT OR IGNORE INTO {table_name} (name)
+                SELECT DISTINCT selection FROM votes WHERE {catalog_categories_sql(table_name, 'category_id')}
+            """)
+        # The FTS5 index on the old text columns goes with them (ballots_fts replaces it)
+        for trigger in ('votes_fts_insert', 'votes_fts_delete', 'votes_fts_update'):
+            conn.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        conn.execute("DROP TABLE IF EXISTS votes_fts")
+        conn.execute("DROP VIEW IF EXISTS vote_details")
+        conn.execute("ALTER TABLE votes RENAME TO votes_legacy")
+        conn.execute(VOTES_TABLE_SQL['sqlite'])
+        conn.execute(f"""
+            INSERT INTO votes (id, voter_id, category_id, rank, item_id, points, timestamp)
+            SELECT l.id, b.id, l.category_id, l.rank, {item_id_sql('l.category_id', 'l.selection')},
+                   l.points, l.timestamp
+            FROM votes_legacy l
+            JOIN ballots b ON b.voter_name = l.voter_name
+        """)
+        conn.execute("DROP TABLE votes_legacy")
+        conn.execute("DROP TABLE IF EXISTS vote_tallies")
+    print("✅ Moved votes to voter_id/item_id keys")
+
 # ✅ Init DB with new structure
 def init_db():
     with get_conn() as conn:
@@ -99,24 +1024,14 @@ def init_db():
                 cur.execute("""
                 CREATE TABLE IF NOT EXISTS categories (
                     id SERIAL PRIMARY KEY,
-                    name_ar TEXT UNIQUE NOT NULL,  # Arabic name
-                    name_en TEXT UNIQUE NOT NULL,  # English name for reference
+                    name_ar TEXT UNIQUE NOT NULL,  -- Arabic name
+                    name_en TEXT UNIQUE NOT NULL,  -- English name for reference
                     description TEXT,
                     display_order INTEGER DEFAULT 0
                 )""")
                 
-                # Votes table (now with category_id and top 5)
-                cur.execute("""
-                CREATE TABLE IF NOT EXISTS votes (
-                    id SERIAL PRIMARY KEY,
-                    voter_name TEXT NOT NULL,
-                    category_id INTEGER NOT NULL,
-                    rank INTEGER CHECK (rank BETWEEN 1 AND 5),
-                    selection TEXT NOT NULL,
-                    points INTEGER DEFAULT 0,
-                    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    UNIQUE(voter_name, category_id, rank)
-                )""")
+                # Votes table - voter_id -> ballots.id, item_id -> the category's catalog table
+                cur.execute(VOTES_TABLE_SQL['postgres'])
                 
                 # Games 2026 table for Most Anticipated 2026 category
                 cur.execute("""
@@ -125,25 +1040,59 @@ def init_db():
                     name TEXT UNIQUE NOT NULL,
                     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
                 )""")
+                
+                # Ballots table - one row per voter, enforces "vote once"
+                cur.execute("""
+                CREATE TABLE IF NOT EXISTS ballots (
+                    id SERIAL PRIMARY KEY,
+                    voter_name TEXT UNIQUE NOT NULL,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )""")
+                
+                # Databases created before votes used integer keys
+                upgrade_legacy_votes(conn)
+                
+                # Running totals per (category, item), maintained on every vote write
+                cur.execute("""
+                CREATE TABLE IF NOT EXISTS vote_tallies (
+                    category_id INTEGER NOT NULL,
+                    item_id INTEGER NOT NULL,
+                    points INTEGER NOT NULL DEFAULT 0,
+                    voters INTEGER NOT NULL DEFAULT 0,
+                    votes INTEGER NOT NULL DEFAULT 0,
+                    rank_sum INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (category_id, item_id)
+                )""")
+
+                # Alternate spellings (title_key form) -> canonical catalog row
+                cur.execute("""
+                CREATE TABLE IF NOT EXISTS title_aliases (
+                    catalog TEXT NOT NULL,
+                    alias TEXT NOT NULL,
+                    title_id INTEGER NOT NULL,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    PRIMARY KEY (catalog, alias)
+                )""")
 
                 # Create indexes
                 cur.execute("CREATE INDEX IF NOT EXISTS idx_games_name ON games (name)")
                 cur.execute("CREATE INDEX IF NOT EXISTS idx_publishers_name ON publishers (name)")
-                cur.execute("CREATE INDEX IF NOT EXISTS idx_votes_voter ON votes (voter_name)")
-                cur.execute("CREATE INDEX IF NOT EXISTS idx_votes_category ON votes (category_id)")
-                cur.execute("CREATE INDEX IF NOT EXISTS idx_votes_selection ON votes (selection)")
+                # Voter lookups use the UNIQUE (voter_id, category_id, rank) index
+                cur.execute("DROP INDEX IF EXISTS idx_votes_item")
+                # Keyset pagination sorts by (column, id); SQLite indexes already end in the rowid
+                cur.execute("CREATE INDEX IF NOT EXISTS idx_votes_voter_id ON votes (voter_id, id)")
+                cur.execute("CREATE INDEX IF NOT EXISTS idx_votes_category_id ON votes (category_id, id)")
+                cur.execute("CREATE INDEX IF NOT EXISTS idx_votes_item_id ON votes (item_id, id)")
+                cur.execute("CREATE INDEX IF NOT EXISTS idx_ballots_created_at ON ballots (created_at)")
+                
+                # Name-based view of votes for the admin table and the exports
+                cur.execute(f"CREATE OR REPLACE VIEW vote_details AS {VOTE_DETAILS_SQL}")
                 
                 # Insert default games if table is empty
                 cur.execute("SELECT COUNT(*) FROM games")
                 if cur.fetchone()[0] == 0:
-                    games = load_games_from_file()
-                    for game in games:
-                        cur.execute("""
-                            INSERT INTO games (name) 
-                            VALUES (%s)
-                            ON CONFLICT DO NOTHING
-                        """, (game,))
-                    print(f"✅ Inserted {len(games)} games into database")
+                    result = import_catalog(conn, 'games', load_games_from_file())
+                    print(f"✅ Inserted {result['inserted']} games into database")
                 
                 # Insert default publishers if table is empty
                 cur.execute("SELECT COUNT(*) FROM publishers")
@@ -227,18 +1176,8 @@ def init_db():
                 display_order INTEGER DEFAULT 0
             )""")
             
-            # Votes table
-            conn.execute("""
-            CREATE TABLE IF NOT EXISTS votes (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                voter_name TEXT NOT NULL,
-                category_id INTEGER NOT NULL,
-                rank INTEGER CHECK (rank BETWEEN 1 AND 5),
-                selection TEXT NOT NULL,
-                points INTEGER DEFAULT 0,
-                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
-                UNIQUE(voter_name, category_id, rank)
-            )""")
+            # Votes table - voter_id -> ballots.id, item_id -> the category's catalog table
+            conn.execute(VOTES_TABLE_SQL['sqlite'])
             
             # Games 2026 table for Most Anticipated 2026 category
             conn.execute("""
@@ -248,23 +1187,58 @@ def init_db():
                 created_at DATETIME DEFAULT CURRENT_TIMESTAMP
             )""")
             
+            # Ballots table - one row per voter, enforces "vote once"
+            conn.execute("""
+            CREATE TABLE IF NOT EXISTS ballots (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                voter_name TEXT UNIQUE NOT NULL,
+                created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+            )""")
+            
+            # Databases created before votes used integer keys
+            upgrade_legacy_votes(conn)
+            
+            # Running totals per (category, item), maintained on every vote write
+            conn.execute("""
+            CREATE TABLE IF NOT EXISTS vote_tallies (
+                category_id INTEGER NOT NULL,
+                item_id INTEGER NOT NULL,
+                points INTEGER NOT NULL DEFAULT 0,
+                voters INTEGER NOT NULL DEFAULT 0,
+                votes INTEGER NOT NULL DEFAULT 0,
+                rank_sum INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (category_id, item_id)
+            )""")
+
+            # Alternate spellings (title_key form) -> canonical catalog row
+            conn.execute("""
+            CREATE TABLE IF NOT EXISTS title_aliases (
+                catalog TEXT NOT NULL,
+                alias TEXT NOT NULL,
+                title_id INTEGER NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (catalog, alias)
+            )""")
+            
             # Create indexes
             conn.execute("CREATE INDEX IF NOT EXISTS idx_games_name ON games (name)")
             conn.execute("CREATE INDEX IF NOT EXISTS idx_publishers_name ON publishers (name)")
-            conn.execute("CREATE INDEX IF NOT EXISTS idx_votes_voter ON votes (voter_name)")
-            conn.execute("CREATE INDEX IF NOT EXISTS idx_votes_category ON votes (category_id)")
-            conn.execute("CREATE INDEX IF NOT EXISTS idx_votes_selection ON votes (selection)")
+            # Voter lookups use the UNIQUE (voter_id, category_id, rank) index
+            conn.execute("DROP INDEX IF EXISTS idx_votes_item")
+            # Keyset pagination sorts by (column, rowid) - every SQLite index ends in the rowid
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_votes_voter_id ON votes (voter_id)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_votes_category_id ON votes (category_id)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_votes_item_id ON votes (item_id)")
+            
+            # Name-based view of votes for the admin table and the exports
+            conn.execute("DROP VIEW IF EXISTS vote_details")
+            conn.execute(f"CREATE VIEW vote_details AS {VOTE_DETAILS_SQL}")
             
             # Insert default games if table is empty
             cursor = conn.execute("SELECT COUNT(*) FROM games")
             if cursor.fetchone()[0] == 0:
-                games = load_games_from_file()
-                for game in games:
-                    conn.execute("""
-                        INSERT OR IGNORE INTO games (name) 
-                        VALUES (?)
-                    """, (game,))
-                print(f"✅ Inserted {len(games)} games into database")
+                result = import_catalog(conn, 'games', load_games_from_file())
+                print(f"✅ Inserted {result['inserted']} games into database")
             
             # Insert default publishers if table is empty
             cursor = conn.execute("SELECT COUNT(*) FROM publishers")
@@ -319,152 +1293,954 @@ def init_db():
                         VALUES (?, ?, ?, ?)
                     """, (cat_ar, cat_en, desc, order))
         
+        # Build tallies for databases that already had votes before vote_tallies existed
+        if tallies_missing(conn):
+            rebuild_vote_tallies(conn)
+            print("✅ Rebuilt vote_tallies from votes")
+        
         conn.commit()
-
-# ✅ New Route: Get Publishers for Autocomplete
-@app.route('/publishers')
-def get_publishers():
-    search = request.args.get('search', '').strip()
-    limit = request.args.get('limit', 20)
     
-    if DB_TYPE == 'postgres':
-        with get_conn() as conn:
-            with conn.cursor() as cur:
-                if search:
-                    cur.execute("""
-                        SELECT name FROM publishers 
-                        WHERE LOWER(name) LIKE LOWER(%s) 
-                        ORDER BY name 
-                        LIMIT %s
-                    """, (f'%{search}%', limit))
+    init_search_indexes()
+
+# ✅ Make sure the schema exists once per worker (gunicorn never runs __main__)
+# Deploys that run `flask --app app init-db` before starting gunicorn can set
+# INIT_DB_ON_FIRST_REQUEST=0 so no worker pays for schema checks and seeding.
+# A failed init (database down, migration error) answers 503 and is retried by
+# the worker's next request instead of leaving it on the old schema for good.
+INIT_DB_ON_FIRST_REQUEST = os.environ.get('INIT_DB_ON_FIRST_REQUEST', '1') == '1'
+db_initialized = False
+db_init_lock = threading.Lock()
+
+@app.cli.command('init-db')
+def init_db_command():
+    """Create or upgrade the schema and seed the default data"""
+    init_db()
+    print("✅ Database initialized")
+
+@app.before_request
+def ensure_db():
+    global db_initialized
+    if db_initialized:
+        return
+    with db_init_lock:
+        if not db_initialized:
+            try:
+                if INIT_DB_ON_FIRST_REQUEST:
+                    init_db()
                 else:
-                    cur.execute("SELECT name FROM publishers ORDER BY name LIMIT %s", (limit,))
-                publishers = [r[0] for r in cur.fetchall()]
-    else:
-        # SQLite
-        with get_conn() as conn:
-            if search:
-                cursor = conn.execute("""
-                    SELECT name FROM publishers 
-                    WHERE LOWER(name) LIKE LOWER(?) 
-                    ORDER BY name 
-                    LIMIT ?
-                """, (f'%{search}%', limit))
-            else:
-                cursor = conn.execute("SELECT name FROM publishers ORDER BY name LIMIT ?", (limit,))
-            publishers = [r[0] for r in cursor.fetchall()]
-    
-    return jsonify(publishers)
+                    detect_search_backend()
+                if BALLOT_QUEUE:
+                    start_ballot_queue()
+            except Exception as e:
+                print("⚠️ DB init failed, retrying on the next request:", e)
+                return overloaded_response(503, 'الخادم قيد التشغيل، يرجى المحاولة بعد قليل', 1)
+            db_initialized = True
 
-# ✅ Get suggestions based on category type
-@app.route('/suggestions')
-def get_suggestions():
-    category_id = request.args.get('category_id', '')
-    search = request.args.get('search', '').strip()
-    limit = request.args.get('limit', 20)
-    
-    if not category_id:
-        return jsonify([])
-    
-    # Determine which table to use based on category
-    # Category ID 5 is "Best Publisher"
-    # Category ID 8 is "Most Anticipated 2026" (use games_2026 table)
-    # Other categories use regular games table
-    
-    if category_id == '5':
-        # Get publisher suggestions
-        table_name = 'publishers'
-    elif category_id == '8':
-        # Get 2026 games for Most Anticipated 2026 category
-        table_name = 'games_2026'
-    else:
-        # Get regular game suggestions for other categories
-        table_name = 'games'
+# ✅ Rate limiting and load shedding for the public endpoints
+# Token buckets per client IP and route class: RATE_LIMIT_<CLASS>="rate/burst"
+# (tokens per second / bucket size). Buckets live in this worker's memory, or in
+# a shared SQLite file when RATE_LIMIT_DB is set (multi-worker setups). Separately,
+# at most MAX_INFLIGHT limited requests per worker may run at once; the rest get
+# a 503 after LOAD_SHED_WAIT seconds instead of queueing for a DB connection.
+RATE_LIMIT_ENABLED = os.environ.get('RATE_LIMIT', '1') == '1'
+RATE_LIMIT_DB = os.environ.get('RATE_LIMIT_DB')
+RATE_LIMIT_TRUST_PROXY = os.environ.get('RATE_LIMIT_TRUST_PROXY', '0') == '1'
+# Proxies in front of the app that append to X-Forwarded-For (Render: 1)
+RATE_LIMIT_PROXY_HOPS = int(os.environ.get('RATE_LIMIT_PROXY_HOPS', 1))
+MAX_INFLIGHT = int(os.environ.get('MAX_INFLIGHT', DB_POOL_SIZE))
+LOAD_SHED_WAIT = float(os.environ.get('LOAD_SHED_WAIT', 0.5))
+
+def parse_rate_limit(value):
+    rate, burst = value.split('/')
+    return float(rate), float(burst)
+
+RATE_LIMITS = {
+    'autocomplete': parse_rate_limit(os.environ.get('RATE_LIMIT_AUTOCOMPLETE', '10/40')),
+    'lookup': parse_rate_limit(os.environ.get('RATE_LIMIT_LOOKUP', '2/20')),
+    'submit': parse_rate_limit(os.environ.get('RATE_LIMIT_SUBMIT', '0.2/5')),
+}
+# endpoint -> route class
+RATE_LIMITED_ENDPOINTS = {
+    'get_suggestions': 'autocomplete',
+    'get_games': 'autocomplete',
+    'get_publishers': 'autocomplete',
+    'check_name': 'lookup',
+    'check_vote': 'lookup',
+    'user_results': 'lookup',
+    'submit_vote': 'submit',
+}
+
+class MemoryBucketStore:
+    """Token buckets for this worker only"""
+    def __init__(self):
+        self.buckets = {}
+        self.lock = threading.Lock()
+        self.pruned_at = time.time()
+
+    def take(self, key, rate, burst):
+        """Take one token. Returns (allowed, tokens left)."""
+        now = time.time()
+        with self.lock:
+            tokens, updated = self.buckets.get(key, (burst, now))
+            tokens = min(burst, tokens + (now - updated) * rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self.buckets[key] = (tokens, now)
+            if now - self.pruned_at > 60:
+                # Idle buckets are full again - no need to remember them
+                self.buckets = {k: v for k, v in self.buckets.items() if now - v[1] < 3600}
+                self.pruned_at = now
+        return allowed, tokens
+
+class SQLiteBucketStore:
+    """Token buckets shared by every worker on the host through one SQLite file.
+
+    The refill-and-take is a single UPSERT, so concurrent workers can't both
+    spend the same token.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.local = threading.local()
+        self.pruned_at = time.time()
+
+    def connection(self):
+        conn = getattr(self.local, 'conn', None)
+        if conn is None or self.local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=1, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=OFF")  # losing buckets on a crash is harmless
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS rate_buckets (
+                    key TEXT PRIMARY KEY,
+                    tokens REAL NOT NULL,
+                    updated REAL NOT NULL,
+                    allowed INTEGER NOT NULL
+                )""")
+            self.local.conn = conn
+            self.local.pid = os.getpid()
+        return conn
+
+    def take(self, key, rate, burst):
+        now = time.time()
+        conn = self.connection()
+        cursor = conn.execute("""
+            INSERT INTO rate_buckets (key, tokens, updated, allowed)
+            VALUES (:key, :burst - 1, :now, 1)
+            ON CONFLICT (key) DO UPDATE SET
+                tokens = MIN(:burst, tokens + (:now - updated) * :rate)
+                         - (MIN(:burst, tokens + (:now - updated) * :rate) >= 1),
+                allowed = MIN(:burst, tokens + (:now - updated) * :rate) >= 1,
+                updated = :now
+            RETURNING allowed, tokens
+        """, {'key': key, 'rate': rate, 'burst': burst, 'now': now})
+        allowed, tokens = cursor.fetchone()
+        cursor.close()
+        if now - self.pruned_at > 60:
+            self.pruned_at = now
+            conn.execute("DELETE FROM rate_buckets WHERE updated < ?", (now - 3600,))
+        return bool(allowed), tokens
+
+rate_limit_store = SQLiteBucketStore(RATE_LIMIT_DB) if RATE_LIMIT_DB else MemoryBucketStore()
+inflight_slots = threading.BoundedSemaphore(MAX_INFLIGHT)
+
+def client_address():
+    if RATE_LIMIT_TRUST_PROXY:
+        # Only the entries our own proxies appended are trustworthy - anything to
+        # their left came from the client and can change on every request
+        forwarded = [part.strip() for part in request.headers.get('X-Forwarded-For', '').split(',') if part.strip()]
+        if RATE_LIMIT_PROXY_HOPS > 0 and len(forwarded) >= RATE_LIMIT_PROXY_HOPS:
+            return forwarded[-RATE_LIMIT_PROXY_HOPS]
+    return request.remote_addr or 'unknown'
+
+def overloaded_response(status, message, retry_after):
+    response = jsonify({'status': 'error', 'message': message})
+    response.status_code = status
+    response.headers['Retry-After'] = str(max(1, int(retry_after + 0.999)))
+    return response
+
+def rate_limited_response(route_class):
+    """Take a token from the client's bucket; returns a 429 response when it is empty"""
+    rate, burst = RATE_LIMITS[route_class]
+    try:
+        allowed, tokens = rate_limit_store.take(f"{route_class}:{client_address()}", rate, burst)
+    except sqlite3.Error as e:
+        # A broken limiter store must not take the site down
+        print(f"⚠️ Rate limiter unavailable: {e}")
+        allowed, tokens = True, 0
+    if not allowed:
+        return overloaded_response(429, 'طلبات كثيرة جداً، يرجى المحاولة بعد قليل', (1 - tokens) / rate)
+    return None
+
+@app.before_request
+def rate_limit():
+    route_class = RATE_LIMITED_ENDPOINTS.get(request.endpoint)
+    if route_class is None or not RATE_LIMIT_ENABLED:
+        return None
     
-    if DB_TYPE == 'postgres':
-        with get_conn() as conn:
-            with conn.cursor() as cur:
-                if search:
-                    cur.execute(f"""
-                        SELECT name FROM {table_name} 
-                        WHERE LOWER(name) LIKE LOWER(%s) 
-                        ORDER BY name 
-                        LIMIT %s
-                    """, (f'%{search}%', limit))
-                else:
-                    cur.execute(f"SELECT name FROM {table_name} ORDER BY name LIMIT %s", (limit,))
-                suggestions = [r[0] for r in cur.fetchall()]
-    else:
-        # SQLite
-        with get_conn() as conn:
-            if search:
-                cursor = conn.execute(f"""
-                    SELECT name FROM {table_name} 
-                    WHERE LOWER(name) LIKE LOWER(?) 
-                    ORDER BY name 
-                    LIMIT ?
-                """, (f'%{search}%', limit))
-            else:
-                cursor = conn.execute(f"SELECT name FROM {table_name} ORDER BY name LIMIT ?", (limit,))
-            suggestions = [r[0] for r in cursor.fetchall()]
+    limited = rate_limited_response(route_class)
+    if limited is not None:
+        return limited
     
-    return jsonify(suggestions)
+    if not inflight_slots.acquire(timeout=LOAD_SHED_WAIT):
+        return overloaded_response(503, 'الخادم مشغول حالياً، يرجى المحاولة بعد قليل', 1)
+    g.inflight_slot = True
+    return None
 
-# ✅ Helpers
-def sanitize_input(text):
-    return re.sub(r'[;\'"\\&/*]', '', text).strip() if text else text
+@app.teardown_request
+def release_inflight_slot(exc):
+    if g.pop('inflight_slot', False):
+        inflight_slots.release()
 
-# ✅ Routes
-@app.route('/')
-def index():
-    return render_template('index.html')
+def database_busy(e):
+    return overloaded_response(503, 'الخادم مشغول حالياً، يرجى المحاولة بعد قليل', 1)
 
-@app.route('/results')
-def results():
-    username = request.args.get('username')
-    return render_template('results.html', username=username) if username else redirect('/')
+for busy_error in DB_BUSY_ERRORS:
+    app.register_error_handler(busy_error, database_busy)
 
-@app.route('/user-results/<username>')
-def user_results(username):
-    username = sanitize_input(username)
-    
-    if DB_TYPE == 'postgres':
-        with get_conn() as conn:
-            with conn.cursor() as cur:
-                # Get user's votes with category names
-                cur.execute("""
-                    SELECT v.id, c.name_ar, v.category_id, v.rank, v.selection, v.points, v.timestamp
-                    FROM votes v
-                    JOIN categories c ON v.category_id = c.id
-                    WHERE v.voter_name = %s
-                    ORDER BY c.display_order, v.rank
-                """, (username,))
-                rows = cur.fetchall()
-                
-                # Count total voters
-                cur.execute("SELECT COUNT(DISTINCT voter_name) FROM votes")
-                total_voters = cur.fetchone()[0]
+# ✅ Data versions and conditional responses
+# Every write bumps its table's version in this worker. /categories is served
+# from a per-worker snapshot rebuilt when the version moves (or after
+# CATEGORIES_MAX_AGE seconds, to pick up other workers' edits); the catalog
+# routes answer from the in-memory autocomplete index. ETags are derived from
+# the content, so every worker gives a browser or proxy the same tag and a
+# revalidation gets a 304 without touching the database.
+CATEGORIES_MAX_AGE = int(os.environ.get('CATEGORIES_MAX_AGE', 30))
+# Seconds browsers/proxies may reuse a response before revalidating (0 = always revalidate)
+CATALOG_MAX_AGE = int(os.environ.get('CATALOG_MAX_AGE', 0))
+
+data_versions = {'votes': 0, 'categories': 0, 'games': 0, 'publishers': 0, 'games_2026': 0}
+categories_snapshot = None
+categories_lock = threading.Lock()
+
+def bump_data_version(table_name):
+    data_versions[table_name] = data_versions.get(table_name, 0) + 1
+
+def http_now():
+    """Current time at HTTP-date (whole second) precision"""
+    return datetime.now(timezone.utc).replace(microsecond=0)
+
+def conditional_response(response, etag, last_modified):
+    response.set_etag(etag)
+    response.last_modified = last_modified
+    response.cache_control.public = True
+    if CATALOG_MAX_AGE:
+        response.cache_control.max_age = CATALOG_MAX_AGE
     else:
-        # SQLite
-        with get_conn() as conn:
-            # Get user's votes with category names
-            cursor = conn.execute("""
-                SELECT v.id, c.name_ar, v.category_id, v.rank, v.selection, v.points, v.timestamp
-                FROM votes v
-                JOIN categories c ON v.category_id = c.id
-                WHERE v.voter_name = ?
-                ORDER BY c.display_order, v.rank
-            """, (username,))
-            rows = cursor.fetchall()
-            
-            # Count total voters
-            cursor = conn.execute("SELECT COUNT(DISTINCT voter_name) FROM votes")
-            total_voters = cursor.fetchone()[0]
-    
-    if not rows:
-        return jsonify({
-            'status': 'success',
-            'username': username,
+        response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
+def categories_snapshot_stale(snapshot):
+    return snapshot is None or snapshot['version'] != data_versions['categories'] \
+        or time.monotonic() - snapshot['built_at'] > CATEGORIES_MAX_AGE
+
+def build_categories_snapshot(version, previous):
+    with get_conn() as conn:
+        return categories_snapshot_from_rows(fetch_all(conn, 'categories.list'), version, previous)
+
+def categories_snapshot_from_rows(rows, version, previous):
+    categories = [{
+        "id": r[0],
+        "name_ar": r[1],
+        "name_en": r[2],
+        "description": r[3]
+    } for r in rows]
+    body = app.json.dumps(categories).encode('utf-8') + b'\n'
+    etag = hashlib.sha256(body).hexdigest()[:32]
+    # A rebuild that finds the same content keeps the old Last-Modified
+    unchanged = previous is not None and previous['etag'] == etag
+    return {
+        'version': version,
+        'built_at': time.monotonic(),
+        'ids': frozenset(category['id'] for category in categories),
+        'body': body,
+        'etag': etag,
+        'last_modified': previous['last_modified'] if unchanged else http_now()
+    }
+
+def get_categories_snapshot():
+    global categories_snapshot
+    snapshot = categories_snapshot
+    if not categories_snapshot_stale(snapshot):
+        return snapshot
+    with categories_lock:
+        if categories_snapshot is not snapshot:
+            return categories_snapshot
+        categories_snapshot = build_categories_snapshot(data_versions['categories'], snapshot)
+        return categories_snapshot
+
+def known_category_ids():
+    return get_categories_snapshot()['ids']
+
+def name_fingerprint(name):
+    return int.from_bytes(hashlib.blake2b(name.encode('utf-8'), digest_size=8).digest(), 'big')
+
+# ✅ In-memory autocomplete index (games, publishers, games_2026)
+# Each worker keeps its own copy; writes in this process update it directly and
+# the whole index is reloaded every AUTOCOMPLETE_REFRESH_SECONDS so that writes
+# made by other gunicorn workers show up too.
+AUTOCOMPLETE_TABLES = ('games', 'publishers', 'games_2026')
+AUTOCOMPLETE_REFRESH_SECONDS = int(os.environ.get('AUTOCOMPLETE_REFRESH_SECONDS', 60))
+AUTOCOMPLETE_NGRAM = 3
+
+# Single source of truth for Arabic letter folding, shared by normalize_text and
+# the admin search indexes (SEARCH_FOLD). Deletions stay last so Postgres
+# translate() can drop them by leaving the target string short.
+# normalize_text already splits hamza forms and harakat via NFKD; the search
+# indexes fold raw column text in SQL, so they need the explicit pairs.
+ARABIC_LETTER_FOLD = [
+    ('أ', 'ا'), ('إ', 'ا'), ('آ', 'ا'), ('ٱ', 'ا'),  # hamza forms, alef wasla
+    ('ى', 'ي'), ('ئ', 'ي'), ('ؤ', 'و'), ('ة', 'ه'),  # alef maksura, teh marbuta
+] + [(mark, '') for mark in 'ًٌٍَُِّْـ']  # harakat + tatweel
+ARABIC_LETTER_MAP = str.maketrans(dict(ARABIC_LETTER_FOLD))
+
+def normalize_text(text):
+    """Fold case, Latin accents and Arabic diacritics/hamza forms for matching"""
+    if not text:
+        return ''
+    # NFKD splits أ/إ/آ/ؤ/ئ and accented Latin letters into base + combining mark,
+    # and Arabic harakat are combining marks themselves, so dropping Mn/Me folds them all
+    text = unicodedata.normalize('NFKD', text)
+    text = ''.join(ch for ch in text if not unicodedata.combining(ch))
+    text = text.translate(ARABIC_LETTER_MAP).casefold()
+    return ' '.join(text.split())
+
+# Standalone II..IX read as digits so "Hades II" and "Hades 2" share a key
+# (X is left alone: "Mega Man X" is not "Mega Man 10")
+ROMAN_NUMERALS = {'ii': '2', 'iii': '3', 'iv': '4', 'v': '5', 'vi': '6', 'vii': '7', 'viii': '8', 'ix': '9'}
+
+def title_key(text):
+    """Spelling-insensitive identity of a title: folded, punctuation dropped, numerals unified"""
+    folded = re.sub(r"['’]", '', normalize_text(text))
+    words = re.sub(r'[^\w\s]|_', ' ', folded).split()
+    return ' '.join(ROMAN_NUMERALS.get(word, word) for word in words)
+
+class _TrieNode:
+    __slots__ = ('children', 'ids')
+
+    def __init__(self):
+        self.children = {}
+        self.ids = set()
+
+class AutocompleteIndex:
+    """Prefix trie over every word start plus an n-gram index for substring matches.
+
+    Also resolves free-text selections to the catalog's spelling: by title_key,
+    then through title_aliases (alias key -> canonical name).
+    """
+
+    def __init__(self, names=(), aliases=()):
+        self.lock = threading.Lock()
+        self.names = {}       # entry id -> original name
+        self.folded = {}      # entry id -> normalized name
+        self.by_name = {}     # original name -> entry id
+        self.by_key = {}      # title_key -> first name with that key
+        self.sorted_names = []  # every name in order, for the empty search
+        self.aliases = dict(aliases)
+        self.trie = _TrieNode()
+        self.ngrams = {}      # n-gram -> set of entry ids
+        self.next_id = 0
+        self.loaded_at = time.monotonic()
+        # XOR of name fingerprints: order-independent, so every worker holding
+        # the same names has the same value, and add/remove update it in O(1)
+        self.fingerprint = 0
+        self.modified_at = http_now()
+        for name in names:
+            self._add(name, keep_sorted=False)
+        self.sorted_names.sort()
+
+    def _word_starts(self, folded):
+        yield folded
+        for match in re.finditer(r'[\s:\-_.,!?()]+', folded):
+            if match.end() < len(folded):
+                yield folded[match.end():]
+
+    def _grams(self, folded):
+        return {folded[i:i + AUTOCOMPLETE_NGRAM] for i in range(len(folded) - AUTOCOMPLETE_NGRAM + 1)}
+
+    def _add(self, name, keep_sorted=True):
+        if not name or name in self.by_name:
+            return
+        if keep_sorted:
+            bisect.insort(self.sorted_names, name)
+        else:
+            self.sorted_names.append(name)
+        eid = self.next_id
+        self.next_id += 1
+        folded = normalize_text(name)
+        self.names[eid] = name
+        self.folded[eid] = folded
+        self.by_name[name] = eid
+        self.by_key.setdefault(title_key(name), name)
+        self.fingerprint ^= name_fingerprint(name)
+
+        for start in self._word_starts(folded):
+            node = self.trie
+            for ch in start:
+                node = node.children.setdefault(ch, _TrieNode())
+                node.ids.add(eid)
+
+        for gram in self._grams(folded):
+            self.ngrams.setdefault(gram, set()).add(eid)
+
+    def _remove(self, name):
+        eid = self.by_name.pop(name, None)
+        if eid is None:
+            return
+        folded = self.folded.pop(eid)
+        del self.names[eid]
+        del self.sorted_names[bisect.bisect_left(self.sorted_names, name)]
+        key = title_key(name)
+        if self.by_key.get(key) == name:
+            del self.by_key[key]
+        self.fingerprint ^= name_fingerprint(name)
+
+        for start in self._word_starts(folded):
+            node = self.trie
+            for ch in start:
+                node = node.children.get(ch)
+                if node is None:
+                    break
+                node.ids.discard(eid)
+
+        for gram in self._grams(folded):
+            bucket = self.ngrams.get(gram)
+            if bucket is not None:
+                bucket.discard(eid)
+                if not bucket:
+                    del self.ngrams[gram]
+
+    def add(self, name):
+        with self.lock:
+            before = self.fingerprint
+            self._add(name)
+            self._touch(before)
+
+    def remove(self, name):
+        with self.lock:
+            before = self.fingerprint
+            self._remove(name)
+            self._touch(before)
+
+    def rename(self, old_name, new_name):
+        with self.lock:
+            before = self.fingerprint
+            self._remove(old_name)
+            self._add(new_name)
+            self._touch(before)
+
+    def _touch(self, before):
+        if self.fingerprint != before:
+            self.modified_at = http_now()
+
+    def etag(self):
+        return f"{self.fingerprint:016x}"
+
+    def resolve(self, name):
+        """Canonical catalog name for a spelling, or None if the title is unknown"""
+        key = title_key(name)
+        with self.lock:
+            return self.aliases.get(key) or self.by_key.get(key)
+
+    def search(self, term, limit=20):
+        """Return up to `limit` names: name prefix first, then word prefix, then substring.
+
+        Terms shorter than an n-gram (the first keystrokes) only match word
+        prefixes - a substring match would have to scan every name.
+        """
+        term = normalize_text(term)
+        with self.lock:
+            if not term:
+                return self.sorted_names[:limit]
+
+            node = self.trie
+            for ch in term:
+                node = node.children.get(ch)
+                if node is None:
+                    break
+            prefix_ids = node.ids if node is not None else set()
+
+            substring_ids = set()
+            if len(term) >= AUTOCOMPLETE_NGRAM:
+                candidates = None
+                for gram in self._grams(term):
+                    bucket = self.ngrams.get(gram, set())
+                    candidates = bucket if candidates is None else candidates & bucket
+                    if not candidates:
+                        break
+                substring_ids = {eid for eid in candidates or () if term in self.folded[eid]}
+
+            matches = [
+                (0 if self.folded[eid].startswith(term) else 1 if eid in prefix_ids else 2, self.names[eid])
+                for eid in prefix_ids | substring_ids
+            ]
+        return [name for _, name in heapq.nsmallest(limit, matches)]
+
+autocomplete_indexes = {}
+autocomplete_lock = threading.Lock()
+
+for table_name in AUTOCOMPLETE_TABLES:
+    register_query(f'{table_name}.names', f"SELECT name FROM {table_name}")
+    register_query(f'{table_name}.insert_missing',
+                   f"INSERT OR IGNORE INTO {table_name} (name) VALUES (?)",
+                   f"INSERT INTO {table_name} (name) VALUES (%s) ON CONFLICT (name) DO NOTHING")
+    register_query(f'{table_name}.aliases', f"""
+        SELECT a.alias, t.name FROM title_aliases a JOIN {table_name} t ON t.id = a.title_id
+        WHERE a.catalog = ?
+    """)
+    register_query(f'{table_name}.ids', f"SELECT id, name FROM {table_name}")
+    register_query(f'{table_name}.id_for', f"SELECT id FROM {table_name} WHERE name = ?")
+    register_query(f'{table_name}.delete', f"DELETE FROM {table_name} WHERE id = ?")
+    register_query(f'{table_name}.has_votes', f"""
+        SELECT 1 FROM votes WHERE item_id = ? AND {catalog_categories_sql(table_name, 'category_id')} LIMIT 1
+    """)
+
+def load_catalog_names(table_name):
+    """Read every name of an autocomplete table"""
+    with get_conn() as conn:
+        return [row[0] for row in fetch_all(conn, f'{table_name}.names')]
+
+def load_title_aliases(table_name):
+    """(alias key, canonical name) pairs of a catalog table"""
+    with get_conn() as conn:
+        return fetch_all(conn, f'{table_name}.aliases', (table_name,))
+
+def autocomplete_stale(index):
+    return index is None or time.monotonic() - index.loaded_at > AUTOCOMPLETE_REFRESH_SECONDS
+
+def build_autocomplete_index(names, aliases, previous):
+    index = AutocompleteIndex(names, aliases)
+    # A reload that finds the same names keeps the old Last-Modified
+    if previous is not None and previous.fingerprint == index.fingerprint:
+        index.modified_at = previous.modified_at
+    return index
+
+def get_autocomplete(table_name):
+    """Return the index for a table, building or refreshing it when needed"""
+    index = autocomplete_indexes.get(table_name)
+    if autocomplete_stale(index):
+        with autocomplete_lock:
+            index = autocomplete_indexes.get(table_name)
+            if autocomplete_stale(index):
+                index = build_autocomplete_index(load_catalog_names(table_name), load_title_aliases(table_name), index)
+                autocomplete_indexes[table_name] = index
+    return index
+
+def load_autocomplete_indexes():
+    for table_name in AUTOCOMPLETE_TABLES:
+        get_autocomplete(table_name)
+    print("✅ Autocomplete indexes loaded")
+
+def autocomplete_added(table_name, name):
+    bump_data_version(table_name)
+    index = autocomplete_indexes.get(table_name)
+    if index is not None and name:
+        index.add(name)
+
+def autocomplete_renamed(table_name, old_name, new_name):
+    bump_data_version(table_name)
+    # Votes reference the row, so the rename shows up in every vote and ranking
+    bump_data_version('votes')
+    index = autocomplete_indexes.get(table_name)
+    if index is not None and old_name:
+        index.rename(old_name, new_name)
+
+def autocomplete_removed(table_name, name):
+    bump_data_version(table_name)
+    index = autocomplete_indexes.get(table_name)
+    if index is not None and name:
+        index.remove(name)
+
+def catalog_response(table_name, search, limit):
+    return index_response(get_autocomplete(table_name), search, limit)
+
+def index_response(index, search, limit):
+    # The tag covers the index content; search and limit are part of the URL
+    return conditional_response(jsonify(index.search(search, limit)), index.etag(), index.modified_at)
+
+def parse_limit(value, default=20, maximum=100):
+    try:
+        return max(1, min(int(value), maximum))
+    except (TypeError, ValueError):
+        return default
+
+# ✅ New Route: Get Publishers for Autocomplete
+@app.route('/publishers')
+def get_publishers():
+    search = request.args.get('search', '').strip()
+    limit = parse_limit(request.args.get('limit', 20))
+    return catalog_response('publishers', search, limit)
+
+# ✅ Get suggestions based on category type
+def suggestions_table(category_id):
+    # Determine which table to use based on category
+    # Category ID 5 is "Best Publisher"
+    # Category ID 8 is "Most Anticipated 2026" (use games_2026 table)
+    # Other categories use regular games table
+    
+    if category_id == '5':
+        # Get publisher suggestions
+        return 'publishers'
+    elif category_id == '8':
+        # Get 2026 games for Most Anticipated 2026 category
+        return 'games_2026'
+    else:
+        # Get regular game suggestions for other categories
+        return 'games'
+
+@app.route('/suggestions')
+def get_suggestions():
+    category_id = request.args.get('category_id', '')
+    search = request.args.get('search', '').strip()
+    limit = parse_limit(request.args.get('limit', 20))
+    
+    if not category_id:
+        return jsonify([])
+    
+    return catalog_response(suggestions_table(category_id), search, limit)
+
+# ✅ Helpers
+def sanitize_input(text):
+    return re.sub(r'[;\'"\\&/*]', '', text).strip() if text else text
+
+def catalog_table_for(cat_id):
+    """Catalog table that receives auto-added selections for a category"""
+    return CATEGORY_CATALOGS.get(cat_id, 'games')
+
+# ✅ Ballot validation and batched insert
+def canonical_title(cat_id, selection):
+    """The catalog's spelling of a selection, or the selection itself for a new title"""
+    return get_autocomplete(catalog_table_for(cat_id)).resolve(selection) or selection
+
+def ballot_title(ballot_titles, cat_id, selection):
+    """canonical_title, with new titles spelt two ways in one ballot kept to the first spelling"""
+    selection = canonical_title(cat_id, selection)
+    key = (catalog_table_for(cat_id), title_key(selection) or selection)
+    return ballot_titles.setdefault(key, selection)
+
+def parse_ballot(votes_by_category):
+    """Validate a whole ballot and flatten it into rows.
+
+    Returns (vote_rows, catalog_rows): vote_rows are (category_id, rank,
+    selection, points) tuples, catalog_rows are unique (table, name) pairs.
+    Selections are stored under their canonical catalog title when one is known.
+    Raises ValueError with a user-facing message if anything is invalid.
+    """
+    if not isinstance(votes_by_category, dict):
+        raise ValueError('Invalid votes payload')
+    
+    vote_rows = []
+    ballot_titles = {}
+    for category_id, selections in votes_by_category.items():
+        try:
+            cat_id = int(category_id)
+        except (TypeError, ValueError):
+            raise ValueError(f'Invalid category: {category_id}')
+        # Unknown ids would only fail at insert time - after a queued ballot was acknowledged
+        if cat_id not in known_category_ids():
+            raise ValueError(f'Invalid category: {category_id}')
+        
+        # Best Games 2025 - 5 ranked positions, top 3 required
+        if cat_id == 9:
+            if not isinstance(selections, list) or len(selections) != 5:
+                raise ValueError('فئة "أفضل ألعاب 2025" تحتاج لاختيار 5 مراكز (3 مطلوبة)')
+            selections = [sanitize_input(s) if isinstance(s, str) else '' for s in selections]
+            for i in range(3):
+                if not selections[i]:
+                    raise ValueError(f'اللعبة في المركز {i+1} مطلوبة')
+            selections = [ballot_title(ballot_titles, cat_id, s) if s else s for s in selections]
+            filled = [s for s in selections if s]
+            if len(set(filled)) != len(filled):
+                raise ValueError('لا يمكن تكرار اللعبة نفسها في أكثر من مركز')
+            for rank, selection in enumerate(selections, start=1):
+                # Skip empty optional positions
+                if selection:
+                    vote_rows.append((cat_id, rank, selection, POINT_SYSTEM.get(rank, 0)))
+        
+        # Every other category - single selection worth 5 points
+        else:
+            if not isinstance(selections, list) or len(selections) != 1:
+                raise ValueError(f'الفئة {cat_id} تحتاج لاختيار واحد فقط')
+            selection = sanitize_input(selections[0]) if isinstance(selections[0], str) else ''
+            if selection:
+                vote_rows.append((cat_id, 1, ballot_title(ballot_titles, cat_id, selection), 5))
+    
+    if not vote_rows:
+        raise ValueError('No selections submitted')
+    
+    catalog_rows = list(dict.fromkeys(
+        (catalog_table_for(cat_id), selection) for cat_id, _, selection, _ in vote_rows
+    ))
+    return vote_rows, catalog_rows
+
+def alias_targets(aliases, catalog_rows):
+    """{(table, name): canonical name} for ballot names whose title_key is a stored alias
+    (aliases: {table: {alias key: canonical name}})"""
+    targets = {}
+    for row_table, name in catalog_rows:
+        canonical = aliases.get(row_table, {}).get(title_key(name))
+        if canonical and canonical != name:
+            targets[(row_table, name)] = canonical
+    return targets
+
+def stored_alias_targets(conn, catalog_rows):
+    """alias_targets for the aliases the database lists"""
+    aliases = {table_name: dict(fetch_all(conn, f'{table_name}.aliases', (table_name,)))
+               for table_name in sorted({table_name for table_name, _ in catalog_rows})}
+    return alias_targets(aliases, catalog_rows)
+
+def retarget_ballot(targets, vote_rows, catalog_rows):
+    """Point a ballot's merged-away spellings at their canonical titles"""
+    if not targets:
+        return vote_rows, catalog_rows
+    # This worker's index missed the merge - rebuild it on next use
+    for table_name, _ in targets:
+        autocomplete_indexes.pop(table_name, None)
+    vote_rows = [(cat_id, rank, targets.get((catalog_table_for(cat_id), selection), selection), points)
+                 for cat_id, rank, selection, points in vote_rows]
+    catalog_rows = list(dict.fromkeys((t, targets.get((t, n), n)) for t, n in catalog_rows))
+    return vote_rows, catalog_rows
+
+def ballot_catalog_names(catalog_rows):
+    catalog_names = {table_name: [] for table_name in AUTOCOMPLETE_TABLES}
+    for table_name, selection in catalog_rows:
+        catalog_names[table_name].append(selection)
+    return catalog_names
+
+# Postgres: AUTO-ADD new games / publishers / 2026 games first - votes reference their ids
+BALLOT_CATALOG_INSERT_SQL = """
+    WITH new_games AS (
+        INSERT INTO games (name) SELECT unnest(%s::text[])
+        ON CONFLICT (name) DO NOTHING
+    ), new_publishers AS (
+        INSERT INTO publishers (name) SELECT unnest(%s::text[])
+        ON CONFLICT (name) DO NOTHING
+    ), new_games_2026 AS (
+        INSERT INTO games_2026 (name) SELECT unnest(%s::text[])
+        ON CONFLICT (name) DO NOTHING
+    )
+    SELECT 1
+"""
+
+def ballot_votes_insert(name, vote_rows):
+    """Postgres: ballot + all votes in one statement. Returns (sql, params)."""
+    values = ', '.join(['(%s::integer, %s::integer, %s::text, %s::integer)'] * len(vote_rows))
+    sql = f"""
+        WITH ballot AS (
+            INSERT INTO ballots (voter_name) VALUES (%s) RETURNING id
+        )
+        INSERT INTO votes (voter_id, category_id, rank, item_id, points)
+        SELECT ballot.id, v.category_id, v.rank, {item_id_sql('v.category_id', 'v.selection')}, v.points
+        FROM ballot, (VALUES {values}) AS v (category_id, rank, selection, points)
+        RETURNING category_id, rank, item_id, points
+    """
+    return sql, [name] + [value for row in vote_rows for value in row]
+
+def insert_ballot(conn, name, vote_rows, catalog_rows):
+    """Write a validated ballot: the ballot row, all votes and all catalog auto-adds.
+
+    Returns the catalog rows as written. Raises IntegrityError if the voter
+    already has a ballot. Caller commits.
+    """
+    # parse_ballot resolved names with this worker's autocomplete index, which
+    # can predate a merge made by another worker - re-check the stored aliases
+    # so a merged-away spelling never comes back as a catalog row
+    vote_rows, catalog_rows = retarget_ballot(stored_alias_targets(conn, catalog_rows), vote_rows, catalog_rows)
+    catalog_names = ballot_catalog_names(catalog_rows)
+    
+    if DB_TYPE == 'postgres':
+        with conn.cursor() as cur:
+            cur.execute(BALLOT_CATALOG_INSERT_SQL,
+                        (catalog_names['games'], catalog_names['publishers'], catalog_names['games_2026']))
+            cur.execute(*ballot_votes_insert(name, vote_rows))
+            item_rows = cur.fetchall()
+    else:
+        # SQLite
+        # ✅ AUTO-ADD new games / publishers / 2026 games first - votes reference their ids
+        for table_name, names in catalog_names.items():
+            if names:
+                run_many(conn, f'{table_name}.insert_missing', [(n,) for n in names])
+        
+        voter_id = run_query(conn, 'ballots.insert', (name,)).lastrowid
+        run_many(conn, 'votes.insert', [(voter_id,) + row for row in vote_rows])
+        item_rows = fetch_all(conn, 'votes.for_voter_id', (voter_id,))
+    
+    apply_tally_deltas(conn, ballot_tally_deltas(item_rows))
+    return catalog_rows
+
+# ✅ Vote tallies (incrementally maintained ranking aggregate)
+# Each delta is (category_id, item_id, points, voters, votes, rank_sum).
+# `voters` counts distinct voters, so it only moves when a voter gains their
+# first or loses their last row for that (category, item).
+def ballot_tally_deltas(vote_rows):
+    """Deltas for a brand new voter's ballot - rows are (category_id, rank, item_id, points)"""
+    deltas = {}
+    for cat_id, rank, item_id, points in vote_rows:
+        key = (cat_id, item_id)
+        d_points, d_voters, d_votes, d_rank_sum = deltas.get(key, (0, 0, 0, 0))
+        deltas[key] = (d_points + points, 1, d_votes + 1, d_rank_sum + rank)
+    return [key + value for key, value in deltas.items()]
+
+def apply_tally_deltas(conn, deltas):
+    """Add deltas to vote_tallies inside the caller's transaction"""
+    if not deltas:
+        return
+    run_many(conn, 'tallies.apply', deltas)
+    if any(d[4] < 0 for d in deltas):
+        run_query(conn, 'tallies.prune')
+
+def edit_tally_deltas(conn, old, new_item_id, new_rank, new_points):
+    """Deltas for an already-applied UPDATE of one vote row (old = voter_id, category, rank, item_id, points)"""
+    voter_id, cat_id, old_rank, old_item_id, old_points = old
+    if old_item_id == new_item_id:
+        return [(cat_id, new_item_id, new_points - (old_points or 0), 0, 0, new_rank - (old_rank or 0))]
+    lost_voter = 0 if voter_has_item(conn, voter_id, cat_id, old_item_id) else -1
+    # The edited row itself now carries new_item_id, so only count the voter if it is their only one
+    gained_voter = 1 if new_item_is_first(conn, voter_id, cat_id, new_item_id) else 0
+    return [
+        (cat_id, old_item_id, -(old_points or 0), lost_voter, -1, -(old_rank or 0)),
+        (cat_id, new_item_id, new_points, gained_voter, 1, new_rank),
+    ]
+
+def new_item_is_first(conn, voter_id, cat_id, item_id):
+    return fetch_value(conn, 'votes.selection_count', (voter_id, cat_id, item_id)) == 1
+
+def delete_tally_deltas(conn, old):
+    """Deltas for an already-applied DELETE of one vote row"""
+    voter_id, cat_id, old_rank, old_item_id, old_points = old
+    lost_voter = 0 if voter_has_item(conn, voter_id, cat_id, old_item_id) else -1
+    return [(cat_id, old_item_id, -(old_points or 0), lost_voter, -1, -(old_rank or 0))]
+
+def voter_has_item(conn, voter_id, cat_id, item_id):
+    """Whether the voter still has any row for this (category, item)"""
+    return fetch_one(conn, 'votes.has_selection', (voter_id, cat_id, item_id)) is not None
+
+def tallies_missing(conn):
+    """True when votes exist but vote_tallies is empty"""
+    return bool(fetch_value(conn, 'tallies.missing'))
+
+def rebuild_vote_tallies(conn):
+    """Recompute vote_tallies from scratch. Caller commits."""
+    run_query(conn, 'tallies.clear')
+    run_query(conn, 'tallies.rebuild')
+
+@app.cli.command('rebuild-tallies')
+def rebuild_tallies_command():
+    """Recompute vote_tallies from the votes table"""
+    init_db()
+    with get_conn() as conn:
+        rebuild_vote_tallies(conn)
+        conn.commit()
+    print("✅ vote_tallies rebuilt")
+
+# ✅ Voter registry (answers "has this name voted?" from memory)
+# Each worker keeps the names in `ballots` and catches up with ballots committed
+# by other workers before trusting a "no": on SQLite only when PRAGMA
+# data_version says another connection committed (no table is read), on Postgres
+# at most every VOTER_REGISTRY_SYNC_SECONDS. A "yes" is confirmed against ballots,
+# so a name freed by an admin delete in another worker is never reported as taken.
+# The UNIQUE ballots.voter_name constraint remains the real guard on submit.
+VOTER_REGISTRY_SYNC_SECONDS = float(os.environ.get('VOTER_REGISTRY_SYNC_SECONDS', 1))
+VOTER_REGISTRY_COMMIT_SLACK = 30  # seconds a Postgres ballot may sit between created_at and commit
+
+register_query('ballots.names', "SELECT id, voter_name FROM ballots")
+register_query('ballots.after', "SELECT id, voter_name FROM ballots WHERE id > ?")
+register_query('ballots.recent', """
+    SELECT id, voter_name FROM ballots
+    WHERE created_at > LOCALTIMESTAMP - make_interval(secs => ?)
+""")
+register_query('sqlite.data_version', "PRAGMA data_version")
+
+class VoterRegistry:
+    def __init__(self):
+        self.names = set()
+        self.last_id = 0
+        self.synced_at = None
+        self.pid = None
+        self.lock = threading.Lock()
+
+    def load(self):
+        with get_conn() as conn:
+            rows = fetch_all(conn, 'ballots.names')
+            if DB_TYPE != 'postgres':
+                sqlite_local.seen_data_version = (id(conn), fetch_value(conn, 'sqlite.data_version'))
+        with self.lock:
+            self.names = {name for _, name in rows}
+            self.last_id = max((row_id for row_id, _ in rows), default=0)
+            self.synced_at = time.monotonic()
+            self.pid = os.getpid()
+
+    def catch_up(self):
+        """Pull in ballots committed by other workers since the last sync"""
+        with get_conn() as conn:
+            if DB_TYPE == 'postgres':
+                elapsed = time.monotonic() - self.synced_at
+                if elapsed < VOTER_REGISTRY_SYNC_SECONDS:
+                    return
+                # Serial ids are taken before commit, so go by time with some slack
+                started = time.monotonic()
+                rows = fetch_all(conn, 'ballots.recent', (elapsed + VOTER_REGISTRY_COMMIT_SLACK,))
+            else:
+                # SQLite: data_version moves only when another connection commits
+                seen = (id(conn), fetch_value(conn, 'sqlite.data_version'))
+                if getattr(sqlite_local, 'seen_data_version', None) == seen:
+                    return
+                started = time.monotonic()
+                rows = fetch_all(conn, 'ballots.after', (self.last_id,))
+                sqlite_local.seen_data_version = seen
+        with self.lock:
+            for row_id, name in rows:
+                self.names.add(name)
+                self.last_id = max(self.last_id, row_id)
+            self.synced_at = started
+
+    def has_voted(self, name):
+        if self.pid != os.getpid():
+            self.load()
+        if name not in self.names:
+            self.catch_up()
+            if name not in self.names:
+                return False
+        with get_conn() as conn:
+            if fetch_one(conn, 'ballots.exists', (name,)) is not None:
+                return True
+        self.discard(name)
+        return False
+
+    def add(self, name):
+        with self.lock:
+            self.names.add(name)
+
+    def discard(self, name):
+        with self.lock:
+            self.names.discard(name)
+
+voter_registry = VoterRegistry()
+
+# ✅ Routes
+@app.route('/')
+def index():
+    return render_template('index.html')
+
+@app.route('/results')
+def results():
+    username = request.args.get('username')
+    return render_template('results.html', username=username) if username else redirect('/')
+
+@app.route('/user-results/<username>')
+def user_results(username):
+    username = sanitize_input(username)
+    
+    with get_conn() as conn:
+        # Get user's votes with category names
+        rows = fetch_all(conn, 'votes.for_voter', (username,))
+        # Count total voters (one ballot row per voter)
+        total_voters = fetch_value(conn, 'ballots.count')
+    
+    if not rows:
+        return jsonify({
+            'status': 'success',
+            'username': username,
             'user_id': None,
             'votes_by_category': {},
             'total_voters': total_voters,
@@ -497,100 +2273,49 @@ def user_results(username):
 
 @app.route('/categories')
 def get_categories():
-    if DB_TYPE == 'postgres':
-        with get_conn() as conn:
-            with conn.cursor() as cur:
-                cur.execute("SELECT id, name_ar, name_en, description FROM categories ORDER BY display_order")
-                categories = [{
-                    "id": r[0],
-                    "name_ar": r[1],
-                    "name_en": r[2],
-                    "description": r[3]
-                } for r in cur.fetchall()]
-    else:
-        # SQLite
-        with get_conn() as conn:
-            cursor = conn.execute("SELECT id, name_ar, name_en, description FROM categories ORDER BY display_order")
-            rows = cursor.fetchall()
-            categories = [{
-                "id": r[0],
-                "name_ar": r[1],
-                "name_en": r[2],
-                "description": r[3]
-            } for r in rows]
-    return jsonify(categories)
+    snapshot = get_categories_snapshot()
+    response = app.response_class(snapshot['body'], mimetype='application/json')
+    return conditional_response(response, snapshot['etag'], snapshot['last_modified'])
 
 # ✅ New Route: Get Games for Autocomplete
 @app.route('/games')
 def get_games():
     search = request.args.get('search', '').strip()
-    limit = request.args.get('limit', 20)
-    
-    if DB_TYPE == 'postgres':
-        with get_conn() as conn:
-            with conn.cursor() as cur:
-                if search:
-                    cur.execute("""
-                        SELECT name FROM games 
-                        WHERE LOWER(name) LIKE LOWER(%s) 
-                        ORDER BY name 
-                        LIMIT %s
-                    """, (f'%{search}%', limit))
-                else:
-                    cur.execute("SELECT name FROM games ORDER BY name LIMIT %s", (limit,))
-                games = [r[0] for r in cur.fetchall()]
-    else:
-        # SQLite
-        with get_conn() as conn:
-            if search:
-                cursor = conn.execute("""
-                    SELECT name FROM games 
-                    WHERE LOWER(name) LIKE LOWER(?) 
-                    ORDER BY name 
-                    LIMIT ?
-                """, (f'%{search}%', limit))
-            else:
-                cursor = conn.execute("SELECT name FROM games ORDER BY name LIMIT ?", (limit,))
-            games = [r[0] for r in cursor.fetchall()]
-    
-    return jsonify(games)
+    limit = parse_limit(request.args.get('limit', 20))
+    return catalog_response('games', search, limit)
 
 @app.route('/check-vote', methods=['POST'])
 def check_vote():
     name = sanitize_input(request.get_json().get('name', ''))
-    print(f"Checking vote for: {name}")  # Debug log
     
     if not name:
         return jsonify({'status': 'error', 'message': 'Name is required'}), 400
     
-    if DB_TYPE == 'postgres':
-        with get_conn() as conn:
-            with conn.cursor() as cur:
-                cur.execute("SELECT COUNT(*) FROM votes WHERE voter_name=%s", (name,))
-                vote_count = cur.fetchone()[0]
-                print(f"Vote count for {name}: {vote_count}")  # Debug log
-                
-                if vote_count > 0:
-                    cur.execute("""
-                        SELECT c.name_ar, v.rank, v.selection, v.points 
-                        FROM votes v
-                        JOIN categories c ON v.category_id = c.id
-                        WHERE v.voter_name=%s 
-                        ORDER BY c.display_order, v.rank
-                    """, (name,))
-                    votes = cur.fetchall()
-                    return jsonify({
-                        'status': 'exists',
-                        'vote_count': vote_count,
-                        'votes': [{
-                            'category': v[0], 
-                            'rank': v[1], 
-                            'selection': v[2], 
-                            'points': v[3]
-                        } for v in votes]
-                    })
-                else:
-                    return jsonify({'status': 'new'})
+    if not voter_registry.has_voted(name):
+        return jsonify({'status': 'new'})
+    
+    with get_conn() as conn:
+        votes = fetch_all(conn, 'votes.for_voter', (name,))
+    
+    if not votes:
+        return jsonify({'status': 'new'})
+    return jsonify({
+        'status': 'exists',
+        'vote_count': len(votes),
+        'votes': [{
+            'category': v[1], 
+            'rank': v[3], 
+            'selection': v[4], 
+            'points': v[5]
+        } for v in votes]
+    })
+
+def ballot_committed(name, catalog_rows):
+    """Update this worker's registry, versions and indexes after a ballot commits"""
+    voter_registry.add(name)
+    bump_data_version('votes')
+    for table_name, selection in catalog_rows:
+        autocomplete_added(table_name, selection)
 
 @app.route('/submit', methods=['POST'])
 def submit_vote():
@@ -601,214 +2326,342 @@ def submit_vote():
     if not name:
         return jsonify({'status': 'error', 'message': 'Name is required'}), 400
     
+    # Validate the whole ballot before touching the database
+    try:
+        vote_rows, catalog_rows = parse_ballot(votes_by_category)
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+    
+    if voter_registry.has_voted(name):
+        return jsonify({'status': 'error', 'message': 'You have already voted'}), 403
+    
+    if ballot_journal is not None:
+        # Journal it and return - the ballot writer thread commits it shortly
+        if not ballot_journal.append(name, vote_rows, catalog_rows):
+            return jsonify({'status': 'error', 'message': 'You have already voted'}), 403
+        return jsonify({'status': 'success', 'queued': True})
+    
     try:
         with get_conn() as conn:
-            if DB_TYPE == 'postgres':
-                with conn.cursor() as cur:
-                    # Check if user already voted
-                    cur.execute("SELECT 1 FROM votes WHERE voter_name=%s LIMIT 1", (name,))
-                    if cur.fetchone():
-                        return jsonify({'status': 'error', 'message': 'You have already voted'}), 403
-                    
-                    # Process votes for each category
-                    for category_id, selections in votes_by_category.items():
-                        cat_id = int(category_id)
-                        
-                        # Check if this is "Best Games 2025" category (category_id = 9)
-                        if cat_id == 9:
-                            # Best Games category requires at least 3 selections
-                            if not isinstance(selections, list) or len(selections) != 5:
-                                return jsonify({'status': 'error', 'message': 'فئة "أفضل ألعاب 2025" تحتاج لاختيار 5 مراكز (3 مطلوبة)'}), 400
-                            
-                            # Check top 3 positions
-                            for i in range(3):
-                                selection = sanitize_input(selections[i])
-                                if not selection:
-                                    return jsonify({'status': 'error', 'message': f'اللعبة في المركز {i+1} مطلوبة'}), 400
-                            
-                            # Insert votes for Best Games category
-                            for rank, selection in enumerate(selections, start=1):
-                                selection = sanitize_input(selection)
-                                
-                                # Skip empty optional positions
-                                if rank >= 4 and not selection:
-                                    continue
-                                
-                                # ✅ AUTO-ADD NEW GAME TO games TABLE
-                                if selection:
-                                    cur.execute("""
-                                        INSERT INTO games (name) 
-                                        VALUES (%s)
-                                        ON CONFLICT (name) DO NOTHING
-                                    """, (selection,))
-                                
-                                points = POINT_SYSTEM.get(rank, 0)
-                                cur.execute("""
-                                    INSERT INTO votes (voter_name, category_id, rank, selection, points)
-                                    VALUES (%s, %s, %s, %s, %s)
-                                """, (name, cat_id, rank, selection, points))
-                        
-                        # Category 8: Most Anticipated 2026
-                        elif cat_id == 8:
-                            # Single selection
-                            if not isinstance(selections, list) or len(selections) != 1:
-                                return jsonify({'status': 'error', 'message': f'الفئة {cat_id} تحتاج لاختيار واحد فقط'}), 400
-                            
-                            selection = sanitize_input(selections[0])
-                            if selection:
-                                # ✅ AUTO-ADD NEW GAME TO games_2026 TABLE
-                                cur.execute("""
-                                    INSERT INTO games_2026 (name) 
-                                    VALUES (%s)
-                                    ON CONFLICT (name) DO NOTHING
-                                """, (selection,))
-                                
-                                cur.execute("""
-                                    INSERT INTO votes (voter_name, category_id, rank, selection, points)
-                                    VALUES (%s, %s, 1, %s, 5)
-                                """, (name, cat_id, selection))
-                        
-                        # Category 5: Best Publisher
-                        elif cat_id == 5:
-                            # Single selection
-                            if not isinstance(selections, list) or len(selections) != 1:
-                                return jsonify({'status': 'error', 'message': f'الفئة {cat_id} تحتاج لاختيار واحد فقط'}), 400
-                            
-                            selection = sanitize_input(selections[0])
-                            if selection:
-                                # ✅ AUTO-ADD NEW PUBLISHER TO publishers TABLE
-                                cur.execute("""
-                                    INSERT INTO publishers (name) 
-                                    VALUES (%s)
-                                    ON CONFLICT (name) DO NOTHING
-                                """, (selection,))
-                                
-                                cur.execute("""
-                                    INSERT INTO votes (voter_name, category_id, rank, selection, points)
-                                    VALUES (%s, %s, 1, %s, 5)
-                                """, (name, cat_id, selection))
-                        
-                        # Other categories (game categories)
-                        else:
-                            # Single selection
-                            if not isinstance(selections, list) or len(selections) != 1:
-                                return jsonify({'status': 'error', 'message': f'الفئة {cat_id} تحتاج لاختيار واحد فقط'}), 400
-                            
-                            selection = sanitize_input(selections[0])
-                            if selection:
-                                # ✅ AUTO-ADD NEW GAME TO games TABLE
-                                cur.execute("""
-                                    INSERT INTO games (name) 
-                                    VALUES (%s)
-                                    ON CONFLICT (name) DO NOTHING
-                                """, (selection,))
-                                
-                                cur.execute("""
-                                    INSERT INTO votes (voter_name, category_id, rank, selection, points)
-                                    VALUES (%s, %s, 1, %s, 5)
-                                """, (name, cat_id, selection))
-            else:
-                # SQLite version (similar logic)
-                # Check if user already voted
-                cursor = conn.execute("SELECT 1 FROM votes WHERE voter_name=? LIMIT 1", (name,))
-                if cursor.fetchone():
-                    return jsonify({'status': 'error', 'message': 'You have already voted'}), 403
-                
-                # Process votes for each category
-                for category_id, selections in votes_by_category.items():
-                    cat_id = int(category_id)
-                    
-                    if cat_id == 9:
-                        # Best Games 2025
-                        if not isinstance(selections, list) or len(selections) != 5:
-                            return jsonify({'status': 'error', 'message': 'فئة "أفضل ألعاب 2025" تحتاج لاختيار 5 مراكز (3 مطلوبة)'}), 400
-                        
-                        for i in range(3):
-                            selection = sanitize_input(selections[i])
-                            if not selection:
-                                return jsonify({'status': 'error', 'message': f'اللعبة في المركز {i+1} مطلوبة'}), 400
-                        
-                        for rank, selection in enumerate(selections, start=1):
-                            selection = sanitize_input(selection)
-                            
-                            if rank >= 4 and not selection:
-                                continue
-                            
-                            # ✅ AUTO-ADD NEW GAME TO games TABLE (SQLite)
-                            if selection:
-                                conn.execute("""
-                                    INSERT OR IGNORE INTO games (name) 
-                                    VALUES (?)
-                                """, (selection,))
-                            
-                            points = POINT_SYSTEM.get(rank, 0)
-                            conn.execute("""
-                                INSERT INTO votes (voter_name, category_id, rank, selection, points)
-                                VALUES (?, ?, ?, ?, ?)
-                            """, (name, cat_id, rank, selection, points))
-                    
-                    elif cat_id == 8:
-                        # Most Anticipated 2026
-                        if not isinstance(selections, list) or len(selections) != 1:
-                            return jsonify({'status': 'error', 'message': f'الفئة {cat_id} تحتاج لاختيار واحد فقط'}), 400
-                        
-                        selection = sanitize_input(selections[0])
-                        if selection:
-                            # ✅ AUTO-ADD NEW GAME TO games_2026 TABLE
-                            conn.execute("""
-                                INSERT OR IGNORE INTO games_2026 (name) 
-                                VALUES (?)
-                            """, (selection,))
-                            
-                            conn.execute("""
-                                INSERT INTO votes (voter_name, category_id, rank, selection, points)
-                                VALUES (?, ?, 1, ?, 5)
-                            """, (name, cat_id, selection))
-                    
-                    elif cat_id == 5:
-                        # Best Publisher
-                        if not isinstance(selections, list) or len(selections) != 1:
-                            return jsonify({'status': 'error', 'message': f'الفئة {cat_id} تحتاج لاختيار واحد فقط'}), 400
-                        
-                        selection = sanitize_input(selections[0])
-                        if selection:
-                            # ✅ AUTO-ADD NEW PUBLISHER
-                            conn.execute("""
-                                INSERT OR IGNORE INTO publishers (name) 
-                                VALUES (?)
-                            """, (selection,))
-                            
-                            conn.execute("""
-                                INSERT INTO votes (voter_name, category_id, rank, selection, points)
-                                VALUES (?, ?, 1, ?, 5)
-                            """, (name, cat_id, selection))
-                    
-                    else:
-                        # Other game categories
-                        if not isinstance(selections, list) or len(selections) != 1:
-                            return jsonify({'status': 'error', 'message': f'الفئة {cat_id} تحتاج لاختيار واحد فقط'}), 400
-                        
-                        selection = sanitize_input(selections[0])
-                        if selection:
-                            # ✅ AUTO-ADD NEW GAME
-                            conn.execute("""
-                                INSERT OR IGNORE INTO games (name) 
-                                VALUES (?)
-                            """, (selection,))
-                            
-                            conn.execute("""
-                                INSERT INTO votes (voter_name, category_id, rank, selection, points)
-                                VALUES (?, ?, 1, ?, 5)
-                            """, (name, cat_id, selection))
-            
+            catalog_rows = insert_ballot(conn, name, vote_rows, catalog_rows)
             conn.commit()
-            
+    except IntegrityError:
+        # ballots.voter_name is UNIQUE, so a second ballot for the same name fails here
+        return jsonify({'status': 'error', 'message': 'You have already voted'}), 403
     except Exception as e:
         print(f"Error submitting vote: {e}")
         return jsonify({'status': 'error', 'message': str(e)}), 500
 
+    ballot_committed(name, catalog_rows)
     return jsonify({'status': 'success'})
 
+# ✅ Write-behind ballot queue (optional, BALLOT_QUEUE=1)
+# submit_vote validates the ballot, appends it to this worker's journal file
+# (fsync'ed) and returns. A background thread drains the journal and writes many
+# ballots per transaction. Each worker holds an flock on its own journal, so on
+# startup any journal nobody holds belongs to a dead worker and is replayed.
+BALLOT_QUEUE = os.environ.get('BALLOT_QUEUE', '0') == '1'
+BALLOT_JOURNAL_DIR = os.environ.get('BALLOT_JOURNAL_DIR', 'ballot_journal')
+BALLOT_QUEUE_BATCH = int(os.environ.get('BALLOT_QUEUE_BATCH', 200))
+BALLOT_QUEUE_INTERVAL = float(os.environ.get('BALLOT_QUEUE_INTERVAL', 0.2))
+# Ballots the database rejects for anything but a duplicate voter end up here
+# instead of being retried forever at the head of the queue
+BALLOT_DEAD_LETTER_FILE = os.environ.get('BALLOT_DEAD_LETTER_FILE',
+                                         os.path.join(BALLOT_JOURNAL_DIR, 'dead-letter.jsonl'))
+dead_letter_lock = threading.Lock()
+
+def decode_journal_entry(line):
+    entry = json.loads(line)
+    return (
+        entry['name'],
+        [tuple(row) for row in entry['votes']],
+        [tuple(row) for row in entry['catalog']]
+    )
+
+def dead_letter_ballot(name, vote_rows, catalog_rows, error):
+    """Append a ballot the database refused to the dead-letter file"""
+    line = json.dumps({
+        'name': name,
+        'votes': vote_rows,
+        'catalog': catalog_rows,
+        'error': f"{type(error).__name__}: {error}",
+        'failed_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    }, ensure_ascii=False) + '\n'
+    with dead_letter_lock:
+        os.makedirs(os.path.dirname(BALLOT_DEAD_LETTER_FILE) or '.', exist_ok=True)
+        with open(BALLOT_DEAD_LETTER_FILE, 'a', encoding='utf-8') as f:
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+    print(f"⚠️ Dead-lettered queued ballot for {name}: {error}")
+
+def commit_ballot_batch(entries):
+    """Write (name, vote_rows, catalog_rows) entries in a single transaction.
+
+    Each ballot gets its own savepoint so a duplicate voter only drops that
+    ballot and a ballot with values the database rejects goes to the
+    dead-letter file; connection errors still fail the whole batch so it is
+    retried. Returns the entries that were written.
+    """
+    written = []
+    with get_conn() as conn:
+        if DB_TYPE != 'postgres':
+            conn.execute("BEGIN")
+        for name, vote_rows, catalog_rows in entries:
+            conn.execute("SAVEPOINT ballot")
+            try:
+                catalog_rows = insert_ballot(conn, name, vote_rows, catalog_rows)
+            except IntegrityError:
+                conn.execute("ROLLBACK TO SAVEPOINT ballot")
+                print(f"⚠️ Dropped queued ballot for {name}: already voted")
+            except DB_DATA_ERRORS as e:
+                conn.execute("ROLLBACK TO SAVEPOINT ballot")
+                dead_letter_ballot(name, vote_rows, catalog_rows, e)
+            else:
+                written.append((name, vote_rows, catalog_rows))
+            conn.execute("RELEASE SAVEPOINT ballot")
+        conn.commit()
+    
+    if written:
+        bump_data_version('votes')
+    for name, _, catalog_rows in written:
+        voter_registry.add(name)
+        for table_name, selection in catalog_rows:
+            autocomplete_added(table_name, selection)
+    return written
+
+class BallotJournal:
+    """This worker's append-only ballot journal plus its drain thread"""
+
+    def __init__(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, f'ballots-{os.getpid()}-{time.time_ns()}.journal')
+        # Locked under a name replay_orphaned_journals doesn't glob, then renamed:
+        # a replaying worker never sees this journal before its owner holds the lock
+        self.file = open(self.path + '.new', 'ab')
+        fcntl.flock(self.file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        os.rename(self.path + '.new', self.path)
+        self.lock = threading.Lock()
+        self.wakeup = threading.Condition(self.lock)
+        self.queue = deque()
+        self.pending_names = set()
+        self.thread = threading.Thread(target=self.run, name='ballot-writer', daemon=True)
+        self.thread.start()
+
+    def append(self, name, vote_rows, catalog_rows):
+        """Durably queue a ballot. Returns False if this name is already queued."""
+        line = json.dumps({
+            'name': name,
+            'votes': vote_rows,
+            'catalog': catalog_rows
+        }, ensure_ascii=False).encode('utf-8') + b'\n'
+        with self.lock:
+            if name in self.pending_names:
+                return False
+            self.file.write(line)
+            self.file.flush()
+            os.fsync(self.file.fileno())
+            self.queue.append((name, vote_rows, catalog_rows))
+            self.pending_names.add(name)
+            self.wakeup.notify()
+        return True
+
+    def is_pending(self, name):
+        return name in self.pending_names
+
+    def drain_once(self):
+        with self.lock:
+            batch = [self.queue[i] for i in range(min(BALLOT_QUEUE_BATCH, len(self.queue)))]
+        if not batch:
+            return 0
+        commit_ballot_batch(batch)
+        with self.lock:
+            for _ in batch:
+                name = self.queue.popleft()[0]
+                self.pending_names.discard(name)
+            # Everything in the file is in the database now - start it over
+            if not self.queue:
+                self.file.truncate(0)
+                self.file.flush()
+                os.fsync(self.file.fileno())
+        return len(batch)
+
+    def run(self):
+        while True:
+            with self.lock:
+                if not self.queue:
+                    self.wakeup.wait(BALLOT_QUEUE_INTERVAL)
+            try:
+                self.drain_once()
+            except Exception as e:
+                # Ballots stay queued (and journaled) until the database is back
+                print(f"⚠️ Ballot writer failed, retrying: {e}")
+                time.sleep(1)
+
+def replay_orphaned_journals(directory):
+    """Write ballots left behind by workers that died before draining them"""
+    for path in glob.glob(os.path.join(directory, '*.journal')):
+        try:
+            f = open(path, 'rb')
+        except FileNotFoundError:
+            continue  # another worker already replayed it
+        with f:
+            try:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                continue  # a live worker owns it
+            try:
+                if os.stat(path).st_ino != os.fstat(f.fileno()).st_ino:
+                    continue
+            except FileNotFoundError:
+                continue  # another worker replayed and removed it before we got the lock
+            entries = []
+            for line in f:
+                try:
+                    entries.append(decode_journal_entry(line))
+                except (ValueError, KeyError):
+                    # Torn write from a crash mid-append - the client never got a reply
+                    print(f"⚠️ Skipping unreadable journal line in {path}")
+            written = 0
+            for i in range(0, len(entries), BALLOT_QUEUE_BATCH):
+                written += len(commit_ballot_batch(entries[i:i + BALLOT_QUEUE_BATCH]))
+            if entries:
+                print(f"✅ Replayed {written} of {len(entries)} queued ballots from {path}")
+            # Removed while still locked, so no other worker can replay it again
+            os.remove(path)
+
+ballot_journal = None
+
+def start_ballot_queue():
+    global ballot_journal
+    if ballot_journal is None:
+        replay_orphaned_journals(BALLOT_JOURNAL_DIR)
+        ballot_journal = BallotJournal(BALLOT_JOURNAL_DIR)
+        atexit.register(flush_ballot_queue)
+
+def flush_ballot_queue():
+    """Best-effort drain on shutdown; anything left is replayed by the next worker"""
+    try:
+        while ballot_journal.drain_once():
+            pass
+    except Exception as e:
+        print(f"⚠️ Ballot queue flush failed: {e}")
+
+# ✅ Public standings (served from an in-process snapshot)
+# The snapshot is rebuilt when it is older than STANDINGS_MAX_AGE seconds, or when
+# this worker has written votes since it was built - but never more often than
+# STANDINGS_MIN_INTERVAL seconds, so a burst of ballots can't turn every page view
+# into an aggregate query. Set PUBLIC_STANDINGS=1 to open it to non-admins.
+STANDINGS_MAX_AGE = int(os.environ.get('STANDINGS_MAX_AGE', 30))
+STANDINGS_MIN_INTERVAL = int(os.environ.get('STANDINGS_MIN_INTERVAL', 2))
+PUBLIC_STANDINGS = os.environ.get('PUBLIC_STANDINGS', '0') == '1'
+
+standings_snapshot = None
+standings_lock = threading.Lock()
+
+def standings_version():
+    return (data_versions['votes'], data_versions['categories'])
+
+def load_standings():
+    """Read standings from vote_tallies - O(selections), not O(votes)"""
+    with get_conn() as conn:
+        rows = fetch_all(conn, 'standings.list')
+        total_voters = fetch_value(conn, 'ballots.count')
+    
+    categories = {}
+    for cat_id, name_ar, name_en, selection, points, voters, avg_rank in rows:
+        category = categories.setdefault(cat_id, {
+            'id': cat_id,
+            'name_ar': name_ar,
+            'name_en': name_en,
+            'standings': []
+        })
+        if selection is not None:
+            category['standings'].append({
+                'position': len(category['standings']) + 1,
+                'selection': selection,
+                'points': points,
+                'voters': voters,
+                'avg_rank': float(avg_rank) if avg_rank is not None else None
+            })
+    return list(categories.values()), total_voters
+
+def build_standings_snapshot(version):
+    categories, total_voters = load_standings()
+    generated_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    
+    def encode(payload):
+        body = json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        return body, hashlib.sha256(body).hexdigest()[:32]
+    
+    overall = encode({
+        'status': 'success',
+        'total_voters': total_voters,
+        'generated_at': generated_at,
+        'categories': categories
+    })
+    per_category = {
+        category['id']: encode({
+            'status': 'success',
+            'total_voters': total_voters,
+            'generated_at': generated_at,
+            'category': category
+        })
+        for category in categories
+    }
+    return {
+        'version': version,
+        'built_at': time.monotonic(),
+        'overall': overall,
+        'categories': per_category
+    }
+
+def get_standings_snapshot():
+    global standings_snapshot
+    snapshot = standings_snapshot
+    now = time.monotonic()
+    if snapshot is not None:
+        age = now - snapshot['built_at']
+        stale = age > STANDINGS_MAX_AGE or (
+            snapshot['version'] != standings_version() and age > STANDINGS_MIN_INTERVAL
+        )
+        if not stale:
+            return snapshot
+    with standings_lock:
+        # Another thread may have rebuilt it while we waited
+        if standings_snapshot is not snapshot:
+            return standings_snapshot
+        standings_snapshot = build_standings_snapshot(standings_version())
+        return standings_snapshot
+
+def standings_response(body, etag):
+    response = app.response_class(body, mimetype='application/json')
+    response.set_etag(etag)
+    if PUBLIC_STANDINGS:
+        response.cache_control.public = True
+        response.cache_control.max_age = STANDINGS_MIN_INTERVAL
+    else:
+        response.cache_control.private = True
+        response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
+@app.route('/standings')
+def standings():
+    if not PUBLIC_STANDINGS and not session.get('is_admin'):
+        return jsonify({"status": "error", "message": "Unauthorized"}), 403
+    body, etag = get_standings_snapshot()['overall']
+    return standings_response(body, etag)
+
+@app.route('/standings/<int:category_id>')
+def category_standings(category_id):
+    if not PUBLIC_STANDINGS and not session.get('is_admin'):
+        return jsonify({"status": "error", "message": "Unauthorized"}), 403
+    snapshot = get_standings_snapshot()
+    if category_id not in snapshot['categories']:
+        return jsonify({"status": "error", "message": "Category not found"}), 404
+    body, etag = snapshot['categories'][category_id]
+    return standings_response(body, etag)
+
 # ✅ Admin Panel
 @app.route('/admin')
 def admin():
@@ -823,6 +2676,88 @@ def admin_login():
         return jsonify({'status': 'success'})
     return jsonify({'status': 'fail', 'message': 'كلمة المرور غير صحيحة'}), 401
 
+# ✅ Admin Statistics (one query batch, cached for a few seconds)
+STATS_CACHE_SECONDS = int(os.environ.get('STATS_CACHE_SECONDS', 10))
+stats_cache = {'data': None, 'built_at': 0}
+
+def load_admin_stats():
+    # Item ids repeat across catalogs, so a selection is a (catalog, item_id) pair
+    totals_sql = f"""
+        SELECT
+            (SELECT COUNT(*) FROM ballots),
+            (SELECT COALESCE(SUM(votes), 0) FROM vote_tallies),
+            (SELECT COUNT(*) FROM (
+                SELECT DISTINCT {catalog_case_sql('category_id', "'{table}'")} AS catalog, item_id FROM vote_tallies
+            ) selections),
+            (SELECT COUNT(*) FROM categories),
+            (SELECT COUNT(*) FROM games),
+            (SELECT COUNT(*) FROM games_2026),
+            (SELECT COUNT(*) FROM publishers)
+    """
+    # Every voter has exactly one rank-1 row in each category they voted in
+    turnout_sql = """
+        SELECT c.id, c.name_ar, COUNT(v.id)
+        FROM categories c
+        LEFT JOIN votes v ON v.category_id = c.id AND v.rank = 1
+        GROUP BY c.id, c.name_ar, c.display_order
+        ORDER BY c.display_order
+    """
+    if DB_TYPE == 'postgres':
+        with get_conn() as conn:
+            with conn.cursor() as cur:
+                cur.execute(totals_sql)
+                totals = cur.fetchone()
+                cur.execute(turnout_sql)
+                turnout = cur.fetchall()
+    else:
+        # SQLite
+        with get_conn() as conn:
+            totals = conn.execute(totals_sql).fetchone()
+            turnout = conn.execute(turnout_sql).fetchall()
+    
+    total_voters, total_votes, unique_selections, total_categories, total_games, total_games_2026, total_publishers = totals
+    return {
+        "status": "success",
+        "total_voters": total_voters,
+        "total_votes": total_votes,
+        "unique_selections": unique_selections,
+        "total_categories": total_categories,
+        "total_games": total_games,
+        "total_games_2026": total_games_2026,
+        "total_publishers": total_publishers,
+        "category_turnout": [
+            {"category_id": r[0], "category_name": r[1], "voters": r[2]}
+            for r in turnout
+        ]
+    }
+
+@app.route('/admin/stats')
+def admin_stats():
+    if not session.get('is_admin'):
+        return jsonify({"status": "error", "message": "Unauthorized"}), 403
+    
+    if stats_cache['data'] is None or time.monotonic() - stats_cache['built_at'] > STATS_CACHE_SECONDS:
+        stats_cache['data'] = load_admin_stats()
+        stats_cache['built_at'] = time.monotonic()
+    return jsonify(stats_cache['data'])
+
+# ✅ Admin slow-query report (top offenders by total time, all workers)
+@app.route('/admin/slow-queries')
+def admin_slow_queries():
+    if not session.get('is_admin'):
+        return jsonify({"status": "error", "message": "Unauthorized"}), 403
+    
+    limit = parse_limit(request.args.get('limit', 50), 50, SLOW_QUERY_MAX_STATEMENTS)
+    metrics.flush()
+    entries = collect_metrics()['slow_queries'].values()
+    top = sorted(entries, key=lambda e: e['total_ms'], reverse=True)[:limit]
+    return jsonify({
+        "status": "success",
+        "threshold_ms": SLOW_QUERY_MS,
+        "queries": [dict(e, avg_ms=round(e['total_ms'] / e['count'], 1),
+                         total_ms=round(e['total_ms'], 1), max_ms=round(e['max_ms'], 1)) for e in top]
+    })
+
 # ✅ Admin Publisher Management
 @app.route('/admin/publisher', methods=['POST'])
 def add_publisher():
@@ -845,7 +2780,7 @@ def add_publisher():
                 """, (name,))
                 conn.commit()
                 cur.execute("SELECT id FROM publishers WHERE name=%s", (name,))
-                return jsonify({"status": "success" if cur.fetchone() else "error"})
+                added = cur.fetchone() is not None
     else:
         # SQLite
         with get_conn() as conn:
@@ -855,7 +2790,11 @@ def add_publisher():
             """, (name,))
             conn.commit()
             cursor = conn.execute("SELECT id FROM publishers WHERE name=?", (name,))
-            return jsonify({"status": "success" if cursor.fetchone() else "error"})
+            added = cursor.fetchone() is not None
+    
+    if added:
+        autocomplete_added('publishers', name)
+    return jsonify({"status": "success" if added else "error"})
 
 @app.route('/admin/publisher/<int:pid>', methods=['PUT'])
 def edit_publisher(pid):
@@ -871,6 +2810,9 @@ def edit_publisher(pid):
     if DB_TYPE == 'postgres':
         with get_conn() as conn:
             with conn.cursor() as cur:
+                cur.execute("SELECT name FROM publishers WHERE id=%s", (pid,))
+                row = cur.fetchone()
+                old_name = row[0] if row else None
                 cur.execute("""
                     UPDATE publishers 
                     SET name=%s 
@@ -880,6 +2822,8 @@ def edit_publisher(pid):
     else:
         # SQLite
         with get_conn() as conn:
+            row = conn.execute("SELECT name FROM publishers WHERE id=?", (pid,)).fetchone()
+            old_name = row[0] if row else None
             conn.execute("""
                 UPDATE publishers 
                 SET name=? 
@@ -887,6 +2831,7 @@ def edit_publisher(pid):
             """, (new_name, pid))
             conn.commit()
     
+    autocomplete_renamed('publishers', old_name, new_name)
     return jsonify({"status": "success"})
 
 @app.route('/admin/publisher/<int:pid>', methods=['DELETE'])
@@ -894,17 +2839,27 @@ def delete_publisher(pid):
     if not session.get('is_admin'): 
         return abort(403)
     
+    # Votes point at catalog rows by id - merge a misspelled title instead
+    with get_conn() as conn:
+        if fetch_one(conn, 'publishers.has_votes', (pid,)):
+            return jsonify({"status": "error", "message": "Cannot delete publisher with existing votes"}), 400
+    
     if DB_TYPE == 'postgres':
         with get_conn() as conn:
             with conn.cursor() as cur:
+                cur.execute("SELECT name FROM publishers WHERE id=%s", (pid,))
+                row = cur.fetchone()
                 cur.execute("DELETE FROM publishers WHERE id=%s", (pid,))
                 conn.commit()
     else:
         # SQLite
         with get_conn() as conn:
+            row = conn.execute("SELECT name FROM publishers WHERE id=?", (pid,)).fetchone()
             conn.execute("DELETE FROM publishers WHERE id=?", (pid,))
             conn.commit()
     
+    if row:
+        autocomplete_removed('publishers', row[0])
     return jsonify({"status": "success"})
 
 # ✅ Admin 2026 Game Management Routes
@@ -929,7 +2884,7 @@ def add_game_2026():
                 """, (name,))
                 conn.commit()
                 cur.execute("SELECT id FROM games_2026 WHERE name=%s", (name,))
-                return jsonify({"status": "success" if cur.fetchone() else "error"})
+                added = cur.fetchone() is not None
     else:
         # SQLite
         with get_conn() as conn:
@@ -939,7 +2894,11 @@ def add_game_2026():
             """, (name,))
             conn.commit()
             cursor = conn.execute("SELECT id FROM games_2026 WHERE name=?", (name,))
-            return jsonify({"status": "success" if cursor.fetchone() else "error"})
+            added = cursor.fetchone() is not None
+    
+    if added:
+        autocomplete_added('games_2026', name)
+    return jsonify({"status": "success" if added else "error"})
 
 @app.route('/admin/game-2026/<int:gid>', methods=['PUT'])
 def edit_game_2026(gid):
@@ -955,118 +2914,420 @@ def edit_game_2026(gid):
     if DB_TYPE == 'postgres':
         with get_conn() as conn:
             with conn.cursor() as cur:
-                cur.execute("""
-                    UPDATE games_2026 
-                    SET name=%s 
-                    WHERE id=%s
-                """, (new_name, gid))
-                conn.commit()
+                cur.execute("SELECT name FROM games_2026 WHERE id=%s", (gid,))
+                row = cur.fetchone()
+                old_name = row[0] if row else None
+                cur.execute("""
+                    UPDATE games_2026 
+                    SET name=%s 
+                    WHERE id=%s
+                """, (new_name, gid))
+                conn.commit()
+    else:
+        # SQLite
+        with get_conn() as conn:
+            row = conn.execute("SELECT name FROM games_2026 WHERE id=?", (gid,)).fetchone()
+            old_name = row[0] if row else None
+            conn.execute("""
+                UPDATE games_2026 
+                SET name=? 
+                WHERE id=?
+            """, (new_name, gid))
+            conn.commit()
+    
+    autocomplete_renamed('games_2026', old_name, new_name)
+    return jsonify({"status": "success"})
+
+@app.route('/admin/game-2026/<int:gid>', methods=['DELETE'])
+def delete_game_2026(gid):
+    if not session.get('is_admin'): 
+        return abort(403)
+    
+    # Votes point at catalog rows by id - merge a misspelled title instead
+    with get_conn() as conn:
+        if fetch_one(conn, 'games_2026.has_votes', (gid,)):
+            return jsonify({"status": "error", "message": "Cannot delete game with existing votes"}), 400
+    
+    if DB_TYPE == 'postgres':
+        with get_conn() as conn:
+            with conn.cursor() as cur:
+                cur.execute("SELECT name FROM games_2026 WHERE id=%s", (gid,))
+                row = cur.fetchone()
+                cur.execute("DELETE FROM games_2026 WHERE id=%s", (gid,))
+                conn.commit()
+    else:
+        # SQLite
+        with get_conn() as conn:
+            row = conn.execute("SELECT name FROM games_2026 WHERE id=?", (gid,)).fetchone()
+            conn.execute("DELETE FROM games_2026 WHERE id=?", (gid,))
+            conn.commit()
+    
+    if row:
+        autocomplete_removed('games_2026', row[0])
+    return jsonify({"status": "success"})
+
+# ✅ Indexed admin search
+# SQLite: an FTS5 trigram table per searchable table, filled by triggers.
+# Postgres: pg_trgm GIN indexes on tg_fold(column). Both index Arabic-folded
+# text (hamza forms, alef maksura, teh marbuta, harakat, tatweel) and the
+# search term is folded the same way. Falls back to LIKE for terms shorter
+# than a trigram or when FTS5 / pg_trgm is unavailable.
+# votes has no text columns; search_join matches it through ballots and the catalogs
+SEARCH_INDEXES = {
+    'ballots': ['voter_name'],
+    'games': ['name'],
+    'publishers': ['name'],
+    'games_2026': ['name'],
+}
+SEARCH_FOLD = ARABIC_LETTER_FOLD
+SEARCH_FOLD_TABLE = ARABIC_LETTER_MAP
+search_backend = None  # 'fts5', 'pg_trgm' or None (LIKE)
+
+def fold_search_text(text):
+    text = text.translate(SEARCH_FOLD_TABLE)
+    # FTS5 trigram folds case itself; tg_fold() lowercases on Postgres
+    return text.lower() if DB_TYPE == 'postgres' else text
+
+def sqlite_fold_expr(expr):
+    for src_char, dst_char in SEARCH_FOLD:
+        expr = f"replace({expr}, '{src_char}', '{dst_char}')"
+    return expr
+
+def init_search_indexes():
+    """Create the search indexes in their own transaction - failure only disables them"""
+    global search_backend
+    try:
+        with get_conn() as conn:
+            if DB_TYPE == 'postgres':
+                with conn.cursor() as cur:
+                    cur.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+                    from_chars = ''.join(s for s, _ in SEARCH_FOLD)
+                    to_chars = ''.join(d for _, d in SEARCH_FOLD)
+                    cur.execute(f"""
+                        CREATE OR REPLACE FUNCTION tg_fold(text) RETURNS text
+                        LANGUAGE sql IMMUTABLE PARALLEL SAFE
+                        AS $$ SELECT lower(translate($1, '{from_chars}', '{to_chars}')) $$
+                    """)
+                    for table_name, columns in SEARCH_INDEXES.items():
+                        for column in columns:
+                            cur.execute(f"""
+                                CREATE INDEX IF NOT EXISTS idx_{table_name}_{column}_trgm
+                                ON {table_name} USING gin (tg_fold({column}) gin_trgm_ops)
+                            """)
+                conn.commit()
+                search_backend = 'pg_trgm'
+            else:
+                # SQLite
+                for table_name, columns in SEARCH_INDEXES.items():
+                    fts = f"{table_name}_fts"
+                    exists = conn.execute("SELECT 1 FROM sqlite_master WHERE name=?", (fts,)).fetchone()
+                    column_list = ', '.join(columns)
+                    new_values = ', '.join(sqlite_fold_expr(f"new.{c}") for c in columns)
+                    conn.execute(f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({column_list}, tokenize='trigram')")
+                    conn.execute(f"""
+                        CREATE TRIGGER IF NOT EXISTS {fts}_insert AFTER INSERT ON {table_name} BEGIN
+                            INSERT INTO {fts} (rowid, {column_list}) VALUES (new.id, {new_values});
+                        END""")
+                    conn.execute(f"""
+                        CREATE TRIGGER IF NOT EXISTS {fts}_delete AFTER DELETE ON {table_name} BEGIN
+                            DELETE FROM {fts} WHERE rowid = old.id;
+                        END""")
+                    conn.execute(f"""
+                        CREATE TRIGGER IF NOT EXISTS {fts}_update AFTER UPDATE OF {column_list} ON {table_name} BEGIN
+                            DELETE FROM {fts} WHERE rowid = old.id;
+                            INSERT INTO {fts} (rowid, {column_list}) VALUES (new.id, {new_values});
+                        END""")
+                    if not exists:
+                        # Index rows written before the triggers existed
+                        conn.execute(f"""
+                            INSERT INTO {fts} (rowid, {column_list})
+                            SELECT id, {', '.join(sqlite_fold_expr(c) for c in columns)} FROM {table_name}
+                        """)
+                conn.commit()
+                search_backend = 'fts5'
+    except Exception as e:
+        search_backend = None
+        print("⚠️ Search indexes unavailable, using LIKE:", e)
+
+def detect_search_backend():
+    """Pick up indexes an earlier init-db created, without creating anything"""
+    global search_backend
+    try:
+        with get_conn() as conn:
+            if DB_TYPE == 'postgres':
+                with conn.cursor() as cur:
+                    cur.execute("SELECT 1 FROM pg_proc WHERE proname = 'tg_fold'")
+                    search_backend = 'pg_trgm' if cur.fetchone() else None
+            else:
+                # SQLite
+                found = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'ballots_fts'").fetchone()
+                search_backend = 'fts5' if found else None
+    except Exception as e:
+        search_backend = None
+        print("⚠️ Search indexes unavailable, using LIKE:", e)
+
+def index_matches(table, folded):
+    """SQL selecting (id, score) of the rows of an indexed table matching folded, and its params"""
+    if search_backend == 'fts5':
+        fts = f"{table}_fts"
+        matches = f"SELECT rowid AS id, bm25({fts}) AS score FROM {fts} WHERE {fts} MATCH ?"
+        return matches, ['"' + folded.replace('"', '""') + '"']
+    columns = SEARCH_INDEXES[table]
+    similarity = ', '.join(f"word_similarity(%s, tg_fold({c}))" for c in columns)
+    similarity = f"GREATEST({similarity})" if len(columns) > 1 else similarity
+    matches = f"""
+        SELECT id, -{similarity} AS score FROM {table}
+        WHERE {' OR '.join(f"tg_fold({c}) LIKE %s" for c in columns)}
+    """
+    return matches, [folded] * len(columns) + [f"%{folded}%"] * len(columns)
+
+def search_join(table, term, id_expr):
+    """JOIN clause + params restricting `table` to rows matching term, with a
+    `m.score` column where lower is better. None when the indexes can't be used."""
+    folded = fold_search_text(term)
+    if (table not in SEARCH_INDEXES and table != 'votes') or search_backend is None or len(folded) < 3:
+        return None
+    
+    if table != 'votes':
+        matches, params = index_matches(table, folded)
+        return f"JOIN ({matches}) m ON m.id = {id_expr}", params
+    
+    # Votes match through the voter's ballot, the selection's catalog row or the category
+    voter_matches, params = index_matches('ballots', folded)
+    parts = [f"SELECT v.id, s.score FROM ({voter_matches}) s JOIN votes v ON v.voter_id = s.id"]
+    for table_name in AUTOCOMPLETE_TABLES:
+        item_matches, item_params = index_matches(table_name, folded)
+        parts.append(f"""
+            SELECT v.id, s.score FROM ({item_matches}) s
+            JOIN votes v ON v.item_id = s.id AND {catalog_categories_sql(table_name, 'v.category_id')}
+        """)
+        params += item_params
+    # Searching a category name lists every vote in that category
+    category_name = 'tg_fold(name_ar)' if search_backend == 'pg_trgm' else sqlite_fold_expr('name_ar')
+    ph = '%s' if search_backend == 'pg_trgm' else '?'
+    parts.append(f"""
+        SELECT id, 0 FROM votes
+        WHERE category_id IN (SELECT id FROM categories WHERE {category_name} LIKE {ph})
+    """)
+    params.append(f"%{folded}%")
+    matches = f"SELECT id, MIN(score) AS score FROM ({' UNION ALL '.join(parts)}) found GROUP BY id"
+    return f"JOIN ({matches}) m ON m.id = {id_expr}", params
+
+# ✅ Keyset pagination for the admin tables
+# Pages are addressed by an opaque cursor holding the (sort value, id) of the
+# row at the page edge, so every page is an index range scan instead of
+# OFFSET. Exact totals are only computed when asked for (total=1) and cached.
+ADMIN_PAGE_SIZE = 50
+TOTALS_CACHE_SECONDS = int(os.environ.get('TOTALS_CACHE_SECONDS', 30))
+
+ADMIN_TABLES = {
+    # Reads the base table (not vote_details) so every sort is an index range scan:
+    # keyset sorts are limited to integer columns with a (column, id) index
+    'votes': {
+        'select': f"""
+            SELECT 
+                v.id,
+                v.voter_id,
+                b.voter_name,
+                v.category_id,
+                c.name_ar as category_name,
+                v.rank,
+                v.item_id,
+                {selection_sql('v.category_id', 'v.item_id')} as selection,
+                v.points,
+                v.timestamp
+            FROM votes v
+            JOIN ballots b ON b.id = v.voter_id
+            JOIN categories c ON v.category_id = c.id
+        """,
+        'count': """
+            SELECT COUNT(*) FROM votes v
+            JOIN ballots b ON b.id = v.voter_id
+            JOIN categories c ON v.category_id = c.id
+        """,
+        'id': 'v.id',
+        # sort column -> (SQL expression, unique?)
+        'sorts': {
+            'id': ('v.id', True),
+            'voter_id': ('v.voter_id', False),
+            'category_id': ('v.category_id', False),
+            'item_id': ('v.item_id', False),
+        },
+        'search': ['b.voter_name', 'c.name_ar', selection_sql('v.category_id', 'v.item_id')],
+    },
+    'categories': {
+        'select': "SELECT * FROM categories",
+        'count': "SELECT COUNT(*) FROM categories",
+        'id': 'id',
+        'sorts': {'id': ('id', True)},
+        'search': ['name_ar', 'name_en'],
+    },
+}
+for catalog_table in AUTOCOMPLETE_TABLES:
+    ADMIN_TABLES[catalog_table] = {
+        'select': f"SELECT {catalog_table}.* FROM {catalog_table}",
+        'count': f"SELECT COUNT(*) FROM {catalog_table}",
+        'id': f"{catalog_table}.id",
+        'sorts': {'id': (f"{catalog_table}.id", True), 'name': (f"{catalog_table}.name", True)},
+        'search': [f"{catalog_table}.name"],
+    }
+
+totals_cache = {}
+
+def encode_cursor(sort_value, row_id, direction):
+    raw = json.dumps([sort_value, row_id, direction], ensure_ascii=False, default=str)
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor):
+    """Returns (sort_value, id, direction) or raises ValueError"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        sort_value, row_id, direction = json.loads(base64.urlsafe_b64decode(padded))
+    except Exception:
+        raise ValueError('Invalid cursor')
+    if direction not in ('next', 'prev'):
+        raise ValueError('Invalid cursor')
+    return sort_value, row_id, direction
+
+def cached_total(table, count_sql, params):
+    key = (table, count_sql, tuple(params))
+    cached = totals_cache.get(key)
+    if cached and time.monotonic() - cached[1] < TOTALS_CACHE_SECONDS:
+        return cached[0]
+    if DB_TYPE == 'postgres':
+        with get_conn() as conn:
+            with conn.cursor() as cur:
+                cur.execute(count_sql, params)
+                total = cur.fetchone()[0]
     else:
         # SQLite
         with get_conn() as conn:
-            conn.execute("""
-                UPDATE games_2026 
-                SET name=? 
-                WHERE id=?
-            """, (new_name, gid))
-            conn.commit()
-    
-    return jsonify({"status": "success"})
+            total = conn.execute(count_sql, params).fetchone()[0]
+    totals_cache[key] = (total, time.monotonic())
+    return total
 
-@app.route('/admin/game-2026/<int:gid>', methods=['DELETE'])
-def delete_game_2026(gid):
-    if not session.get('is_admin'): 
-        return abort(403)
+def keyset_page(table, default_sort='id'):
+    """Build one page of an admin table from the request args"""
+    spec = ADMIN_TABLES[table]
+    ph = '%s' if DB_TYPE == 'postgres' else '?'
+    search = request.args.get('search', '').strip()
+    id_expr = spec['id']
     
-    if DB_TYPE == 'postgres':
-        with get_conn() as conn:
-            with conn.cursor() as cur:
-                cur.execute("DELETE FROM games_2026 WHERE id=%s", (gid,))
-                conn.commit()
+    join, params, conditions = "", [], []
+    if search:
+        found = search_join(table, search, id_expr)
+        if found:
+            join, params = found
+        else:
+            conditions.append('(' + ' OR '.join(f"{col} LIKE {ph}" for col in spec['search']) + ')')
+            params.extend([f"%{search}%"] * len(spec['search']))
+    filter_params = list(params)
+    
+    # Indexed searches default to best match first
+    sort = request.args.get('sort', 'relevance' if join else default_sort)
+    descending = request.args.get('order', 'asc') == 'desc'
+    limit = parse_limit(request.args.get('limit', ADMIN_PAGE_SIZE), ADMIN_PAGE_SIZE, 200)
+    
+    if sort == 'relevance' and join:
+        sort_expr, sort_unique = 'm.score', False
+        descending = False
+    elif sort in spec['sorts']:
+        sort_expr, sort_unique = spec['sorts'][sort]
     else:
-        # SQLite
-        with get_conn() as conn:
-            conn.execute("DELETE FROM games_2026 WHERE id=?", (gid,))
-            conn.commit()
+        raise ValueError('Invalid sort column')
     
-    return jsonify({"status": "success"})
-
-@app.route('/admin/view-2026-games')
-def view_2026_games():
-    if not session.get('is_admin'):
-        return jsonify({"status": "error", "message": "Unauthorized"}), 403
+    cursor = request.args.get('cursor', '')
+    direction = 'next'
+    if cursor:
+        sort_value, row_id, direction = decode_cursor(cursor)
+        # Walking backwards = walking forwards over the reversed order
+        forward = (direction == 'next') != descending
+        op = '>' if forward else '<'
+        if sort_unique:
+            conditions.append(f"{sort_expr} {op} {ph}")
+            params.append(sort_value)
+        else:
+            conditions.append(f"({sort_expr}, {id_expr}) {op} ({ph}, {ph})")
+            params.extend([sort_value, row_id])
     
-    page = int(request.args.get('page', 1))
-    search = request.args.get('search', '').strip()
-    limit, offset = 50, (page - 1) * 50
+    reverse = (direction == 'prev') != descending
+    order = 'DESC' if reverse else 'ASC'
+    order_by = f"{sort_expr} {order}" if sort_unique else f"{sort_expr} {order}, {id_expr} {order}"
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    select = spec['select'].replace('SELECT', 'SELECT m.score AS search_score,', 1) if join else spec['select']
+    data_query = f"{select} {join} {where} ORDER BY {order_by} LIMIT {ph}"
+    params.append(limit + 1)
     
     if DB_TYPE == 'postgres':
         with get_conn() as conn:
             with conn.cursor() as cur:
-                # Get total count
-                if search:
-                    cur.execute("SELECT COUNT(*) FROM games_2026 WHERE name LIKE %s", (f'%{search}%',))
-                else:
-                    cur.execute("SELECT COUNT(*) FROM games_2026")
-                total_rows = cur.fetchone()[0]
-                
-                # Get data with pagination
-                if search:
-                    cur.execute("""
-                        SELECT id, name, created_at FROM games_2026 
-                        WHERE name LIKE %s 
-                        ORDER BY name ASC 
-                        LIMIT %s OFFSET %s
-                    """, (f'%{search}%', limit, offset))
-                else:
-                    cur.execute("""
-                        SELECT id, name, created_at FROM games_2026 
-                        ORDER BY name ASC 
-                        LIMIT %s OFFSET %s
-                    """, (limit, offset))
-                rows = cur.fetchall()
-                col_names = ['id', 'name', 'created_at']
+                cur.execute(data_query, params)
+                rows = [list(r) for r in cur.fetchall()]
+                col_names = [desc[0] for desc in cur.description]
     else:
         # SQLite
         with get_conn() as conn:
-            # Get total count
-            if search:
-                cursor = conn.execute("SELECT COUNT(*) FROM games_2026 WHERE name LIKE ?", (f'%{search}%',))
-            else:
-                cursor = conn.execute("SELECT COUNT(*) FROM games_2026")
-            total_rows = cursor.fetchone()[0]
-            
-            # Get data with pagination
-            if search:
-                cursor = conn.execute("""
-                    SELECT id, name, created_at FROM games_2026 
-                    WHERE name LIKE ? 
-                    ORDER BY name ASC 
-                    LIMIT ? OFFSET ?
-                """, (f'%{search}%', limit, offset))
-            else:
-                cursor = conn.execute("""
-                    SELECT id, name, created_at FROM games_2026 
-                    ORDER BY name ASC 
-                    LIMIT ? OFFSET ?
-                """, (limit, offset))
-            
-            rows = []
-            for row in cursor.fetchall():
-                rows.append(list(row))
-            
-            col_names = ['id', 'name', 'created_at']
-
-    return jsonify({
+            cursor_obj = conn.execute(data_query, params)
+            # Convert sqlite3.Row objects to regular Python lists
+            rows = [list(r) for r in cursor_obj.fetchall()]
+            col_names = [description[0] for description in cursor_obj.description]
+    
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if direction == 'prev':
+        rows.reverse()
+    
+    sort_index = col_names.index('search_score' if sort_expr == 'm.score' else sort)
+    id_index = col_names.index('id')
+    next_cursor = prev_cursor = None
+    if rows:
+        first, last = rows[0], rows[-1]
+        if direction == 'next':
+            next_cursor = encode_cursor(last[sort_index], last[id_index], 'next') if has_more else None
+            prev_cursor = encode_cursor(first[sort_index], first[id_index], 'prev') if cursor else None
+        else:
+            next_cursor = encode_cursor(last[sort_index], last[id_index], 'next')
+            prev_cursor = encode_cursor(first[sort_index], first[id_index], 'prev') if has_more else None
+    
+    # The score only drives the cursor - keep it out of the table
+    if join:
+        score_index = col_names.index('search_score')
+        col_names.pop(score_index)
+        for row in rows:
+            row.pop(score_index)
+    
+    total_rows = None
+    if request.args.get('total') == '1':
+        if join:
+            count_query = f"{spec['count']} {join}"
+        elif search:
+            count_query = f"{spec['count']} WHERE {conditions[0]}"
+        else:
+            count_query = spec['count']
+        total_rows = cached_total(table, count_query, filter_params)
+    
+    return {
         "status": "success",
-        "table": "games_2026",
+        "table": table,
         "columns": col_names,
         "rows": rows,
         "total_rows": total_rows,
-        "page": page,
-        "pages": (total_rows + limit - 1) // limit,
-        "has_pagination": total_rows > limit
-    })
+        "sort": 'relevance' if sort_expr == 'm.score' else sort,
+        "order": 'desc' if descending else 'asc',
+        "next_cursor": next_cursor,
+        "prev_cursor": prev_cursor,
+        "has_pagination": bool(next_cursor or prev_cursor)
+    }
+
+@app.route('/admin/view-2026-games')
+def view_2026_games():
+    if not session.get('is_admin'):
+        return jsonify({"status": "error", "message": "Unauthorized"}), 403
+    
+    try:
+        return jsonify(keyset_page('games_2026', default_sort='name'))
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
 
 # ✅ Admin View Table - Add games and publishers to the route
 # ✅ Admin View Table - Updated to show category names for votes table
@@ -1076,115 +3337,15 @@ def view_table():
         return jsonify({"status": "error", "message": "Unauthorized"}), 403
 
     table = request.args.get('table', 'categories')
-    page = int(request.args.get('page', 1))
-    search = request.args.get('search', '').strip()
-    limit, offset = 50, (page - 1) * 50
 
     # ✅ Updated to include games, publishers, and games_2026
-    if table not in ["categories", "votes", "games", "publishers", "games_2026"]:
+    if table not in ADMIN_TABLES:
         return jsonify({"status": "error", "message": "Invalid table"}), 400    
     
-    # Special handling for votes table to include category name
-    if table == "votes":
-        if DB_TYPE == 'postgres':
-            base_query = """
-                SELECT 
-                    v.id,
-                    v.voter_name,
-                    c.name_ar as category_name,
-                    v.rank,
-                    v.selection,
-                    v.points,
-                    v.timestamp
-                FROM votes v
-                JOIN categories c ON v.category_id = c.id
-            """
-            count_query = "SELECT COUNT(*) FROM votes v JOIN categories c ON v.category_id = c.id"
-        else:
-            base_query = """
-                SELECT 
-                    v.id,
-                    v.voter_name,
-                    c.name_ar as category_name,
-                    v.rank,
-                    v.selection,
-                    v.points,
-                    v.timestamp
-                FROM votes v
-                JOIN categories c ON v.category_id = c.id
-            """
-            count_query = "SELECT COUNT(*) FROM votes v JOIN categories c ON v.category_id = c.id"
-    else:
-        base_query = f"SELECT * FROM {table}"
-        count_query = f"SELECT COUNT(*) FROM {table}"
-    
-    where, params = "", []
-    if search:
-        if table == "votes":
-            # Search in votes table with joined category name
-            where = "WHERE v.voter_name LIKE ? OR c.name_ar LIKE ? OR v.selection LIKE ?"
-            params.extend([f"%{search}%", f"%{search}%", f"%{search}%"])
-        elif table == "categories":
-            where = "WHERE name_ar LIKE ? OR name_en LIKE ?"
-            params.extend([f"%{search}%", f"%{search}%"])
-        elif table == "games" or table == "publishers" or table == "games_2026":
-            where = "WHERE name LIKE ?"
-            params.append(f"%{search}%")
-
-    if DB_TYPE == 'postgres':
-        if where:
-            full_count_query = f"{count_query} {where}"
-            full_data_query = f"{base_query} {where} ORDER BY v.id ASC LIMIT %s OFFSET %s" if table == "votes" else f"{base_query} {where} ORDER BY id ASC LIMIT %s OFFSET %s"
-        else:
-            full_count_query = count_query
-            full_data_query = f"{base_query} ORDER BY v.id ASC LIMIT %s OFFSET %s" if table == "votes" else f"{base_query} ORDER BY id ASC LIMIT %s OFFSET %s"
-        
-        with get_conn() as conn:
-            with conn.cursor() as cur:
-                # Get total count
-                cur.execute(full_count_query, params)
-                total_rows = cur.fetchone()[0]
-                
-                # Get data with pagination
-                data_params = params + [limit, offset]
-                cur.execute(full_data_query, data_params)
-                rows = cur.fetchall()
-                col_names = [desc[0] for desc in cur.description]
-    else:
-        # SQLite
-        if where:
-            full_count_query = f"{count_query} {where}"
-            full_data_query = f"{base_query} {where} ORDER BY v.id ASC LIMIT ? OFFSET ?" if table == "votes" else f"{base_query} {where} ORDER BY id ASC LIMIT ? OFFSET ?"
-        else:
-            full_count_query = count_query
-            full_data_query = f"{base_query} ORDER BY v.id ASC LIMIT ? OFFSET ?" if table == "votes" else f"{base_query} ORDER BY id ASC LIMIT ? OFFSET ?"
-        
-        with get_conn() as conn:
-            # Get total count
-            cursor = conn.execute(full_count_query, params)
-            total_rows = cursor.fetchone()[0]
-            
-            # Get data with pagination
-            data_params = params + [limit, offset]
-            cursor = conn.execute(full_data_query, data_params)
-            
-            # Convert sqlite3.Row objects to regular Python lists
-            rows = []
-            for row in cursor.fetchall():
-                rows.append(list(row))
-            
-            col_names = [description[0] for description in cursor.description]
-
-    return jsonify({
-        "status": "success",
-        "table": table,
-        "columns": col_names,
-        "rows": rows,
-        "total_rows": total_rows,
-        "page": page,
-        "pages": (total_rows + limit - 1) // limit,
-        "has_pagination": total_rows > limit
-    })
+    try:
+        return jsonify(keyset_page(table))
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
 
 # ✅ Admin Game Management Routes
 @app.route('/admin/game', methods=['POST'])
@@ -1208,7 +3369,7 @@ def add_game():
                 """, (name,))
                 conn.commit()
                 cur.execute("SELECT id FROM games WHERE name=%s", (name,))
-                return jsonify({"status": "success" if cur.fetchone() else "error"})
+                added = cur.fetchone() is not None
     else:
         # SQLite
         with get_conn() as conn:
@@ -1218,7 +3379,11 @@ def add_game():
             """, (name,))
             conn.commit()
             cursor = conn.execute("SELECT id FROM games WHERE name=?", (name,))
-            return jsonify({"status": "success" if cursor.fetchone() else "error"})
+            added = cursor.fetchone() is not None
+    
+    if added:
+        autocomplete_added('games', name)
+    return jsonify({"status": "success" if added else "error"})
 
 @app.route('/admin/game/<int:gid>', methods=['PUT'])
 def edit_game(gid):
@@ -1234,6 +3399,9 @@ def edit_game(gid):
     if DB_TYPE == 'postgres':
         with get_conn() as conn:
             with conn.cursor() as cur:
+                cur.execute("SELECT name FROM games WHERE id=%s", (gid,))
+                row = cur.fetchone()
+                old_name = row[0] if row else None
                 cur.execute("""
                     UPDATE games 
                     SET name=%s 
@@ -1243,6 +3411,8 @@ def edit_game(gid):
     else:
         # SQLite
         with get_conn() as conn:
+            row = conn.execute("SELECT name FROM games WHERE id=?", (gid,)).fetchone()
+            old_name = row[0] if row else None
             conn.execute("""
                 UPDATE games 
                 SET name=? 
@@ -1250,6 +3420,7 @@ def edit_game(gid):
             """, (new_name, gid))
             conn.commit()
     
+    autocomplete_renamed('games', old_name, new_name)
     return jsonify({"status": "success"})
 
 @app.route('/admin/game/<int:gid>', methods=['DELETE'])
@@ -1257,19 +3428,269 @@ def delete_game(gid):
     if not session.get('is_admin'): 
         return abort(403)
     
+    # Votes point at catalog rows by id - merge a misspelled title instead
+    with get_conn() as conn:
+        if fetch_one(conn, 'games.has_votes', (gid,)):
+            return jsonify({"status": "error", "message": "Cannot delete game with existing votes"}), 400
+    
     if DB_TYPE == 'postgres':
         with get_conn() as conn:
             with conn.cursor() as cur:
+                cur.execute("SELECT name FROM games WHERE id=%s", (gid,))
+                row = cur.fetchone()
                 cur.execute("DELETE FROM games WHERE id=%s", (gid,))
                 conn.commit()
     else:
         # SQLite
         with get_conn() as conn:
+            row = conn.execute("SELECT name FROM games WHERE id=?", (gid,)).fetchone()
             conn.execute("DELETE FROM games WHERE id=?", (gid,))
             conn.commit()
     
+    if row:
+        autocomplete_removed('games', row[0])
     return jsonify({"status": "success"})
 
+# ✅ Bulk catalog import (admin upload and `flask import-catalog`)
+# Names are cleaned like the single-entry admin routes, then deduped in memory -
+# within the upload and against the table and its aliases - on title_key, so
+# "Hades II" and "hades 2" are one title. What is left is loaded in one go:
+# COPY into a temp table then one INSERT on Postgres, one executemany on SQLite.
+IMPORT_MAX_BYTES = int(os.environ.get('IMPORT_MAX_BYTES', 2 * 1024 * 1024))
+
+def clean_title(raw):
+    return ' '.join((sanitize_input(raw) or '').split())
+
+def parse_catalog_upload(text, filename=''):
+    """Raw names from a TXT (one per line) or CSV ("name" column, else the first column)"""
+    text = text.lstrip('\ufeff')
+    if not filename.lower().endswith('.csv'):
+        return [line for line in text.splitlines() if line.strip()]
+    rows = [row for row in csv.reader(io.StringIO(text)) if any(cell.strip() for cell in row)]
+    column = 0
+    if rows:
+        header = [cell.strip().lower() for cell in rows[0]]
+        if 'name' in header:
+            column = header.index('name')
+            rows = rows[1:]
+    return [row[column] if column < len(row) else '' for row in rows]
+
+def import_catalog(conn, table_name, raw_names):
+    """Insert the new names of an upload into a catalog table. Caller commits."""
+    known = {title_key(row[0]) for row in fetch_all(conn, f'{table_name}.names')}
+    known.update(alias for alias, _ in fetch_all(conn, f'{table_name}.aliases', (table_name,)))
+    names, batch = [], set()
+    skipped = {'invalid': 0, 'duplicate': 0, 'existing': 0}
+    for raw in raw_names:
+        name = clean_title(raw)
+        folded = title_key(name)
+        if not folded:
+            skipped['invalid'] += 1
+        elif folded in batch:
+            skipped['duplicate'] += 1
+        elif folded in known:
+            skipped['existing'] += 1
+        else:
+            batch.add(folded)
+            names.append(name)
+
+    inserted = 0
+    if names and DB_TYPE == 'postgres':
+        started = time.perf_counter()
+        with conn.cursor() as cur:
+            cur.execute("CREATE TEMP TABLE IF NOT EXISTS catalog_import (name TEXT) ON COMMIT DROP")
+            cur.execute("TRUNCATE catalog_import")
+            with cur.copy("COPY catalog_import (name) FROM STDIN") as copy:
+                for name in names:
+                    copy.write_row((name,))
+            cur.execute(f"""
+                INSERT INTO {table_name} (name) SELECT name FROM catalog_import
+                ON CONFLICT (name) DO NOTHING
+            """)
+            inserted = cur.rowcount
+        record_query_time(f'{table_name}.import', time.perf_counter() - started)
+    elif names:
+        inserted = run_many(conn, f'{table_name}.insert_missing', [(name,) for name in names])
+    # Rows another writer added since we read the table
+    skipped['existing'] += len(names) - inserted
+    return {'received': len(raw_names), 'inserted': inserted, 'skipped': skipped, 'names': names}
+
+def import_catalog_names(table_name, raw_names):
+    with get_conn() as conn:
+        result = import_catalog(conn, table_name, raw_names)
+        conn.commit()
+    # add() ignores names the index already holds
+    for name in result.pop('names'):
+        autocomplete_added(table_name, name)
+    return result
+
+@app.route('/admin/import/<table_name>', methods=['POST'])
+def import_catalog_upload(table_name):
+    if not session.get('is_admin'):
+        return abort(403)
+    
+    if table_name not in AUTOCOMPLETE_TABLES:
+        return jsonify({"status": "error", "message": "Invalid table"}), 400
+    
+    upload = request.files.get('file')
+    if upload is None:
+        return jsonify({"status": "error", "message": "Upload a .txt or .csv file"}), 400
+    data = upload.read(IMPORT_MAX_BYTES + 1)
+    if len(data) > IMPORT_MAX_BYTES:
+        return jsonify({"status": "error", "message": f"File is larger than {IMPORT_MAX_BYTES} bytes"}), 413
+    try:
+        text = data.decode('utf-8')
+    except UnicodeDecodeError:
+        return jsonify({"status": "error", "message": "File must be UTF-8"}), 400
+    
+    result = import_catalog_names(table_name, parse_catalog_upload(text, upload.filename or ''))
+    return jsonify({"status": "success", "table": table_name, **result})
+
+@app.cli.command('import-catalog')
+@click.argument('table_name', type=click.Choice(AUTOCOMPLETE_TABLES))
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+def import_catalog_command(table_name, path):
+    """Bulk-load names into games, publishers or games_2026 from a TXT/CSV file"""
+    init_db()
+    with open(path, encoding='utf-8-sig') as f:
+        raw_names = parse_catalog_upload(f.read(), path)
+    result = import_catalog_names(table_name, raw_names)
+    skipped = ', '.join(f"{count} {reason}" for reason, count in result['skipped'].items())
+    print(f"✅ {table_name}: {result['inserted']} inserted of {result['received']} ({skipped} skipped)")
+
+# ✅ Title merges (canonical titles and their aliases)
+# Merging folds every spelling of the given variants into one canonical catalog
+# row in a single transaction: each variant's title_key becomes an alias of the
+# canonical row, votes pointing at a variant row move to the canonical row,
+# their vote_tallies rows are recomputed from votes, and the variant catalog
+# rows are deleted. New ballots then resolve those spellings to the canonical
+# title in parse_ballot. Other workers pick up new aliases on their next
+# autocomplete refresh.
+register_query('title_aliases.upsert', """
+    INSERT INTO title_aliases (catalog, alias, title_id) VALUES (?, ?, ?)
+    ON CONFLICT (catalog, alias) DO UPDATE SET title_id = excluded.title_id
+""")
+register_query('title_aliases.repoint', "UPDATE title_aliases SET title_id = ? WHERE catalog = ? AND title_id = ?")
+register_query('tallies.items', "SELECT category_id, item_id, votes FROM vote_tallies")
+for table_name in AUTOCOMPLETE_TABLES:
+    in_catalog = catalog_categories_sql(table_name, 'category_id')
+    register_query(f'{table_name}.repoint_votes', f"UPDATE votes SET item_id = ? WHERE item_id = ? AND {in_catalog}")
+    register_query(f'{table_name}.delete_tallies', f"DELETE FROM vote_tallies WHERE item_id = ? AND {in_catalog}")
+    register_query(f'{table_name}.rebuild_tallies', f"""
+        INSERT INTO vote_tallies (category_id, item_id, points, voters, votes, rank_sum)
+        SELECT category_id, item_id, COALESCE(SUM(points), 0), COUNT(DISTINCT voter_id),
+               COUNT(*), COALESCE(SUM(rank), 0)
+        FROM votes
+        WHERE item_id = ? AND {in_catalog}
+        GROUP BY category_id, item_id
+    """)
+
+def catalog_item_votes(conn, table_name):
+    """{item_id: votes} over every category drawing from a catalog table"""
+    votes = {}
+    for cat_id, item_id, count in fetch_all(conn, 'tallies.items'):
+        if catalog_table_for(cat_id) == table_name:
+            votes[item_id] = votes.get(item_id, 0) + count
+    return votes
+
+def merge_titles(conn, table_name, canonical, variants):
+    """Fold variants (and every spelling sharing their title_key) into canonical. Caller commits."""
+    canonical_key = title_key(canonical)
+    keys = {title_key(variant) for variant in variants} | {canonical_key}
+    keys.discard('')
+    
+    run_query(conn, f'{table_name}.insert_missing', (canonical,))
+    rows = fetch_all(conn, f'{table_name}.ids')
+    canonical_id = next(row_id for row_id, name in rows if name == canonical)
+    merged = [(row_id, name) for row_id, name in rows if name != canonical and title_key(name) in keys]
+    aliases = sorted(keys - {canonical_key})
+    
+    if merged:
+        # Aliases of a merged row now point at the canonical one
+        run_many(conn, 'title_aliases.repoint', [(canonical_id, table_name, row_id) for row_id, _ in merged])
+    if aliases:
+        run_many(conn, 'title_aliases.upsert', [(table_name, alias, canonical_id) for alias in aliases])
+    
+    votes_moved = 0
+    if merged:
+        votes_moved = run_many(conn, f'{table_name}.repoint_votes',
+                               [(canonical_id, row_id) for row_id, _ in merged])
+        if votes_moved:
+            run_many(conn, f'{table_name}.delete_tallies',
+                     [(row_id,) for row_id, _ in merged] + [(canonical_id,)])
+            run_query(conn, f'{table_name}.rebuild_tallies', (canonical_id,))
+        run_many(conn, f'{table_name}.delete', [(row_id,) for row_id, _ in merged])
+    
+    return {
+        'canonical': canonical,
+        'merged': sorted(name for _, name in merged),
+        'aliases': aliases,
+        'votes_moved': votes_moved
+    }
+
+def duplicate_titles(table_name, limit=200):
+    """Catalog names sharing a title_key, most-voted group first and most-voted name first"""
+    with get_conn() as conn:
+        rows = fetch_all(conn, f'{table_name}.ids')
+        votes = catalog_item_votes(conn, table_name)
+    
+    groups = {}
+    for row_id, name in rows:
+        groups.setdefault(title_key(name), []).append({'name': name, 'votes': votes.get(row_id, 0)})
+    groups = [sorted(group, key=lambda g: (-g['votes'], g['name'])) for group in groups.values() if len(group) > 1]
+    groups.sort(key=lambda group: -sum(g['votes'] for g in group))
+    return groups[:limit]
+
+@app.route('/admin/titles/duplicates')
+def title_duplicates():
+    if not session.get('is_admin'):
+        return abort(403)
+    table_name = request.args.get('table', 'games')
+    if table_name not in AUTOCOMPLETE_TABLES:
+        return jsonify({"status": "error", "message": "Invalid table"}), 400
+    return jsonify({"status": "success", "table": table_name, "groups": duplicate_titles(table_name)})
+
+@app.route('/admin/titles/aliases')
+def list_title_aliases():
+    if not session.get('is_admin'):
+        return abort(403)
+    table_name = request.args.get('table', 'games')
+    if table_name not in AUTOCOMPLETE_TABLES:
+        return jsonify({"status": "error", "message": "Invalid table"}), 400
+    aliases = sorted(load_title_aliases(table_name), key=lambda a: (a[1], a[0]))
+    return jsonify({
+        "status": "success",
+        "table": table_name,
+        "aliases": [{"alias": alias, "canonical": canonical} for alias, canonical in aliases]
+    })
+
+@app.route('/admin/titles/merge', methods=['POST'])
+def merge_titles_route():
+    if not session.get('is_admin'):
+        return abort(403)
+    
+    data = request.get_json() or {}
+    table_name = data.get('table', 'games')
+    canonical = clean_title(data.get('canonical', ''))
+    variants = [clean_title(v) for v in data.get('variants', []) if isinstance(v, str)]
+    variants = [v for v in variants if v and v != canonical]
+    
+    if table_name not in AUTOCOMPLETE_TABLES:
+        return jsonify({"status": "error", "message": "Invalid table"}), 400
+    if not canonical or not variants:
+        return jsonify({"status": "error", "message": "Canonical title and at least one variant required"}), 400
+    
+    with get_conn() as conn:
+        result = merge_titles(conn, table_name, canonical, variants)
+        conn.commit()
+    
+    # Rebuild this worker's index with the new aliases on next use
+    autocomplete_indexes.pop(table_name, None)
+    bump_data_version(table_name)
+    if result['votes_moved']:
+        bump_data_version('votes')
+    return jsonify({"status": "success", "table": table_name, **result})
+
 @app.route('/admin/vote/<int:vid>', methods=['PUT'])
 def edit_vote(vid):
     if not session.get('is_admin'):
@@ -1288,23 +3709,20 @@ def edit_vote(vid):
     
     new_points = POINT_SYSTEM.get(new_rank, 0)
 
-    if DB_TYPE == 'postgres':
-        with get_conn() as conn:
-            with conn.cursor() as cur:
-                cur.execute("""
-                    UPDATE votes SET selection=%s, rank=%s, points=%s
-                    WHERE id=%s
-                """, (new_selection, new_rank, new_points, vid))
-                conn.commit()
-    else:
-        # SQLite
-        with get_conn() as conn:
-            conn.execute("""
-                UPDATE votes SET selection=?, rank=?, points=?
-                WHERE id=?
-            """, (new_selection, new_rank, new_points, vid))
-            conn.commit()
+    with get_conn() as conn:
+        old = fetch_one(conn, 'votes.get', (vid,))
+        if old is None:
+            return jsonify({"status": "error", "message": "Vote not found"}), 404
+        # The new selection becomes (or already is) a row of the category's catalog
+        table_name = catalog_table_for(old[1])
+        run_query(conn, f'{table_name}.insert_missing', (new_selection,))
+        new_item_id = fetch_value(conn, f'{table_name}.id_for', (new_selection,))
+        run_query(conn, 'votes.update', (new_item_id, new_rank, new_points, vid))
+        apply_tally_deltas(conn, edit_tally_deltas(conn, old, new_item_id, new_rank, new_points))
+        conn.commit()
 
+    autocomplete_added(table_name, new_selection)
+    bump_data_version('votes')
     return jsonify({"status": "success"})
 
 # ✅ Admin Modify Categories
@@ -1337,7 +3755,7 @@ def add_category():
                 """, (name_ar, name_en, description, display_order))
                 conn.commit()
                 cur.execute("SELECT id FROM categories WHERE name_ar=%s", (name_ar,))
-                return jsonify({"status": "success" if cur.fetchone() else "error"})
+                added = cur.fetchone() is not None
     else:
         # SQLite
         with get_conn() as conn:
@@ -1352,7 +3770,10 @@ def add_category():
             """, (name_ar, name_en, description, display_order))
             conn.commit()
             cursor = conn.execute("SELECT id FROM categories WHERE name_ar=?", (name_ar,))
-            return jsonify({"status": "success" if cursor.fetchone() else "error"})
+            added = cursor.fetchone() is not None
+    
+    bump_data_version('categories')
+    return jsonify({"status": "success" if added else "error"})
 
 @app.route('/admin/category/<int:cid>', methods=['PUT'])
 def edit_category(cid):
@@ -1403,6 +3824,7 @@ def edit_category(cid):
                 """, (new_name_ar, new_name_en, new_description, cid))
             conn.commit()
     
+    bump_data_version('categories')
     return jsonify({"status": "success"})
 
 @app.route('/admin/category/<int:cid>', methods=['DELETE'])
@@ -1430,6 +3852,7 @@ def delete_category(cid):
             conn.execute("DELETE FROM categories WHERE id=?", (cid,))
             conn.commit()
     
+    bump_data_version('categories')
     return jsonify({"status": "success"})
 
 @app.route('/admin/vote/<int:vid>', methods=['DELETE'])
@@ -1437,17 +3860,18 @@ def delete_vote(vid):
     if not session.get('is_admin'): 
         return abort(403)
     
-    if DB_TYPE == 'postgres':
-        with get_conn() as conn:
-            with conn.cursor() as cur:
-                cur.execute("DELETE FROM votes WHERE id=%s", (vid,))
-                conn.commit()
-    else:
-        # SQLite
-        with get_conn() as conn:
-            conn.execute("DELETE FROM votes WHERE id=?", (vid,))
-            conn.commit()
+    with get_conn() as conn:
+        row = fetch_one(conn, 'votes.delete_returning', (vid,))
+        if row:
+            # Free the name again once the voter has no votes left
+            released = fetch_one(conn, 'ballots.release', (row[0], row[0]))
+            apply_tally_deltas(conn, delete_tally_deltas(conn, row))
+        conn.commit()
     
+    if row and released:
+        voter_registry.discard(released[0])
+    
+    bump_data_version('votes')
     return jsonify({"status": "success"})
 
 @app.route('/check-name', methods=['POST'])
@@ -1456,190 +3880,261 @@ def check_name():
     if name == ADMIN_USERNAME:
         return jsonify(status='admin')
     
+    # Ballot accepted but not written yet by the ballot writer
+    if ballot_journal is not None and ballot_journal.is_pending(sanitize_input(name)):
+        return jsonify(status='pending')
+    
+    return jsonify(status='exists' if voter_registry.has_voted(name) else 'new')
+
+# ✅ Excel Export (streamed from server-side cursors into a write-only workbook)
+EXPORT_BATCH_SIZE = 1000
+EXCEL_MIMETYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+EXPORT_SHEETS = [
+    ('Category Rankings', f"""
+        SELECT 
+            c.name_ar as category,
+            {selection_sql('t.category_id', 't.item_id')} as selection,
+            t.points as total_points,
+            t.voters as voter_count,
+            ROUND(t.rank_sum * 1.0 / t.votes, 2) as avg_rank
+        FROM vote_tallies t
+        JOIN categories c ON t.category_id = c.id
+        ORDER BY c.display_order, total_points DESC
+    """),
+    ('All Votes', """
+        SELECT 
+            v.voter_name,
+            c.name_ar as category,
+            v.rank,
+            v.selection,
+            v.points,
+            v.timestamp
+        FROM vote_details v
+        JOIN categories c ON v.category_id = c.id
+        ORDER BY v.timestamp DESC, c.display_order, v.rank
+    """),
+    ('Games List', "SELECT name, created_at FROM games ORDER BY name"),
+    ('2026 Games List', "SELECT name, created_at FROM games_2026 ORDER BY name"),
+    ('Publishers List', "SELECT name, created_at FROM publishers ORDER BY name"),
+]
+
+def stream_query(conn, sql, params=(), cursor_name='export'):
+    """Yield the column names, then every row, holding at most one batch in memory"""
     if DB_TYPE == 'postgres':
-        with get_conn() as conn:
-            with conn.cursor() as cur:
-                cur.execute("SELECT 1 FROM votes WHERE voter_name=%s LIMIT 1", (name,))
-                return jsonify(status='exists' if cur.fetchone() else 'new')
+        # Named cursor = server-side cursor, rows arrive EXPORT_BATCH_SIZE at a time
+        with conn.cursor(name=cursor_name) as cur:
+            cur.itersize = EXPORT_BATCH_SIZE
+            # Server-side cursors bypass TimedCursor - count the statement here
+            started = time.perf_counter()
+            cur.execute(sql, params)
+            record_db_statement(time.perf_counter() - started)
+            yield [desc[0] for desc in cur.description]
+            yield from cur
     else:
         # SQLite
-        with get_conn() as conn:
-            cursor = conn.execute("SELECT 1 FROM votes WHERE voter_name=? LIMIT 1", (name,))
-            return jsonify(status='exists' if cursor.fetchone() else 'new')
-
-# ✅ Excel Export (updated for new structure)
-@app.route('/download-excel')
-def download_excel():
-    if not session.get('is_admin'):
-        return abort(403)
+        cursor = conn.execute(sql, params)
+        yield [description[0] for description in cursor.description]
+        while True:
+            rows = cursor.fetchmany(EXPORT_BATCH_SIZE)
+            if not rows:
+                break
+            yield from rows
 
-    output = BytesIO()
-    
+def export_summary(conn):
+    summary_sql = """
+        SELECT
+            (SELECT COUNT(*) FROM ballots),
+            (SELECT COUNT(*) FROM categories),
+            (SELECT COUNT(*) FROM games),
+            (SELECT COUNT(*) FROM games_2026),
+            (SELECT COUNT(*) FROM publishers)
+    """
     if DB_TYPE == 'postgres':
-        with get_conn() as conn:
-            with conn.cursor() as cur:
-                # Category rankings
-                cur.execute("""
-                    SELECT 
-                        c.name_ar as category,
-                        v.selection,
-                        SUM(v.points) as total_points,
-                        COUNT(DISTINCT v.voter_name) as voter_count,
-                        ROUND(AVG(v.rank), 2) as avg_rank
-                    FROM votes v
-                    JOIN categories c ON v.category_id = c.id
-                    GROUP BY c.id, v.selection
-                    ORDER BY c.display_order, total_points DESC
-                """)
-                rankings_data = cur.fetchall()
-                rankings_columns = [desc[0] for desc in cur.description]
-
-                # All votes with category names
-                cur.execute("""
-                    SELECT 
-                        v.voter_name,
-                        c.name_ar as category,
-                        v.rank,
-                        v.selection,
-                        v.points,
-                        v.timestamp
-                    FROM votes v
-                    JOIN categories c ON v.category_id = c.id
-                    ORDER BY v.timestamp DESC, c.display_order, v.rank
-                """)
-                votes_data = cur.fetchall()
-                votes_columns = [desc[0] for desc in cur.description]
-                
-                # Games list
-                cur.execute("SELECT name, created_at FROM games ORDER BY name")
-                games_data = cur.fetchall()
-                games_columns = [desc[0] for desc in cur.description]
-                
-                # 2026 Games list
-                cur.execute("SELECT name, created_at FROM games_2026 ORDER BY name")
-                games_2026_data = cur.fetchall()
-                games_2026_columns = [desc[0] for desc in cur.description]
-                
-                # Publishers list
-                cur.execute("SELECT name, created_at FROM publishers ORDER BY name")
-                publishers_data = cur.fetchall()
-                publishers_columns = [desc[0] for desc in cur.description]
-                
-                # Get summary data
-                cur.execute("SELECT COUNT(DISTINCT voter_name) FROM votes")
-                total_voters = cur.fetchone()[0]
-                
-                cur.execute("SELECT COUNT(*) FROM categories")
-                total_categories = cur.fetchone()[0]
-                
-                cur.execute("SELECT COUNT(*) FROM games")
-                total_games = cur.fetchone()[0]
-                
-                cur.execute("SELECT COUNT(*) FROM games_2026")
-                total_games_2026 = cur.fetchone()[0]
-                
-                cur.execute("SELECT COUNT(*) FROM publishers")
-                total_publishers = cur.fetchone()[0]
+        with conn.cursor() as cur:
+            cur.execute(summary_sql)
+            total_voters, total_categories, total_games, total_games_2026, total_publishers = cur.fetchone()
     else:
         # SQLite
-        with get_conn() as conn:
-            # Category rankings
-            cursor = conn.execute("""
-                SELECT 
-                    c.name_ar as category,
-                    v.selection,
-                    SUM(v.points) as total_points,
-                    COUNT(DISTINCT v.voter_name) as voter_count,
-                    ROUND(AVG(v.rank), 2) as avg_rank
-                FROM votes v
-                JOIN categories c ON v.category_id = c.id
-                GROUP BY c.id, v.selection
-                ORDER BY c.display_order, total_points DESC
-            """)
-            rankings_data = cursor.fetchall()
-            rankings_columns = [description[0] for description in cursor.description]
-
-            # All votes with category names
-            cursor = conn.execute("""
-                SELECT 
-                    v.voter_name,
-                    c.name_ar as category,
-                    v.rank,
-                    v.selection,
-                    v.points,
-                    v.timestamp
-                FROM votes v
-                JOIN categories c ON v.category_id = c.id
-                ORDER BY v.timestamp DESC, c.display_order, v.rank
-            """)
-            votes_data = cursor.fetchall()
-            votes_columns = [description[0] for description in cursor.description]
-            
-            # Games list
-            cursor = conn.execute("SELECT name, created_at FROM games ORDER BY name")
-            games_data = cursor.fetchall()
-            games_columns = [description[0] for description in cursor.description]
-            
-            # 2026 Games list
-            cursor = conn.execute("SELECT name, created_at FROM games_2026 ORDER BY name")
-            games_2026_data = cursor.fetchall()
-            games_2026_columns = [description[0] for description in cursor.description]
-            
-            # Publishers list
-            cursor = conn.execute("SELECT name, created_at FROM publishers ORDER BY name")
-            publishers_data = cursor.fetchall()
-            publishers_columns = [description[0] for description in cursor.description]
-            
-            # Get summary data
-            cursor = conn.execute("SELECT COUNT(DISTINCT voter_name) FROM votes")
-            total_voters = cursor.fetchone()[0]
-            
-            cursor = conn.execute("SELECT COUNT(*) FROM categories")
-            total_categories = cursor.fetchone()[0]
-            
-            cursor = conn.execute("SELECT COUNT(*) FROM games")
-            total_games = cursor.fetchone()[0]
-            
-            cursor = conn.execute("SELECT COUNT(*) FROM games_2026")
-            total_games_2026 = cursor.fetchone()[0]
-            
-            cursor = conn.execute("SELECT COUNT(*) FROM publishers")
-            total_publishers = cursor.fetchone()[0]
-
-    # ✅ Convert query results to DataFrames
-    rankings_df = pd.DataFrame(rankings_data, columns=rankings_columns)
-    votes_df = pd.DataFrame(votes_data, columns=votes_columns)
-    games_df = pd.DataFrame(games_data, columns=games_columns)
-    games_2026_df = pd.DataFrame(games_2026_data, columns=games_2026_columns)
-    publishers_df = pd.DataFrame(publishers_data, columns=publishers_columns)
-    
-    # Create summary DataFrame
-    summary_df = pd.DataFrame({
-        'Metric': ['Total Voters', 'Total Categories', 'Total Games', 'Total 2026 Games', 'Total Publishers', 'Total Votes', 'System'],
-        'Value': [total_voters, total_categories, total_games, total_games_2026, total_publishers, total_voters * 45, 'Mixed System (5,4,3,2,1 for Best Games, 5 for others)']
-    })
+        total_voters, total_categories, total_games, total_games_2026, total_publishers = conn.execute(summary_sql).fetchone()
+    
+    return [
+        ('Total Voters', total_voters),
+        ('Total Categories', total_categories),
+        ('Total Games', total_games),
+        ('Total 2026 Games', total_games_2026),
+        ('Total Publishers', total_publishers),
+        ('Total Votes', total_voters * 45),
+        ('System', 'Mixed System (5,4,3,2,1 for Best Games, 5 for others)'),
+    ]
+
+def write_excel_export(fileobj):
+    """Write the admin workbook to fileobj without materializing any table"""
+    # openpyxl (and the numpy it pulls in) costs every worker ~300ms and ~20MB
+    # at import, so it is only loaded once an admin actually exports
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Font
+    
+    workbook = Workbook(write_only=True)
+    header_font = Font(bold=True)
+    
+    def header_row(sheet, columns):
+        cells = []
+        for column in columns:
+            cell = WriteOnlyCell(sheet, value=column)
+            cell.font = header_font
+            cells.append(cell)
+        return cells
+    
+    with get_conn() as conn:
+        for index, (sheet_name, sql) in enumerate(EXPORT_SHEETS):
+            sheet = workbook.create_sheet(sheet_name)
+            rows = stream_query(conn, sql, cursor_name=f'export_{index}')
+            sheet.append(header_row(sheet, next(rows)))
+            for row in rows:
+                sheet.append(list(row))
+        
+        summary = workbook.create_sheet('Summary')
+        summary.append(header_row(summary, ['Metric', 'Value']))
+        for metric in export_summary(conn):
+            summary.append(list(metric))
+    
+    workbook.save(fileobj)
 
-    # ✅ Write to Excel
-    with pd.ExcelWriter(output, engine='openpyxl') as writer:
-        rankings_df.to_excel(writer, sheet_name='Category Rankings', index=False)
-        votes_df.to_excel(writer, sheet_name='All Votes', index=False)
-        games_df.to_excel(writer, sheet_name='Games List', index=False)
-        games_2026_df.to_excel(writer, sheet_name='2026 Games List', index=False)
-        publishers_df.to_excel(writer, sheet_name='Publishers List', index=False)
-        summary_df.to_excel(writer, sheet_name='Summary', index=False)
+@app.route('/download-excel')
+def download_excel():
+    if not session.get('is_admin'):
+        return abort(403)
 
+    # Sheets are spooled to disk by openpyxl and the finished file is streamed
+    # back in chunks by send_file, so memory stays flat however big votes gets
+    output = tempfile.TemporaryFile()
+    started = time.perf_counter()
+    try:
+        write_excel_export(output)
+    except Exception:
+        output.close()
+        raise
+    metrics.observe('tg_export_duration_seconds', time.perf_counter() - started, (('format', 'xlsx'),))
     output.seek(0)
     return send_file(
         output,
         as_attachment=True,
         download_name="tg_awards_2025.xlsx",
-        mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+        mimetype=EXCEL_MIMETYPE
     )
 
+# ✅ Raw data export (CSV / NDJSON, streamed)
+# /admin/export/<dataset>?format=csv|ndjson&since=<id>
+# Rows come from a server-side cursor and are flushed every EXPORT_FLUSH_BYTES,
+# so only one batch is ever in memory. `since` returns rows with id > since,
+# for incremental pulls. Output is gzipped when the client accepts it.
+EXPORT_FLUSH_BYTES = 64 * 1024
+
+EXPORT_DATASETS = {
+    'votes': ("""
+        SELECT v.id, v.voter_name, v.category_id, c.name_ar as category,
+               v.rank, v.selection, v.points, v.timestamp
+        FROM vote_details v
+        JOIN categories c ON v.category_id = c.id
+        {where}
+        ORDER BY v.id
+    """, 'v.id'),
+    'categories': ("SELECT id, name_ar, name_en, description, display_order FROM categories {where} ORDER BY id", 'id'),
+    'games': ("SELECT id, name, created_at FROM games {where} ORDER BY id", 'id'),
+    'games_2026': ("SELECT id, name, created_at FROM games_2026 {where} ORDER BY id", 'id'),
+    'publishers': ("SELECT id, name, created_at FROM publishers {where} ORDER BY id", 'id'),
+    'rankings': (f"""
+        SELECT t.category_id, c.name_ar as category, {selection_sql('t.category_id', 't.item_id')} as selection,
+               t.points as total_points, t.voters as voter_count,
+               ROUND(t.rank_sum * 1.0 / t.votes, 2) as avg_rank
+        FROM vote_tallies t
+        JOIN categories c ON t.category_id = c.id
+        ORDER BY c.display_order, total_points DESC
+    """, None),
+}
+
+def json_default(value):
+    if isinstance(value, Decimal):
+        return float(value)
+    return str(value)
+
+def encode_csv(rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow(row)
+        if buffer.tell() >= EXPORT_FLUSH_BYTES:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode('utf-8')
+
+def encode_ndjson(rows):
+    columns = next(rows)
+    chunk = []
+    size = 0
+    for row in rows:
+        line = json.dumps(dict(zip(columns, row)), ensure_ascii=False, default=json_default) + '\n'
+        chunk.append(line)
+        size += len(line)
+        if size >= EXPORT_FLUSH_BYTES:
+            yield ''.join(chunk).encode('utf-8')
+            chunk, size = [], 0
+    if chunk:
+        yield ''.join(chunk).encode('utf-8')
+
+@app.route('/admin/export/<dataset>')
+def export_dataset(dataset):
+    if not session.get('is_admin'):
+        return jsonify({"status": "error", "message": "Unauthorized"}), 403
+    
+    if dataset not in EXPORT_DATASETS:
+        return jsonify({"status": "error", "message": "Invalid dataset"}), 400
+    
+    fmt = request.args.get('format', 'csv')
+    if fmt not in ('csv', 'ndjson'):
+        return jsonify({"status": "error", "message": "Format must be csv or ndjson"}), 400
+    
+    sql, id_column = EXPORT_DATASETS[dataset]
+    where, params = "", ()
+    since = request.args.get('since')
+    if since:
+        if id_column is None:
+            return jsonify({"status": "error", "message": f"'{dataset}' does not support since"}), 400
+        try:
+            params = (int(since),)
+        except ValueError:
+            return jsonify({"status": "error", "message": "since must be an integer id"}), 400
+        where = f"WHERE {id_column} > {'%s' if DB_TYPE == 'postgres' else '?'}"
+    sql = sql.format(where=where)
+    
+    def generate():
+        started = time.perf_counter()
+        with get_conn() as conn:
+            rows = stream_query(conn, sql, params, cursor_name=f'export_{dataset}')
+            yield from encode_csv(rows) if fmt == 'csv' else encode_ndjson(rows)
+        metrics.observe('tg_export_duration_seconds', time.perf_counter() - started, (('format', fmt),))
+    
+    headers = {
+        'Content-Disposition': f'attachment; filename=tg_{dataset}.{fmt}',
+        'Cache-Control': 'no-store'
+    }
+    # compress_response streams it as br/zstd/gzip when the client accepts one
+    mimetype = 'text/csv' if fmt == 'csv' else 'application/x-ndjson'
+    return Response(stream_with_context(generate()), mimetype=mimetype, headers=headers)
+
 # ✅ Start App
 if __name__ == '__main__':
     print("🔄 Initializing database...")
     init_db()
+    if BALLOT_QUEUE:
+        start_ballot_queue()
+    db_initialized = True
     warmup_db()
+    load_autocomplete_indexes()
+    voter_registry.load()
     print("✅ Ready. Server running...")
     app.run(host="0.0.0.0", port=int(os.environ.get("PORT", 5000)), debug=True)
@@ -0,0 +1,405 @@
+# ASGI entry point (opt-in) - the voting-night hot paths on an event loop.
+#
+#   uvicorn asgi:app --host 0.0.0.0 --port $PORT --workers 2
+#   gunicorn -k uvicorn.workers.UvicornWorker asgi:app
+#
+# GET /suggestions and POST /submit run as async handlers: Postgres through
+# psycopg_pool.AsyncConnectionPool, SQLite through aiosqlite. A request waiting
+# for a connection or a query holds no thread, so a couple of workers carry
+# thousands of concurrent autocomplete and submit requests. Every other route is
+# the Flask app, run on a thread pool by asgiref's WsgiToAsgi, so the URL surface
+# is the same as `gunicorn app:app`.
+#
+# The async handlers reuse the Flask request context (hooks, metrics, ETags,
+# compression and the rate limiter behave the same); only the database calls
+# differ. Requests past the pool's DB_POOL_TIMEOUT get a 503 - MAX_INFLIGHT
+# throttles threads and doesn't apply here. Until the worker's first request has
+# initialized the database every request goes through Flask, which runs ensure_db.
+import asyncio
+import io
+import sys
+import time
+from collections import defaultdict
+from contextlib import asynccontextmanager
+
+from asgiref.wsgi import WsgiToAsgi
+from flask import jsonify, request
+
+import app as tg
+
+flask_app = tg.app
+wsgi_app = WsgiToAsgi(flask_app)
+
+# ✅ Async database access
+if tg.DB_TYPE == 'postgres':
+    from psycopg_pool import AsyncConnectionPool, PoolTimeout
+
+    class AsyncPool:
+        def __init__(self):
+            self.pool = AsyncConnectionPool(conninfo=tg.DB_URL, min_size=1, max_size=tg.DB_POOL_SIZE,
+                                            timeout=tg.DB_POOL_TIMEOUT, open=False)
+
+        async def open(self):
+            await self.pool.open()
+
+        async def close(self):
+            await self.pool.close()
+
+        @asynccontextmanager
+        async def connection(self):
+            async with self.pool.connection() as conn:
+                yield conn
+else:
+    import aiosqlite
+
+    class PoolTimeout(Exception):
+        pass
+
+    class AsyncPool:
+        """Up to DB_POOL_SIZE aiosqlite connections (each runs its queries on its own thread)"""
+        def __init__(self):
+            self.slots = asyncio.Semaphore(tg.DB_POOL_SIZE)
+            self.idle = []
+
+        async def open(self):
+            pass
+
+        async def close(self):
+            while self.idle:
+                await self.idle.pop().close()
+
+        async def open_connection(self):
+            conn = await aiosqlite.connect(tg.DB_PATH, timeout=tg.SQLITE_BUSY_TIMEOUT_MS / 1000,
+                                           cached_statements=tg.SQLITE_CACHED_STATEMENTS)
+            for pragma in tg.SQLITE_PRAGMAS:
+                await conn.execute(pragma)
+            return conn
+
+        @asynccontextmanager
+        async def connection(self):
+            try:
+                await asyncio.wait_for(self.slots.acquire(), tg.DB_POOL_TIMEOUT)
+            except asyncio.TimeoutError:
+                raise PoolTimeout(f"no connection free after {tg.DB_POOL_TIMEOUT}s") from None
+            try:
+                conn = self.idle.pop() if self.idle else await self.open_connection()
+                try:
+                    yield conn
+                finally:
+                    # Same contract as SQLiteConnection: uncommitted work is rolled back
+                    if conn.in_transaction:
+                        await conn.rollback()
+                    self.idle.append(conn)
+            finally:
+                self.slots.release()
+
+DB_BUSY_ERRORS = (PoolTimeout,)
+
+db_pool = None  # opened by the lifespan startup, on the worker's event loop
+refresh_locks = None
+
+@asynccontextmanager
+async def get_conn():
+    started = time.perf_counter()
+    async with db_pool.connection() as conn:
+        tg.metrics.observe('tg_db_pool_wait_seconds', time.perf_counter() - started)
+        yield conn
+
+async def execute(conn, sql, params=(), prepare=None):
+    """conn.execute, feeding the slow-query log and the request's DB totals"""
+    started = time.perf_counter()
+    if tg.DB_TYPE == 'postgres':
+        cursor = await conn.execute(sql, params, prepare=prepare)
+    else:
+        cursor = await conn.execute(sql, params)
+    elapsed = time.perf_counter() - started
+    tg.record_db_statement(elapsed)
+    # No EXPLAIN from here - the plan is captured when a sync route runs the statement
+    tg.slow_query_log.record(sql, params, elapsed, None)
+    return cursor
+
+async def run_query(conn, name, params=()):
+    """app.run_query on an async connection"""
+    started = time.perf_counter()
+    try:
+        return await execute(conn, tg.QUERIES[name], params, prepare=True)
+    finally:
+        tg.record_query_time(name, time.perf_counter() - started)
+
+async def fetch_all(conn, name, params=()):
+    cursor = await run_query(conn, name, params)
+    return [tuple(row) for row in await cursor.fetchall()]
+
+async def run_many(conn, name, rows):
+    """app.run_many on an async connection"""
+    sql = tg.QUERIES[name]
+    started = time.perf_counter()
+    try:
+        if tg.DB_TYPE == 'postgres':
+            async with conn.cursor() as cur:
+                await cur.executemany(sql, rows)
+                return cur.rowcount
+        cursor = await conn.executemany(sql, rows)
+        return cursor.rowcount
+    finally:
+        elapsed = time.perf_counter() - started
+        tg.record_query_time(name, elapsed)
+        tg.record_db_statement(elapsed)
+        tg.slow_query_log.record(sql, rows, elapsed, None, many=True)
+
+async def insert_ballot(conn, name, vote_rows, catalog_rows):
+    """app.insert_ballot on an async connection. Caller commits."""
+    tables = sorted({table_name for table_name, _ in catalog_rows})
+    aliases = {table_name: dict(await fetch_all(conn, f'{table_name}.aliases', (table_name,)))
+               for table_name in tables}
+    vote_rows, catalog_rows = tg.retarget_ballot(tg.alias_targets(aliases, catalog_rows), vote_rows, catalog_rows)
+    catalog_names = tg.ballot_catalog_names(catalog_rows)
+
+    if tg.DB_TYPE == 'postgres':
+        await execute(conn, tg.BALLOT_CATALOG_INSERT_SQL,
+                      (catalog_names['games'], catalog_names['publishers'], catalog_names['games_2026']))
+        cursor = await execute(conn, *tg.ballot_votes_insert(name, vote_rows))
+        item_rows = await cursor.fetchall()
+    else:
+        for table_name, names in catalog_names.items():
+            if names:
+                await run_many(conn, f'{table_name}.insert_missing', [(n,) for n in names])
+        voter_id = (await run_query(conn, 'ballots.insert', (name,))).lastrowid
+        await run_many(conn, 'votes.insert', [(voter_id,) + row for row in vote_rows])
+        item_rows = await fetch_all(conn, 'votes.for_voter_id', (voter_id,))
+
+    # A new ballot only adds to the tallies, so there is nothing to prune
+    deltas = tg.ballot_tally_deltas(item_rows)
+    if deltas:
+        await run_many(conn, 'tallies.apply', deltas)
+    return catalog_rows
+
+# ✅ Caches (refreshed here so the shared code below finds them fresh)
+async def refresh_autocomplete(table_name):
+    index = tg.autocomplete_indexes.get(table_name)
+    if not tg.autocomplete_stale(index):
+        return index
+    async with refresh_locks[table_name]:
+        index = tg.autocomplete_indexes.get(table_name)
+        if not tg.autocomplete_stale(index):
+            return index
+        async with get_conn() as conn:
+            names = [row[0] for row in await fetch_all(conn, f'{table_name}.names')]
+            aliases = await fetch_all(conn, f'{table_name}.aliases', (table_name,))
+        # Building the trie is CPU work - keep the loop answering other requests meanwhile
+        fresh = await asyncio.to_thread(tg.build_autocomplete_index, names, aliases, index)
+        # A Flask thread may have refreshed (or a merge dropped) it while we were loading
+        if tg.autocomplete_indexes.get(table_name) is index:
+            tg.autocomplete_indexes[table_name] = fresh
+        return fresh
+
+async def refresh_categories():
+    if not tg.categories_snapshot_stale(tg.categories_snapshot):
+        return
+    async with refresh_locks['categories']:
+        snapshot = tg.categories_snapshot
+        if not tg.categories_snapshot_stale(snapshot):
+            return
+        version = tg.data_versions['categories']
+        async with get_conn() as conn:
+            rows = await fetch_all(conn, 'categories.list')
+        if tg.categories_snapshot is snapshot:
+            tg.categories_snapshot = tg.categories_snapshot_from_rows(rows, version, snapshot)
+
+# ✅ Async routes
+async def get_suggestions():
+    category_id = request.args.get('category_id', '')
+    search = request.args.get('search', '').strip()
+    limit = tg.parse_limit(request.args.get('limit', 20))
+
+    if not category_id:
+        return jsonify([])
+
+    index = await refresh_autocomplete(tg.suggestions_table(category_id))
+    return tg.index_response(index, search, limit)
+
+async def submit_vote():
+    data = request.get_json()
+    name = tg.sanitize_input(data.get('name', ''))
+    votes_by_category = data.get('votes', {})
+
+    if not name:
+        return jsonify({'status': 'error', 'message': 'Name is required'}), 400
+
+    # parse_ballot reads the category snapshot and the autocomplete indexes
+    await refresh_categories()
+    for table_name in tg.AUTOCOMPLETE_TABLES:
+        await refresh_autocomplete(table_name)
+    try:
+        vote_rows, catalog_rows = tg.parse_ballot(votes_by_category)
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+
+    if tg.ballot_journal is not None:
+        # An acknowledged queued ballot must not be a duplicate, so this needs the
+        # registry's full catch-up with other workers - it runs on a thread
+        if await asyncio.to_thread(tg.voter_registry.has_voted, name) or \
+                not await asyncio.to_thread(tg.ballot_journal.append, name, vote_rows, catalog_rows):
+            return jsonify({'status': 'error', 'message': 'You have already voted'}), 403
+        return jsonify({'status': 'success', 'queued': True})
+
+    try:
+        async with get_conn() as conn:
+            catalog_rows = await insert_ballot(conn, name, vote_rows, catalog_rows)
+            await conn.commit()
+    except tg.IntegrityError:
+        # ballots.voter_name is UNIQUE - the duplicate check costs nothing extra here
+        return jsonify({'status': 'error', 'message': 'You have already voted'}), 403
+    except DB_BUSY_ERRORS:
+        raise
+    except Exception as e:
+        print(f"Error submitting vote: {e}")
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+    tg.ballot_committed(name, catalog_rows)
+    return jsonify({'status': 'success'})
+
+ASYNC_ROUTES = {
+    ('GET', '/suggestions'): get_suggestions,
+    ('HEAD', '/suggestions'): get_suggestions,
+    ('POST', '/submit'): submit_vote,
+}
+
+# ✅ ASGI plumbing
+def wsgi_environ(scope, body):
+    """The WSGI environ Flask would have seen for this request"""
+    script_name = scope.get('root_path', '').encode('utf8').decode('latin1')
+    path_info = scope['path'].encode('utf8').decode('latin1')
+    if path_info.startswith(script_name):
+        path_info = path_info[len(script_name):]
+    server = scope.get('server') or ('localhost', 80)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': script_name,
+        'PATH_INFO': path_info,
+        'QUERY_STRING': scope['query_string'].decode('ascii'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': f"HTTP/{scope['http_version']}",
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+    if scope.get('client'):
+        environ['REMOTE_ADDR'] = scope['client'][0]
+    headers = defaultdict(list)
+    for name, value in scope['headers']:
+        name = name.decode('latin1')
+        if name in ('content-length', 'content-type'):
+            key = name.upper().replace('-', '_')
+        else:
+            key = 'HTTP_' + name.upper().replace('-', '_')
+        headers[key].append(value.decode('latin1'))
+    environ.update((key, ','.join(values)) for key, values in headers.items())
+    # The body is already buffered - its length is known even for a chunked upload
+    environ['CONTENT_LENGTH'] = str(len(body))
+    return environ
+
+async def read_body(receive):
+    body = bytearray()
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            return None
+        body += message.get('body', b'')
+        if not message.get('more_body'):
+            return bytes(body)
+
+async def before_request():
+    """The async equivalent of the Flask before_request hooks"""
+    tg.start_request_timer()
+    route_class = tg.RATE_LIMITED_ENDPOINTS.get(request.endpoint)
+    if route_class is None or not tg.RATE_LIMIT_ENABLED:
+        return None
+    if tg.RATE_LIMIT_DB:
+        # The shared bucket file is a (short) blocking write
+        return await asyncio.to_thread(tg.rate_limited_response, route_class)
+    return tg.rate_limited_response(route_class)
+
+async def send_response(response, environ, send):
+    headers = response.get_wsgi_headers(environ)
+    body = response.get_app_iter(environ)
+    try:
+        await send({
+            'type': 'http.response.start',
+            'status': response.status_code,
+            'headers': [(k.lower().encode('latin1'), v.encode('latin1')) for k, v in headers.to_wsgi_list()],
+        })
+        for chunk in body:
+            if chunk:
+                await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+        await send({'type': 'http.response.body', 'body': b''})
+    finally:
+        if hasattr(body, 'close'):
+            body.close()
+
+async def serve(handler, scope, receive, send):
+    body = await read_body(receive)
+    if body is None:
+        return
+    environ = wsgi_environ(scope, body)
+    # Flask's request context lives in contextvars, so each request's task has its own
+    ctx = flask_app.request_context(environ)
+    error = None
+    ctx.push()
+    try:
+        try:
+            try:
+                rv = await before_request() or await handler()
+            except DB_BUSY_ERRORS as e:
+                rv = tg.database_busy(e)
+            except Exception as e:
+                rv = flask_app.handle_user_exception(e)
+            response = flask_app.finalize_request(rv)
+        except Exception as e:
+            error = e
+            response = flask_app.handle_exception(e)
+        await send_response(response, environ, send)
+    finally:
+        ctx.pop(error)
+
+async def startup():
+    global db_pool, refresh_locks
+    pool = AsyncPool()
+    await pool.open()
+    db_pool = pool
+    refresh_locks = defaultdict(asyncio.Lock)
+    print(f"✅ ASGI mode: async {tg.DB_TYPE} pool of {tg.DB_POOL_SIZE} for /suggestions and /submit")
+
+async def shutdown():
+    global db_pool
+    pool, db_pool = db_pool, None
+    if pool is not None:
+        await pool.close()
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            try:
+                await startup()
+            except Exception as e:
+                await send({'type': 'lifespan.startup.failed', 'message': str(e)})
+                return
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            await shutdown()
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+async def app(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        return await lifespan(receive, send)
+    handler = ASYNC_ROUTES.get((scope.get('method'), scope.get('path'))) if scope['type'] == 'http' else None
+    if handler is None or db_pool is None or not tg.db_initialized:
+        return await wsgi_app(scope, receive, send)
+    return await serve(handler, scope, receive, send)
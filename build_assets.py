@@ -0,0 +1,80 @@
+"""Static asset build.
+
+Copies every file under static/css and static/js into static/dist under a
+content-hashed name (css/style.css -> css/style.1a2b3c4d5e.css), writes
+gzip and - when the `brotli` package is installed - brotli variants next to
+each copy, and records the mapping in static/dist/manifest.json.
+
+    python build_assets.py
+
+app.py reads the manifest on startup: templates link the hashed names through
+asset_url(), and /assets/ serves them with immutable caching, picking the .br
+or .gz file by Accept-Encoding. Without a manifest the templates fall back to
+the plain /static/ files, so development works without running this.
+"""
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import sys
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+STATIC_DIR = os.path.join(ROOT, 'static')
+DIST_DIR = os.path.join(STATIC_DIR, 'dist')
+SOURCE_DIRS = ('css', 'js')
+COMPRESSIBLE = ('.css', '.js', '.svg', '.json', '.txt')
+HASH_LENGTH = 10
+
+
+def hashed_name(path, data):
+    stem, ext = os.path.splitext(path)
+    return f"{stem}.{hashlib.sha256(data).hexdigest()[:HASH_LENGTH]}{ext}"
+
+
+def write_file(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(data)
+
+
+def build():
+    if os.path.isdir(DIST_DIR):
+        shutil.rmtree(DIST_DIR)
+    manifest = {}
+    for source_dir in SOURCE_DIRS:
+        for dirpath, _, filenames in os.walk(os.path.join(STATIC_DIR, source_dir)):
+            for filename in sorted(filenames):
+                source = os.path.join(dirpath, filename)
+                logical = os.path.relpath(source, STATIC_DIR).replace(os.sep, '/')
+                with open(source, 'rb') as f:
+                    data = f.read()
+                target = hashed_name(logical, data)
+                write_file(os.path.join(DIST_DIR, target), data)
+                sizes = [f"{len(data)}B"]
+                if logical.endswith(COMPRESSIBLE):
+                    # mtime=0 keeps the .gz byte-identical across builds
+                    gz = gzip.compress(data, compresslevel=9, mtime=0)
+                    write_file(os.path.join(DIST_DIR, target + '.gz'), gz)
+                    sizes.append(f"gz {len(gz)}B")
+                    if brotli is not None:
+                        br = brotli.compress(data, quality=11)
+                        write_file(os.path.join(DIST_DIR, target + '.br'), br)
+                        sizes.append(f"br {len(br)}B")
+                manifest[logical] = target
+                print(f"✅ {logical} -> {target} ({', '.join(sizes)})")
+
+    write_file(os.path.join(DIST_DIR, 'manifest.json'),
+               json.dumps(manifest, indent=2, sort_keys=True).encode('utf-8'))
+    if brotli is None:
+        print("⚠️ brotli not installed - only gzip variants were written", file=sys.stderr)
+    print(f"✅ Wrote {len(manifest)} assets to {os.path.relpath(DIST_DIR, ROOT)}")
+
+
+if __name__ == '__main__':
+    build()
@@ -0,0 +1,17 @@
+# Gunicorn settings - picked up automatically by `gunicorn app:app` from this directory.
+#
+# gthread workers: each worker serves up to GUNICORN_THREADS requests at once, and
+# idle keep-alive connections wait in the worker's poller instead of holding a
+# thread, so a slow Excel export or a pool wait no longer pins a whole worker.
+# Keep GUNICORN_THREADS at or below DB_POOL_SIZE so every thread can get a
+# Postgres connection; requests beyond MAX_INFLIGHT are shed with a 503.
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+workers = int(os.environ.get('WEB_CONCURRENCY', 2))
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', 16))
+keepalive = 5
+# Large Excel exports can take a while; the worker heartbeat is separate from this
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 120))
+graceful_timeout = 30
@@ -0,0 +1,286 @@
+"""Voting-night load test.
+
+Replays voter sessions against a running instance while ramping the number of
+concurrent voters, then reports throughput and per-route latency / error rates
+for every stage. Stdlib only, so it runs anywhere the app does.
+
+Each simulated voter: GET /categories, POST /check-name, a burst of
+/suggestions keystrokes per category (typing a title one letter at a time),
+then POST /submit with a full 13-selection ballot. Admin pollers log in and
+page through /admin/view-table the whole time.
+
+    # against an instance you started yourself (start it with RATE_LIMIT=0)
+    python loadtest.py --url http://127.0.0.1:5000 --stages 5,10,20,40
+
+    # start gunicorn on a scratch copy of the SQLite DB / on local Postgres
+    python loadtest.py --serve sqlite --workers 4 --threads 4
+    DATABASE_URL=postgresql://localhost/tg_load python loadtest.py --serve postgres
+
+Ballots are written under names starting with "loadtest-", so never point
+this at the production database.
+"""
+import argparse
+import http.cookiejar
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import defaultdict
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+CATEGORY_IDS = range(1, 10)
+TOP_GAMES_CATEGORY = 9  # 5 ranked picks, every other category takes one
+NEW_TITLE_CHANCE = 0.05  # share of picks typed in full instead of taken from suggestions
+
+
+class Stats:
+    """Latencies and outcomes per (stage, route)"""
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.outcomes = defaultdict(lambda: defaultdict(int))
+        self.stage = None
+
+    def record(self, route, seconds, status):
+        if status is None:
+            outcome = 'failed'
+        elif status in (429, 503):
+            outcome = 'shed'
+        elif status >= 500:
+            outcome = 'error'
+        else:
+            outcome = 'ok'
+        with self.lock:
+            self.latencies[(self.stage, route)].append(seconds)
+            self.outcomes[(self.stage, route)][outcome] += 1
+
+
+class Client:
+    """One browser: its own cookie jar, timing every request into Stats"""
+    def __init__(self, base_url, stats, timeout):
+        self.base_url = base_url.rstrip('/')
+        self.stats = stats
+        self.timeout = timeout
+        self.opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar())
+        )
+
+    def request(self, route, path, payload=None):
+        body = json.dumps(payload).encode('utf-8') if payload is not None else None
+        req = urllib.request.Request(self.base_url + path, data=body)
+        if body is not None:
+            req.add_header('Content-Type', 'application/json')
+        started = time.perf_counter()
+        status, data = None, None
+        try:
+            with self.opener.open(req, timeout=self.timeout) as res:
+                status, data = res.status, res.read()
+        except urllib.error.HTTPError as e:
+            status, data = e.code, e.read()
+        except (urllib.error.URLError, OSError):
+            pass
+        self.stats.record(route, time.perf_counter() - started, status)
+        try:
+            return status, json.loads(data) if data else None
+        except ValueError:
+            return status, None
+
+    def get(self, route, path, **params):
+        query = urllib.parse.urlencode(params)
+        return self.request(route, f"{path}?{query}" if query else path)
+
+
+def load_titles(base_url, stats):
+    """Titles to "type", per category - whatever the instance suggests, plus games.txt"""
+    client = Client(base_url, stats, timeout=30)
+    titles = {}
+    for cat_id in CATEGORY_IDS:
+        _, names = client.get('setup', '/suggestions', category_id=cat_id, search='', limit=100)
+        titles[cat_id] = [n for n in names or [] if n]
+    try:
+        with open(os.path.join(ROOT, 'games.txt'), encoding='utf-8') as f:
+            from_file = [line.strip() for line in f if line.strip()]
+    except FileNotFoundError:
+        from_file = []
+    for cat_id, names in titles.items():
+        if not names:
+            titles[cat_id] = from_file or [f"Game {i}" for i in range(1, 51)]
+    return titles
+
+
+def pick_title(titles, cat_id, rng):
+    if rng.random() < NEW_TITLE_CHANCE:
+        return f"Loadtest Title {rng.randrange(10 ** 6)}"
+    return rng.choice(titles[cat_id])
+
+
+def voter_session(client, titles, name, rng, think):
+    client.get('/categories', '/categories')
+    client.request('/check-name', '/check-name', {'name': name})
+
+    ballot = {}
+    for cat_id in CATEGORY_IDS:
+        count = 5 if cat_id == TOP_GAMES_CATEGORY else 1
+        picks = []
+        while len(picks) < count:
+            title = pick_title(titles, cat_id, rng)
+            if title not in picks:
+                picks.append(title)
+        for title in picks:
+            # One request per keystroke (after the 300ms debounce) for the first few letters
+            for length in range(1, min(len(title), rng.randint(2, 6)) + 1):
+                client.get('/suggestions', '/suggestions', category_id=cat_id, search=title[:length])
+                time.sleep(think * rng.uniform(0.5, 1.5))
+        ballot[str(cat_id)] = picks
+
+    client.request('/submit', '/submit', {'name': name, 'votes': ballot})
+
+
+def voter_loop(base_url, stats, titles, stop, run_id, worker_id, think, timeout):
+    rng = random.Random(f"{run_id}-{worker_id}")
+    session_no = 0
+    while not stop.is_set():
+        session_no += 1
+        client = Client(base_url, stats, timeout)
+        voter_session(client, titles, f"loadtest-{run_id}-{worker_id}-{session_no}", rng, think)
+
+
+def admin_loop(base_url, stats, stop, password, interval, timeout):
+    client = Client(base_url, stats, timeout)
+    client.request('/admin-login', '/admin-login', {'password': password})
+    while not stop.is_set():
+        status, page = client.get('/admin/view-table', '/admin/view-table', table='votes', total=1)
+        cursor = (page or {}).get('next_cursor')
+        if cursor:
+            client.get('/admin/view-table', '/admin/view-table', table='votes', cursor=cursor)
+        stop.wait(interval)
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def report(stats, stages, stage_seconds):
+    for concurrency in stages:
+        routes = sorted(route for stage, route in stats.latencies if stage == concurrency)
+        total = sum(len(stats.latencies[(concurrency, r)]) for r in routes)
+        ballots = stats.outcomes[(concurrency, '/submit')]['ok']
+        print(f"\n=== {concurrency} concurrent voters: {total / stage_seconds:.1f} req/s, "
+              f"{ballots / stage_seconds:.2f} ballots/s ===")
+        print(f"{'route':<20}{'count':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+              f"{'5xx %':>8}{'shed %':>8}{'fail %':>8}")
+        for route in routes:
+            values = sorted(stats.latencies[(concurrency, route)])
+            outcomes = stats.outcomes[(concurrency, route)]
+            count = len(values)
+            print(f"{route:<20}{count:>8}"
+                  f"{percentile(values, 50) * 1000:>10.1f}"
+                  f"{percentile(values, 95) * 1000:>10.1f}"
+                  f"{percentile(values, 99) * 1000:>10.1f}"
+                  f"{100 * outcomes['error'] / count:>8.1f}"
+                  f"{100 * outcomes['shed'] / count:>8.1f}"
+                  f"{100 * outcomes['failed'] / count:>8.1f}")
+
+
+def serve(backend, port, workers, threads):
+    """Start gunicorn on this app; SQLite runs on a scratch copy of votes.db"""
+    env = dict(os.environ, DB_TYPE=backend, RATE_LIMIT='0', PYTHONUNBUFFERED='1')
+    workdir = tempfile.mkdtemp(prefix='tg-loadtest-')
+    if backend == 'sqlite' and os.path.exists(os.path.join(ROOT, 'votes.db')):
+        shutil.copy(os.path.join(ROOT, 'votes.db'), workdir)
+    if backend == 'postgres' and not env.get('DATABASE_URL'):
+        sys.exit("DATABASE_URL must point at a local Postgres for --serve postgres")
+    command = [
+        sys.executable, '-m', 'gunicorn', '--pythonpath', ROOT,
+        '--bind', f'127.0.0.1:{port}', '--workers', str(workers), '--threads', str(threads),
+        '--log-level', 'warning', 'app:app'
+    ]
+    process = subprocess.Popen(command, cwd=workdir, env=env)
+    base_url = f"http://127.0.0.1:{port}"
+    for _ in range(100):
+        try:
+            urllib.request.urlopen(base_url + '/categories', timeout=1).close()
+            return process, base_url, workdir
+        except OSError:
+            if process.poll() is not None:
+                sys.exit("gunicorn exited during startup")
+            time.sleep(0.2)
+    process.terminate()
+    sys.exit("server did not come up")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', default='http://127.0.0.1:5000', help='instance to test')
+    parser.add_argument('--serve', choices=['sqlite', 'postgres'], help='start a gunicorn instance instead of using --url')
+    parser.add_argument('--port', type=int, default=5055)
+    parser.add_argument('--workers', type=int, default=2, help='gunicorn workers for --serve')
+    parser.add_argument('--threads', type=int, default=4, help='gunicorn threads per worker for --serve')
+    parser.add_argument('--stages', default='5,10,20,40', help='comma-separated concurrent voters per stage')
+    parser.add_argument('--stage-seconds', type=float, default=30)
+    parser.add_argument('--think', type=float, default=0.3, help='seconds between keystroke requests')
+    parser.add_argument('--admins', type=int, default=1, help='admin pollers running throughout')
+    parser.add_argument('--admin-interval', type=float, default=2)
+    parser.add_argument('--admin-password', default=os.environ.get('ADMIN_PASSWORD', 'amdinSF'))
+    parser.add_argument('--timeout', type=float, default=60, help='per-request timeout')
+    args = parser.parse_args()
+
+    stages = [int(s) for s in args.stages.split(',') if s.strip()]
+    process = workdir = None
+    base_url = args.url
+    if args.serve:
+        process, base_url, workdir = serve(args.serve, args.port, args.workers, args.threads)
+        print(f"Started gunicorn ({args.serve}, {args.workers}x{args.threads}) in {workdir}")
+
+    stats = Stats()
+    run_id = time.strftime('%H%M%S')
+    try:
+        titles = load_titles(base_url, stats)
+        stop_admins = threading.Event()
+        admins = [threading.Thread(target=admin_loop, daemon=True,
+                                   args=(base_url, stats, stop_admins, args.admin_password,
+                                         args.admin_interval, args.timeout))
+                  for _ in range(args.admins)]
+        for thread in admins:
+            thread.start()
+
+        voters, stops = [], []
+        for concurrency in stages:
+            stats.stage = concurrency
+            print(f"Stage: {concurrency} concurrent voters for {args.stage_seconds:.0f}s")
+            # Ramp: keep the voters from earlier stages, add the difference
+            while len(voters) < concurrency:
+                stop = threading.Event()
+                thread = threading.Thread(target=voter_loop, daemon=True,
+                                          args=(base_url, stats, titles, stop, run_id, len(voters),
+                                                args.think, args.timeout))
+                thread.start()
+                voters.append(thread)
+                stops.append(stop)
+            time.sleep(args.stage_seconds)
+
+        stats.stage = None
+        for stop in stops:
+            stop.set()
+        stop_admins.set()
+        report(stats, stages, args.stage_seconds)
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
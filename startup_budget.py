@@ -0,0 +1,97 @@
+"""Worker startup budget check.
+
+Imports app.py in fresh interpreters (the way every gunicorn worker does) and
+fails when the import is slower or heavier than the budget, or when a module
+that should only load on demand was imported eagerly.
+
+    python startup_budget.py                      # default budget
+    python startup_budget.py --max-ms 250 --max-rss-mb 40 --runs 7
+
+Exit status is 1 on a regression, with the slowest imports from
+`python -X importtime` printed to show what changed.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+# Only needed for admin exports - must never be imported by `import app`
+LAZY_MODULES = ('openpyxl', 'numpy', 'pandas')
+
+PROBE = """
+import json, resource, sys, time
+started = time.perf_counter()
+import app
+elapsed = time.perf_counter() - started
+print(json.dumps({
+    'ms': elapsed * 1000,
+    'rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    'modules': sorted({m.split('.')[0] for m in sys.modules} & set(%r)),
+}))
+""" % (LAZY_MODULES,)
+
+
+def probe(workdir):
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    result = subprocess.run([sys.executable, '-c', PROBE], cwd=workdir, env=env,
+                            capture_output=True, text=True, check=True)
+    # app.py may print on import; the probe's JSON is the last line
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def slowest_imports(workdir, count=15):
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import app'], cwd=workdir,
+                            env=env, capture_output=True, text=True)
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        rows.append((int(cumulative), name.rstrip()))
+    return sorted(rows, reverse=True)[:count]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--max-ms', type=float, default=float(os.environ.get('STARTUP_BUDGET_MS', 300)),
+                        help='median import time budget in ms')
+    parser.add_argument('--max-rss-mb', type=float, default=float(os.environ.get('STARTUP_BUDGET_RSS_MB', 45)),
+                        help='peak RSS budget after import in MB')
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    # Run from a scratch directory so nothing touches the real votes.db
+    with tempfile.TemporaryDirectory(prefix='tg-startup-') as workdir:
+        probe(workdir)  # warm the bytecode cache; the first import also compiles
+        results = [probe(workdir) for _ in range(args.runs)]
+        median_ms = statistics.median(r['ms'] for r in results)
+        peak_rss = max(r['rss_mb'] for r in results)
+        eager = sorted({m for r in results for m in r['modules']})
+
+        print(f"import app: median {median_ms:.0f}ms (budget {args.max_ms:.0f}ms), "
+              f"peak RSS {peak_rss:.1f}MB (budget {args.max_rss_mb:.0f}MB)")
+        failures = []
+        if median_ms > args.max_ms:
+            failures.append(f"import time {median_ms:.0f}ms is over budget")
+        if peak_rss > args.max_rss_mb:
+            failures.append(f"RSS {peak_rss:.1f}MB is over budget")
+        if eager:
+            failures.append(f"imported eagerly: {', '.join(eager)}")
+
+        if failures:
+            for failure in failures:
+                print(f"❌ {failure}")
+            print("\nSlowest imports (cumulative µs):")
+            for cumulative, name in slowest_imports(workdir):
+                print(f"{cumulative:>10}  {name}")
+            sys.exit(1)
+        print("✅ Within budget")
+
+
+if __name__ == '__main__':
+    main()
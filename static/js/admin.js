@@ -1,11 +1,12 @@
 let currentSearch = "";
-let currentPage = 1;
+let currentCursor = ""; // Keyset cursor of the page currently shown
+let currentTotal = 0;
 let currentTable = "categories"; // Track current table
 
 function clearSearch() {
   document.getElementById('search-input').value = '';
   currentSearch = '';
-  loadAdminTable(1, true);
+  loadAdminTable('', true);
 }
 
 // Use Toastify for notifications
@@ -49,8 +50,9 @@ function checkPassword() {
       document.getElementById('stats-panel').classList.remove('hidden');
       document.getElementById('admin-password').value = '';
       showToast("✅ تم تسجيل الدخول بنجاح", true);
-      loadAdminTable(1);
+      loadAdminTable('');
       loadStatistics();
+      loadSlowQueries();
     } else {
       showToast("❌ كلمة المرور غير صحيحة", false);
     }
@@ -66,100 +68,131 @@ function downloadExcel() {
 }
 
 function loadStatistics() {
-  fetch('/admin/view-table?table=votes')
+  fetch('/admin/stats')
     .then(res => res.json())
     .then(data => {
-      if (data.status === 'success') {
-        const totalVotes = data.rows.length;
-        
-        // Find column indexes dynamically
-        const voterNameIndex = data.columns.indexOf('voter_name');
-        const selectionIndex = data.columns.indexOf('selection');
-        
-        let uniqueVoters = 0;
-        let uniqueSelections = 0;
-        
-        if (voterNameIndex !== -1) {
-          uniqueVoters = [...new Set(data.rows.map(row => row[voterNameIndex]))].length;
-        }
-        
-        if (selectionIndex !== -1) {
-          uniqueSelections = [...new Set(data.rows.map(row => row[selectionIndex]))].length;
-        }
-        
-        // Load categories count
-        fetch('/admin/view-table?table=categories')
-          .then(res => res.json())
-          .then(catData => {
-            const totalCategories = catData.rows.length;
-            
-            // Load games count
-            fetch('/admin/view-table?table=games')
-              .then(res => res.json())
-              .then(gamesData => {
-                const totalGames = gamesData.rows.length;
-                
-                // Load 2026 games count
-                fetch('/admin/view-table?table=games_2026')
-                  .then(res => res.json())
-                  .then(games2026Data => {
-                    const totalGames2026 = games2026Data.rows.length;
-                    
-                    // Load publishers count
-                    fetch('/admin/view-table?table=publishers')
-                      .then(res => res.json())
-                      .then(pubsData => {
-                        const totalPublishers = pubsData.rows.length;
-                        
-                        const statsGrid = document.getElementById('stats-grid');
-                        statsGrid.innerHTML = `
-                          <div class="stat-item">
-                            <div class="stat-value">${uniqueVoters}</div>
-                            <div class="stat-label">عدد المصوتين</div>
-                          </div>
-                          <div class="stat-item">
-                            <div class="stat-value">${totalVotes}</div>
-                            <div class="stat-label">إجمالي التصويتات</div>
-                          </div>
-                          <div class="stat-item">
-                            <div class="stat-value">${uniqueSelections}</div>
-                            <div class="stat-label">عدد الألعاب/الاختيارات</div>
-                          </div>
-                          <div class="stat-item">
-                            <div class="stat-value">${totalCategories}</div>
-                            <div class="stat-label">عدد الفئات</div>
-                          </div>
-                          <div class="stat-item">
-                            <div class="stat-value">${totalGames}</div>
-                            <div class="stat-label">عدد الألعاب</div>
-                          </div>
-                          <div class="stat-item">
-                            <div class="stat-value">${totalGames2026}</div>
-                            <div class="stat-label">عدد ألعاب 2026</div>
-                          </div>
-                          <div class="stat-item">
-                            <div class="stat-value">${totalPublishers}</div>
-                            <div class="stat-label">عدد الناشرين</div>
-                          </div>
-                        `;
-                      });
-                  });
-              });
-          });
-      }
+      if (data.status !== 'success') return;
+      
+      const statsGrid = document.getElementById('stats-grid');
+      statsGrid.innerHTML = `
+        <div class="stat-item">
+          <div class="stat-value">${data.total_voters}</div>
+          <div class="stat-label">عدد المصوتين</div>
+        </div>
+        <div class="stat-item">
+          <div class="stat-value">${data.total_votes}</div>
+          <div class="stat-label">إجمالي التصويتات</div>
+        </div>
+        <div class="stat-item">
+          <div class="stat-value">${data.unique_selections}</div>
+          <div class="stat-label">عدد الألعاب/الاختيارات</div>
+        </div>
+        <div class="stat-item">
+          <div class="stat-value">${data.total_categories}</div>
+          <div class="stat-label">عدد الفئات</div>
+        </div>
+        <div class="stat-item">
+          <div class="stat-value">${data.total_games}</div>
+          <div class="stat-label">عدد الألعاب</div>
+        </div>
+        <div class="stat-item">
+          <div class="stat-value">${data.total_games_2026}</div>
+          <div class="stat-label">عدد ألعاب 2026</div>
+        </div>
+        <div class="stat-item">
+          <div class="stat-value">${data.total_publishers}</div>
+          <div class="stat-label">عدد الناشرين</div>
+        </div>
+      `;
+
+      // Voters per category (category names come from the database - use textContent)
+      const turnoutGrid = document.getElementById('turnout-grid');
+      turnoutGrid.innerHTML = '';
+      data.category_turnout.forEach(category => {
+        const item = document.createElement('div');
+        item.className = 'stat-item';
+        const value = document.createElement('div');
+        value.className = 'stat-value';
+        value.textContent = category.voters;
+        const label = document.createElement('div');
+        label.className = 'stat-label';
+        label.textContent = category.category_name;
+        item.appendChild(value);
+        item.appendChild(label);
+        turnoutGrid.appendChild(item);
+      });
     })
     .catch(error => {
       console.error('Error loading statistics:', error);
     });
 }
 
-function loadAdminTable(page = 1, scrollToTop = false) {
+function loadSlowQueries() {
+  fetch('/admin/slow-queries')
+    .then(res => res.json())
+    .then(data => {
+      if (data.status !== 'success') return;
+
+      document.getElementById('slow-threshold').textContent = `(أبطأ من ${data.threshold_ms}ms)`;
+      const tbody = document.querySelector('#slow-queries-table tbody');
+      tbody.innerHTML = '';
+
+      if (data.queries.length === 0) {
+        tbody.innerHTML = `
+          <tr>
+            <td colspan="8" style="text-align: center; padding: 30px; color: var(--text-muted);">
+              لا توجد استعلامات بطيئة
+            </td>
+          </tr>
+        `;
+        return;
+      }
+
+      data.queries.forEach(q => {
+        const tr = document.createElement('tr');
+        const routes = Object.entries(q.routes).map(([route, count]) => `${route} (${count})`).join(', ');
+        [q.sql, q.params, routes, q.count, q.total_ms, q.avg_ms, q.max_ms, q.last_seen].forEach((value, idx) => {
+          const td = document.createElement('td');
+          td.style.padding = '12px 8px';
+          td.style.fontSize = '14px';
+          if (idx === 0) {
+            // SQL (and its captured plan) is shown as-is, never as HTML
+            td.style.direction = 'ltr';
+            td.style.textAlign = 'left';
+            const code = document.createElement('code');
+            code.textContent = value;
+            td.appendChild(code);
+            if (q.plan) {
+              const details = document.createElement('details');
+              const summary = document.createElement('summary');
+              summary.textContent = 'EXPLAIN';
+              const pre = document.createElement('pre');
+              pre.textContent = q.plan;
+              details.append(summary, pre);
+              td.appendChild(details);
+            }
+          } else {
+            td.textContent = value;
+          }
+          tr.appendChild(td);
+        });
+        tbody.appendChild(tr);
+      });
+    })
+    .catch(error => {
+      console.error('Error loading slow queries:', error);
+    });
+}
+
+function loadAdminTable(cursor = '', scrollToTop = false) {
   // Store current position before loading
   const scrollPosition = window.scrollY;
   
-  currentPage = page;
+  currentCursor = cursor;
   currentTable = document.getElementById('table-select').value;
   const searchParam = currentSearch ? `&search=${encodeURIComponent(currentSearch)}` : "";
+  // Only the first page asks for the (cached) exact total
+  const cursorParam = cursor ? `&cursor=${encodeURIComponent(cursor)}` : "&total=1";
 
   // Show loading state
   const tbody = document.querySelector('#admin-table tbody');
@@ -174,7 +207,7 @@ function loadAdminTable(page = 1, scrollToTop = false) {
     </tr>
   `;
 
-  fetch(`/admin/view-table?table=${currentTable}&page=${page}${searchParam}`)
+  fetch(`/admin/view-table?table=${currentTable}${cursorParam}${searchParam}`)
     .then(res => res.json())
     .then(data => {
       if (data.status !== 'success') {
@@ -190,7 +223,10 @@ function loadAdminTable(page = 1, scrollToTop = false) {
       tbody.innerHTML = '';
 
       // Update record count
-      updateRecordCount(data.total_rows || data.rows.length);
+      if (data.total_rows !== null && data.total_rows !== undefined) {
+        currentTotal = data.total_rows;
+      }
+      updateRecordCount(currentTotal || data.rows.length);
 
       // Render table rows
       if (data.rows.length === 0) {
@@ -361,7 +397,7 @@ function loadAdminTable(page = 1, scrollToTop = false) {
             deleteBtn.style.margin = '2px';
             deleteBtn.style.background = 'linear-gradient(135deg, #F44336, #D32F2F)';
             deleteBtn.innerHTML = '<i class="fas fa-trash-alt"></i> حذف';
-            deleteBtn.onclick = () => deleteRow('category', rowId, currentPage);
+            deleteBtn.onclick = () => deleteRow('category', rowId, currentCursor);
             
             actionsTd.appendChild(saveBtn);
             actionsTd.appendChild(deleteBtn);
@@ -380,7 +416,7 @@ function loadAdminTable(page = 1, scrollToTop = false) {
             deleteBtn.style.margin = '2px';
             deleteBtn.style.background = 'linear-gradient(135deg, #F44336, #D32F2F)';
             deleteBtn.innerHTML = '<i class="fas fa-trash-alt"></i> حذف';
-            deleteBtn.onclick = () => deleteRow('vote', rowId, currentPage);
+            deleteBtn.onclick = () => deleteRow('vote', rowId, currentCursor);
             
             actionsTd.appendChild(saveBtn);
             actionsTd.appendChild(deleteBtn);
@@ -399,7 +435,7 @@ function loadAdminTable(page = 1, scrollToTop = false) {
             deleteBtn.style.margin = '2px';
             deleteBtn.style.background = 'linear-gradient(135deg, #F44336, #D32F2F)';
             deleteBtn.innerHTML = '<i class="fas fa-trash-alt"></i> حذف';
-            deleteBtn.onclick = () => deleteRow('game', rowId, currentPage);
+            deleteBtn.onclick = () => deleteRow('game', rowId, currentCursor);
             
             actionsTd.appendChild(saveBtn);
             actionsTd.appendChild(deleteBtn);
@@ -418,7 +454,7 @@ function loadAdminTable(page = 1, scrollToTop = false) {
             deleteBtn.style.margin = '2px';
             deleteBtn.style.background = 'linear-gradient(135deg, #F44336, #D32F2F)';
             deleteBtn.innerHTML = '<i class="fas fa-trash-alt"></i> حذف';
-            deleteBtn.onclick = () => deleteRow('game-2026', rowId, currentPage);
+            deleteBtn.onclick = () => deleteRow('game-2026', rowId, currentCursor);
             
             actionsTd.appendChild(saveBtn);
             actionsTd.appendChild(deleteBtn);
@@ -437,7 +473,7 @@ function loadAdminTable(page = 1, scrollToTop = false) {
             deleteBtn.style.margin = '2px';
             deleteBtn.style.background = 'linear-gradient(135deg, #F44336, #D32F2F)';
             deleteBtn.innerHTML = '<i class="fas fa-trash-alt"></i> حذف';
-            deleteBtn.onclick = () => deleteRow('publisher', rowId, currentPage);
+            deleteBtn.onclick = () => deleteRow('publisher', rowId, currentCursor);
             
             actionsTd.appendChild(saveBtn);
             actionsTd.appendChild(deleteBtn);
@@ -482,29 +518,19 @@ function loadAdminTable(page = 1, scrollToTop = false) {
       pagination.innerHTML = '';
       if (data.has_pagination) {
         // Previous button
-        if (data.page > 1) {
-          pagination.innerHTML += `<button onclick="loadAdminTable(${data.page - 1})" class="btn-secondary">
+        if (data.prev_cursor) {
+          pagination.innerHTML += `<button onclick="loadAdminTable('')" class="btn-secondary">
+            الأولى
+          </button>`;
+          pagination.innerHTML += `<button onclick="loadAdminTable('${data.prev_cursor}')" class="btn-secondary">
             <i class="fas fa-chevron-right"></i>
             السابق
           </button>`;
         }
         
-        // Page numbers
-        const maxPagesToShow = 5;
-        let startPage = Math.max(1, data.page - Math.floor(maxPagesToShow / 2));
-        let endPage = Math.min(data.pages, startPage + maxPagesToShow - 1);
-        
-        if (endPage - startPage + 1 < maxPagesToShow) {
-          startPage = Math.max(1, endPage - maxPagesToShow + 1);
-        }
-        
-        for (let i = startPage; i <= endPage; i++) {
-          pagination.innerHTML += `<button onclick="loadAdminTable(${i})" class="${i === data.page ? 'active' : ''}">${i}</button>`;
-        }
-        
         // Next button
-        if (data.page < data.pages) {
-          pagination.innerHTML += `<button onclick="loadAdminTable(${data.page + 1})" class="btn-secondary">
+        if (data.next_cursor) {
+          pagination.innerHTML += `<button onclick="loadAdminTable('${data.next_cursor}')" class="btn-secondary">
             التالي
             <i class="fas fa-chevron-left"></i>
           </button>`;
@@ -593,19 +619,19 @@ function saveCategoryEdit(id, btn) {
       }
       
       // Reload table but stay on same page
-      loadAdminTable(currentPage);
+      loadAdminTable(currentCursor);
       
     } else {
       showToast("❌ فشل تعديل الفئة", false);
       // Revert the change by reloading the table
-      loadAdminTable(currentPage);
+      loadAdminTable(currentCursor);
     }
   })
   .catch(error => {
     console.error('Error editing category:', error);
     showToast("❌ حدث خطأ أثناء تعديل الفئة", false);
     // Revert on error
-    loadAdminTable(currentPage);
+    loadAdminTable(currentCursor);
   })
   .finally(() => {
     // Restore button state
@@ -660,19 +686,19 @@ function saveGameEdit(id, btn, type = 'game') {
       }
       
       // Reload table but stay on same page
-      loadAdminTable(currentPage);
+      loadAdminTable(currentCursor);
       
     } else {
       const errorMsg = type === 'game-2026' ? "فشل تعديل لعبة 2026" : "فشل تعديل اللعبة";
       showToast(`❌ ${errorMsg}`, false);
-      loadAdminTable(currentPage);
+      loadAdminTable(currentCursor);
     }
   })
   .catch(error => {
     console.error('Error editing game:', error);
     const errorMsg = type === 'game-2026' ? "حدث خطأ أثناء تعديل لعبة 2026" : "حدث خطأ أثناء تعديل اللعبة";
     showToast(`❌ ${errorMsg}`, false);
-    loadAdminTable(currentPage);
+    loadAdminTable(currentCursor);
   })
   .finally(() => {
     btn.innerHTML = originalText;
@@ -723,17 +749,17 @@ function savePublisherEdit(id, btn) {
       }
       
       // Reload table but stay on same page
-      loadAdminTable(currentPage);
+      loadAdminTable(currentCursor);
       
     } else {
       showToast("❌ فشل تعديل الناشر", false);
-      loadAdminTable(currentPage);
+      loadAdminTable(currentCursor);
     }
   })
   .catch(error => {
     console.error('Error editing publisher:', error);
     showToast("❌ حدث خطأ أثناء تعديل الناشر", false);
-    loadAdminTable(currentPage);
+    loadAdminTable(currentCursor);
   })
   .finally(() => {
     btn.innerHTML = originalText;
@@ -777,7 +803,7 @@ function addCategory() {
       if (displayOrderInput) displayOrderInput.value = '0';
       
       // Reload table but stay on same page and restore scroll position
-      loadAdminTable(currentPage);
+      loadAdminTable(currentCursor);
       loadStatistics();
       
       // Restore scroll position after a short delay
@@ -819,7 +845,7 @@ function addGame() {
       document.getElementById('game-name').value = '';
       
       // Reload table but stay on same page and restore scroll position
-      loadAdminTable(currentPage);
+      loadAdminTable(currentCursor);
       loadStatistics();
       
       // Restore scroll position after a short delay
@@ -837,6 +863,128 @@ function addGame() {
   });
 }
 
+// List catalog names that differ only in spelling; a row's button fills the merge form
+function loadDuplicateTitles() {
+  const table = document.getElementById('merge-table').value;
+  
+  fetch(`/admin/titles/duplicates?table=${table}`)
+    .then(res => res.json())
+    .then(data => {
+      if (data.status !== 'success') return;
+      
+      const tbody = document.querySelector('#duplicate-titles-table tbody');
+      tbody.innerHTML = '';
+      
+      if (data.groups.length === 0) {
+        tbody.innerHTML = `
+          <tr>
+            <td colspan="3" style="text-align: center; padding: 30px; color: var(--text-muted);">
+              لا توجد عناوين مكررة
+            </td>
+          </tr>
+        `;
+        return;
+      }
+      
+      data.groups.forEach(group => {
+        const [canonical, ...variants] = group;
+        const tr = document.createElement('tr');
+        const canonicalCell = document.createElement('td');
+        canonicalCell.textContent = `${canonical.name} (${canonical.votes})`;
+        const variantsCell = document.createElement('td');
+        variantsCell.textContent = variants.map(v => `${v.name} (${v.votes})`).join('، ');
+        const actionCell = document.createElement('td');
+        const button = document.createElement('button');
+        button.className = 'btn-primary';
+        button.textContent = 'اختيار';
+        button.onclick = () => {
+          document.getElementById('merge-canonical').value = canonical.name;
+          document.getElementById('merge-variants').value = variants.map(v => v.name).join('\n');
+        };
+        actionCell.appendChild(button);
+        tr.append(canonicalCell, variantsCell, actionCell);
+        tbody.appendChild(tr);
+      });
+    })
+    .catch(error => {
+      console.error('Error loading duplicate titles:', error);
+      showToast("❌ حدث خطأ أثناء البحث عن التكرارات", false);
+    });
+}
+
+// Merge variant spellings into one canonical title (votes and rankings follow)
+function mergeTitles() {
+  const table = document.getElementById('merge-table').value;
+  const canonical = document.getElementById('merge-canonical').value.trim();
+  const variants = document.getElementById('merge-variants').value
+    .split('\n').map(v => v.trim()).filter(v => v);
+  
+  if (!canonical || variants.length === 0) {
+    showToast("❗ الرجاء إدخال العنوان المعتمد وصيغة واحدة على الأقل", false);
+    return;
+  }
+  
+  fetch('/admin/titles/merge', {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify({ table, canonical, variants })
+  })
+  .then(res => res.json())
+  .then(data => {
+    if (data.status === 'success') {
+      showToast(`✅ تم الدمج في "${data.canonical}" (${data.votes_moved} صوت)`, true);
+      document.getElementById('merge-canonical').value = '';
+      document.getElementById('merge-variants').value = '';
+      loadDuplicateTitles();
+      loadAdminTable(currentCursor);
+      loadStatistics();
+    } else {
+      showToast(`❌ ${data.message || 'فشل الدمج'}`, false);
+    }
+  })
+  .catch(error => {
+    console.error('Error merging titles:', error);
+    showToast("❌ حدث خطأ أثناء الدمج", false);
+  });
+}
+
+// Bulk import a TXT/CSV file into games, games_2026 or publishers
+function importCatalog() {
+  const table = document.getElementById('import-table').value;
+  const fileInput = document.getElementById('import-file');
+  
+  if (!fileInput.files.length) {
+    showToast("❗ الرجاء اختيار ملف", false);
+    return;
+  }
+  
+  const form = new FormData();
+  form.append('file', fileInput.files[0]);
+  
+  fetch(`/admin/import/${table}`, {
+    method: 'POST',
+    body: form
+  })
+  .then(res => res.json())
+  .then(data => {
+    if (data.status === 'success') {
+      const skipped = data.skipped;
+      document.getElementById('import-result').textContent =
+        `تمت إضافة ${data.inserted} من ${data.received} — مكرر: ${skipped.duplicate}، موجود مسبقاً: ${skipped.existing}، غير صالح: ${skipped.invalid}`;
+      showToast(`✅ تم استيراد ${data.inserted} عنصر`, true);
+      fileInput.value = '';
+      loadAdminTable(currentCursor);
+      loadStatistics();
+    } else {
+      showToast(`❌ ${data.message || 'فشل الاستيراد'}`, false);
+    }
+  })
+  .catch(error => {
+    console.error('Error importing catalog:', error);
+    showToast("❌ حدث خطأ أثناء الاستيراد", false);
+  });
+}
+
 // Add New 2026 Game
 function addGame2026() {
   const nameInput = document.getElementById('game-2026-name');
@@ -862,7 +1010,7 @@ function addGame2026() {
       if (nameInput) nameInput.value = '';
       
       // Reload table but stay on same page and restore scroll position
-      loadAdminTable(currentPage);
+      loadAdminTable(currentCursor);
       loadStatistics();
       
       // Restore scroll position after a short delay
@@ -904,7 +1052,7 @@ function addPublisher() {
       document.getElementById('publisher-name').value = '';
       
       // Reload table but stay on same page and restore scroll position
-      loadAdminTable(currentPage);
+      loadAdminTable(currentCursor);
       loadStatistics();
       
       // Restore scroll position after a short delay
@@ -981,7 +1129,7 @@ function saveVoteEdit(id, btn) {
       }, 1500);
       
       // Reload table but stay on same page
-      loadAdminTable(currentPage);
+      loadAdminTable(currentCursor);
       
     } else {
       showToast("❌ فشل تعديل التصويت: " + (data.message || ''), false);
@@ -1005,7 +1153,7 @@ function getPointsForRank(rank) {
 }
 
 // Delete Row - Updated to maintain page position
-function deleteRow(type, id, pageToStayOn = 1) {
+function deleteRow(type, id, cursorToStayOn = '') {
   const messages = {
     'vote': "⚠️ هل أنت متأكد من حذف هذا التصويت؟\n\nهذا الإجراء لا يمكن التراجع عنه.",
     'category': "⚠️ هل أنت متأكد من حذف هذه الفئة؟\n\nملاحظة: لا يمكن حذف فئة تحتوي على تصويتات.",
@@ -1047,7 +1195,7 @@ function deleteRow(type, id, pageToStayOn = 1) {
           row.style.transform = "translateX(-20px)";
           setTimeout(() => {
             // Reload table but stay on same page and restore scroll position
-            loadAdminTable(pageToStayOn);
+            loadAdminTable(cursorToStayOn);
             loadStatistics();
             
             // Restore scroll position after reload
@@ -1057,7 +1205,7 @@ function deleteRow(type, id, pageToStayOn = 1) {
           }, 400);
         } else {
           // If row not found, still reload with same page
-          loadAdminTable(pageToStayOn);
+          loadAdminTable(cursorToStayOn);
           loadStatistics();
           setTimeout(() => {
             window.scrollTo(0, scrollPosition);
@@ -1077,7 +1225,7 @@ function deleteRow(type, id, pageToStayOn = 1) {
 function searchAdmin() {
   currentSearch = document.getElementById('search-input').value.trim();
   // Reset to page 1 for search results (this is expected behavior for search)
-  loadAdminTable(1, true); // true means scroll to top for search
+  loadAdminTable('', true); // true means scroll to top for search
 }
 
 // Search with Debounce
@@ -1087,7 +1235,7 @@ document.getElementById('search-input')?.addEventListener('input', function() {
   searchTimeout = setTimeout(() => {
     currentSearch = this.value.trim();
     // Reset to page 1 for search results
-    loadAdminTable(1, true);
+    loadAdminTable('', true);
   }, 500);
 });
 
@@ -1097,7 +1245,7 @@ document.getElementById('search-input')?.addEventListener('keypress', function(e
     e.preventDefault();
     currentSearch = this.value.trim();
     // Reset to page 1 for search results
-    loadAdminTable(1, true);
+    loadAdminTable('', true);
   }
 });
 
@@ -457,8 +457,8 @@ async function checkNameAndProceed() {
     if (data.status === 'admin') {
       window.location.href = '/admin';
       return;
-    } else if (data.status === 'exists') {
-      // User has already voted - automatically redirect to results
+    } else if (data.status === 'exists' || data.status === 'pending') {
+      // User has already voted (or their ballot is still being saved) - automatically redirect to results
       showNotification('مرحباً! لقد قمت بالتصويت مسبقاً. يتم توجيهك إلى صفحة النتائج...', true);
       
       // Delay to show the notification
@@ -466,8 +466,12 @@ async function checkNameAndProceed() {
         window.location.href = `/results?username=${encodeURIComponent(username)}`;
       }, 1500);
       return; // IMPORTANT: Exit function here
+    } else if (data.status === 'error') {
+      // Rate limited / server busy - don't treat the name as new
+      showNotification(data.message, false);
+      return;
     }
-    
+
     // Only if user hasn't voted before, proceed to voting
     currentUsername = username;
     
@@ -0,0 +1,34 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as tg_app  # noqa: E402
+
+
+@pytest.fixture(scope='session')
+def tg(tmp_path_factory):
+    """The app module, pointed at a fresh SQLite database for the whole session"""
+    tmp_dir = tmp_path_factory.mktemp('tg')
+    tg_app.DB_PATH = str(tmp_dir / 'votes.db')
+    tg_app.METRICS_DIR = str(tmp_dir / 'metrics')
+    tg_app.BALLOT_DEAD_LETTER_FILE = str(tmp_dir / 'dead-letter.jsonl')
+    # Every test client shares one address - rate limiting has its own tests
+    tg_app.RATE_LIMIT_ENABLED = False
+    tg_app.init_db()
+    tg_app.db_initialized = True
+    return tg_app
+
+
+@pytest.fixture
+def client(tg):
+    return tg.app.test_client()
+
+
+@pytest.fixture
+def admin_client(client):
+    with client.session_transaction() as s:
+        s['is_admin'] = True
+    return client
@@ -0,0 +1,76 @@
+import pytest
+
+STELLAR_GAMES = ['Stellar Drift', 'Stellar Stellar Saga', 'Interstellar Run', 'The Stellar Age', 'Stellaris Nova']
+
+
+@pytest.fixture(scope='module')
+def fts(tg):
+    if tg.search_backend != 'fts5':
+        pytest.skip('SQLite built without FTS5')
+    admin_client = tg.app.test_client()
+    with admin_client.session_transaction() as s:
+        s['is_admin'] = True
+    for name in STELLAR_GAMES + ['أَلْعَاب النُّجوم']:
+        assert admin_client.post('/admin/game', json={'name': name}).status_code == 200
+    return tg
+
+
+def walk(admin_client, args):
+    pages, cursor = [], ''
+    while True:
+        page = admin_client.get('/admin/view-table', query_string={**args, 'cursor': cursor}).json
+        pages.append(page)
+        cursor = page['next_cursor']
+        if not cursor:
+            return pages
+
+
+def names(pages):
+    index = pages[0]['columns'].index('name')
+    return [row[index] for page in pages for row in page['rows']]
+
+
+def test_relevance_paging_matches_bm25_order(fts, admin_client):
+    with fts.get_conn() as conn:
+        expected = [name for (name,) in conn.execute("""
+            SELECT g.name FROM games_fts JOIN games g ON g.id = games_fts.rowid
+            WHERE games_fts MATCH '"stellar"' ORDER BY bm25(games_fts), g.id
+        """)]
+    assert set(STELLAR_GAMES) <= set(expected)
+
+    pages = walk(admin_client, {'table': 'games', 'search': 'stellar', 'limit': 2})
+    assert pages[0]['sort'] == 'relevance'
+    assert 'search_score' not in pages[0]['columns']
+    assert names(pages) == expected
+
+    # And back again from the last page
+    back = admin_client.get('/admin/view-table', query_string={
+        'table': 'games', 'search': 'stellar', 'limit': 2, 'cursor': pages[-1]['prev_cursor']
+    }).json
+    assert back['rows'] == pages[-2]['rows']
+
+
+def test_search_folds_arabic_forms(fts, admin_client):
+    pages = walk(admin_client, {'table': 'games', 'search': 'العاب النجوم'})
+    assert names(pages) == ['أَلْعَاب النُّجوم']
+
+
+def test_indexed_search_counts_matches(fts, admin_client):
+    page = admin_client.get('/admin/view-table', query_string={'table': 'games', 'search': 'stellar', 'total': 1}).json
+    assert page['total_rows'] == len(names(walk(admin_client, {'table': 'games', 'search': 'stellar'})))
+
+
+def test_short_terms_fall_back_to_like(fts, admin_client):
+    page = admin_client.get('/admin/view-table', query_string={'table': 'games', 'search': 'st'}).json
+    assert page['sort'] == 'id'
+    assert set(STELLAR_GAMES) <= set(names([page]))
+
+
+def test_vote_search_matches_category_names(fts, client, admin_client):
+    assert client.post('/submit', json={'name': 'search voter', 'votes': {'5': ['Search Publisher']}}).status_code == 200
+    with fts.get_conn() as conn:
+        (category_name,) = conn.execute("SELECT name_ar FROM categories WHERE id = 5").fetchone()
+    pages = walk(admin_client, {'table': 'votes', 'search': category_name})
+    index = pages[0]['columns'].index('category_name')
+    rows = [row for page in pages for row in page['rows']]
+    assert rows and {row[index] for row in rows} == {category_name}
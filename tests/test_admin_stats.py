@@ -0,0 +1,49 @@
+import pytest
+
+
+@pytest.fixture
+def uncached_stats(tg, monkeypatch):
+    monkeypatch.setitem(tg.stats_cache, 'data', None)
+    monkeypatch.setattr(tg, 'STATS_CACHE_SECONDS', 0)
+    return tg
+
+
+def turnout(stats, category_id):
+    return next(c['voters'] for c in stats['category_turnout'] if c['category_id'] == category_id)
+
+
+def test_stats_are_admin_only(client):
+    assert client.get('/admin/stats').status_code == 403
+
+
+def test_stats_match_the_database(uncached_stats, admin_client):
+    stats = admin_client.get('/admin/stats').json
+    with uncached_stats.get_conn() as conn:
+        count = lambda sql: conn.execute(sql).fetchone()[0]
+        assert stats['total_voters'] == count("SELECT COUNT(*) FROM ballots")
+        assert stats['total_votes'] == count("SELECT COUNT(*) FROM votes")
+        assert stats['total_categories'] == count("SELECT COUNT(*) FROM categories")
+        assert stats['total_games'] == count("SELECT COUNT(*) FROM games")
+        assert stats['total_publishers'] == count("SELECT COUNT(*) FROM publishers")
+    assert len(stats['category_turnout']) == stats['total_categories']
+
+
+def test_turnout_counts_voters_per_category(uncached_stats, client, admin_client):
+    before = admin_client.get('/admin/stats').json
+    votes = {'9': ['Turnout One', 'Turnout Two', 'Turnout Three', 'Turnout Four', ''], '1': ['Turnout One']}
+    assert client.post('/submit', json={'name': 'turnout voter', 'votes': votes}).status_code == 200
+    after = admin_client.get('/admin/stats').json
+
+    assert after['total_voters'] == before['total_voters'] + 1
+    assert after['total_votes'] == before['total_votes'] + 5
+    assert turnout(after, 9) == turnout(before, 9) + 1
+    assert turnout(after, 1) == turnout(before, 1) + 1
+    assert turnout(after, 5) == turnout(before, 5)
+
+
+def test_stats_are_cached_briefly(tg, client, admin_client, monkeypatch):
+    monkeypatch.setitem(tg.stats_cache, 'data', None)
+    monkeypatch.setattr(tg, 'STATS_CACHE_SECONDS', 3600)
+    first = admin_client.get('/admin/stats').json
+    assert client.post('/submit', json={'name': 'cached stats voter', 'votes': {'1': ['Cached Game']}}).status_code == 200
+    assert admin_client.get('/admin/stats').json == first
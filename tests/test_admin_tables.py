@@ -0,0 +1,86 @@
+import pytest
+
+
+def submit(client, name, votes):
+    return client.post('/submit', json={'name': name, 'votes': votes})
+
+
+def walk(admin_client, path, args):
+    """Follow next_cursor from the first page to the last"""
+    pages, cursor = [], ''
+    while True:
+        page = admin_client.get(path, query_string={**args, 'cursor': cursor}).json
+        assert page['status'] == 'success'
+        pages.append(page)
+        cursor = page['next_cursor']
+        if not cursor:
+            return pages
+
+
+def column(pages, name):
+    index = pages[0]['columns'].index(name)
+    return [row[index] for page in pages for row in page['rows']]
+
+
+@pytest.fixture(scope='module')
+def paging_votes(tg):
+    client = tg.app.test_client()
+    for i in range(5):
+        assert submit(client, f'paging voter {i}', {'1': [f'Paging Game {i % 2}'], '3': ['Paging Game 2']}).status_code == 200
+
+
+@pytest.mark.parametrize('sort, order_columns', [
+    ('id', ['id']),
+    ('voter_id', ['voter_id', 'id']),
+    ('category_id', ['category_id', 'id']),
+    ('item_id', ['item_id', 'id']),
+])
+@pytest.mark.parametrize('order', ['asc', 'desc'])
+def test_votes_keyset_pages_cover_every_row_once(tg, paging_votes, admin_client, sort, order_columns, order):
+    order_by = ', '.join(f'{name} {order}' for name in order_columns)
+    with tg.get_conn() as conn:
+        expected = [row_id for (row_id,) in conn.execute(f"SELECT id FROM votes ORDER BY {order_by}")]
+
+    pages = walk(admin_client, '/admin/view-table', {'table': 'votes', 'sort': sort, 'order': order, 'limit': 3})
+    assert column(pages, 'id') == expected
+    assert pages[0]['prev_cursor'] is None
+
+
+def test_prev_cursor_walks_back(paging_votes, admin_client):
+    args = {'table': 'votes', 'sort': 'category_id', 'limit': 3}
+    pages = walk(admin_client, '/admin/view-table', args)
+    assert len(pages) >= 3
+    back = admin_client.get('/admin/view-table', query_string={**args, 'cursor': pages[2]['prev_cursor']}).json
+    assert back['rows'] == pages[1]['rows']
+    back = admin_client.get('/admin/view-table', query_string={**args, 'cursor': back['prev_cursor']}).json
+    assert back['rows'] == pages[0]['rows']
+    assert back['prev_cursor'] is None
+
+
+def test_total_is_only_counted_on_request(tg, paging_votes, admin_client):
+    page = admin_client.get('/admin/view-table', query_string={'table': 'votes', 'limit': 2}).json
+    assert page['total_rows'] is None
+    page = admin_client.get('/admin/view-table', query_string={'table': 'votes', 'limit': 2, 'total': 1}).json
+    with tg.get_conn() as conn:
+        assert page['total_rows'] == conn.execute("SELECT COUNT(*) FROM votes").fetchone()[0]
+
+
+def test_games_2026_default_to_name_order(tg, admin_client):
+    for name in ('Zeta 2026', 'Alpha 2026', 'Mid 2026'):
+        admin_client.post('/admin/game-2026', json={'name': name})
+    pages = walk(admin_client, '/admin/view-2026-games', {'limit': 2})
+    names = column(pages, 'name')
+    assert names == sorted(names)
+    assert {'Zeta 2026', 'Alpha 2026', 'Mid 2026'} <= set(names)
+
+
+@pytest.mark.parametrize('args', [
+    {'table': 'votes', 'sort': 'points'},
+    # Computed from the catalogs - no index to page on
+    {'table': 'votes', 'sort': 'voter_name'},
+    {'table': 'votes', 'sort': 'selection'},
+    {'table': 'votes', 'cursor': 'not-a-cursor'},
+    {'table': 'nope'},
+])
+def test_view_table_rejects_bad_requests(admin_client, args):
+    assert admin_client.get('/admin/view-table', query_string=args).status_code == 400
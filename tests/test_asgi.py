@@ -0,0 +1,178 @@
+import asyncio
+import json
+
+import pytest
+
+pytest.importorskip('asgiref')
+pytest.importorskip('aiosqlite')
+
+
+@pytest.fixture
+def asgi(tg):
+    import asgi
+    return asgi
+
+
+def call(asgi, method, path, query=b'', body=None, headers=(), client='10.0.0.1'):
+    """One request through the ASGI app: (status, headers, body)"""
+    payload = json.dumps(body).encode() if body is not None else b''
+    headers = list(headers) + ([(b'content-type', b'application/json')] if body is not None else [])
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': method,
+        'scheme': 'http', 'path': path, 'raw_path': path.encode(), 'root_path': '',
+        'query_string': query, 'headers': headers + [(b'host', b'testserver')],
+        'client': (client, 50000), 'server': ('testserver', 80),
+    }
+    messages = [{'type': 'http.request', 'body': payload, 'more_body': False}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0) if messages else {'type': 'http.disconnect'}
+
+    async def send(message):
+        sent.append(message)
+
+    async def run():
+        await asgi.app(scope, receive, send)
+
+    return run, sent
+
+
+def run_requests(asgi, *requests):
+    """Start the worker's pools, run the requests in order, shut down"""
+    results = []
+
+    async def main():
+        await asgi.startup()
+        try:
+            for run, sent in requests:
+                await run()
+                start = sent[0]
+                results.append((start['status'], {k.decode(): v.decode() for k, v in start['headers']},
+                                b''.join(m.get('body', b'') for m in sent[1:])))
+        finally:
+            await asgi.shutdown()
+
+    asyncio.run(main())
+    return results
+
+
+def sync_connections_unavailable():
+    raise AssertionError('the async handlers must not use the blocking connections')
+
+
+def ballot_selections(tg, name):
+    with tg.get_conn() as conn:
+        rows = conn.execute("""
+            SELECT category_id, rank, selection FROM vote_details
+            WHERE voter_name = ? ORDER BY category_id, rank
+        """, (name,)).fetchall()
+    return [tuple(row) for row in rows]
+
+
+def test_suggestions_are_served_by_the_async_handler(tg, asgi, monkeypatch):
+    with tg.get_conn() as conn:
+        conn.execute("INSERT INTO publishers (name) VALUES ('Async Press')")
+        conn.commit()
+    # Stale index: the async handler has to reload it through aiosqlite
+    monkeypatch.setitem(tg.autocomplete_indexes, 'publishers', None)
+    monkeypatch.setattr(tg, 'get_conn', sync_connections_unavailable)
+
+    [(status, headers, body)] = run_requests(asgi, call(asgi, 'GET', '/suggestions', b'category_id=5&search=async'))
+    assert status == 200
+    assert json.loads(body) == ['Async Press']
+    assert tg.autocomplete_indexes['publishers'] is not None
+
+    # Revalidation with the ETag is a 304 without a body
+    etag = headers['etag'].encode()
+    [(status, _, body)] = run_requests(asgi, call(asgi, 'GET', '/suggestions', b'category_id=5&search=async',
+                                                  headers=[(b'if-none-match', etag)]))
+    assert (status, body) == (304, b'')
+
+
+def test_submit_writes_the_ballot_through_the_async_pool(tg, asgi, monkeypatch):
+    votes = {'9': ['Async One', 'Async Two', 'Async Three', '', ''], '5': ['Async Label']}
+    with monkeypatch.context() as m:
+        m.setattr(tg, 'get_conn', sync_connections_unavailable)
+        first, duplicate = run_requests(
+            asgi,
+            call(asgi, 'POST', '/submit', body={'name': 'async voter', 'votes': votes}),
+            call(asgi, 'POST', '/submit', body={'name': 'async voter', 'votes': {'1': ['Other']}}),
+        )
+    assert (first[0], json.loads(first[2])) == (200, {'status': 'success'})
+    assert ballot_selections(tg, 'async voter') == [
+        (5, 1, 'Async Label'), (9, 1, 'Async One'), (9, 2, 'Async Two'), (9, 3, 'Async Three'),
+    ]
+    assert 'async voter' in tg.voter_registry.names
+    assert tg.get_autocomplete('publishers').resolve('async label') == 'Async Label'
+    with tg.get_conn() as conn:
+        points = conn.execute("""
+            SELECT t.points FROM vote_tallies t JOIN games g ON g.id = t.item_id
+            WHERE t.category_id = 9 AND g.name = 'Async One'
+        """).fetchone()[0]
+    assert points == 5
+
+    # The UNIQUE ballot row turns the second ballot into a 403 and writes nothing
+    assert duplicate[0] == 403
+    assert json.loads(duplicate[2])['message'] == 'You have already voted'
+    assert len(ballot_selections(tg, 'async voter')) == 4
+
+
+@pytest.mark.parametrize('body, message', [
+    ({'name': '', 'votes': {'1': ['A']}}, 'Name is required'),
+    ({'name': 'async invalid', 'votes': {'999': ['A']}}, 'Invalid category'),
+])
+def test_submit_rejects_invalid_ballots(tg, asgi, body, message):
+    [(status, _, response)] = run_requests(asgi, call(asgi, 'POST', '/submit', body=body))
+    assert status == 400
+    assert message in json.loads(response)['message']
+    assert ballot_selections(tg, 'async invalid') == []
+
+
+def test_other_routes_are_served_by_flask(tg, asgi):
+    [(status, _, body)] = run_requests(asgi, call(asgi, 'GET', '/categories'))
+    assert status == 200
+    assert {category['id'] for category in json.loads(body)} >= {1, 9}
+
+
+def test_async_routes_are_rate_limited(tg, asgi, monkeypatch):
+    monkeypatch.setattr(tg, 'RATE_LIMIT_ENABLED', True)
+    monkeypatch.setitem(tg.RATE_LIMITS, 'autocomplete', (0.001, 1))
+    first, second = run_requests(
+        asgi,
+        call(asgi, 'GET', '/suggestions', b'category_id=1', client='10.9.9.9'),
+        call(asgi, 'GET', '/suggestions', b'category_id=1', client='10.9.9.9'),
+    )
+    assert first[0] == 200
+    assert second[0] == 429
+    assert 'retry-after' in second[1]
+
+
+def test_exhausted_pool_answers_503(tg, asgi, monkeypatch):
+    monkeypatch.setattr(tg, 'DB_POOL_SIZE', 1)
+    monkeypatch.setattr(tg, 'DB_POOL_TIMEOUT', 0.05)
+    results = []
+
+    async def main():
+        await asgi.startup()
+        try:
+            async with asgi.db_pool.connection():
+                run, sent = call(asgi, 'POST', '/submit',
+                                 body={'name': 'async busy', 'votes': {'1': ['Busy Game']}})
+                await run()
+                results.append(sent[0])
+        finally:
+            await asgi.shutdown()
+
+    asyncio.run(main())
+    assert results[0]['status'] == 503
+    assert ballot_selections(tg, 'async busy') == []
+
+
+def test_requests_go_to_flask_until_the_database_is_initialized(tg, asgi, monkeypatch):
+    monkeypatch.setattr(tg, 'INIT_DB_ON_FIRST_REQUEST', False)
+    monkeypatch.setattr(tg, 'db_initialized', False)
+    [(status, _, _)] = run_requests(asgi, call(asgi, 'GET', '/suggestions', b'category_id=1'))
+    assert status == 200
+    # ensure_db ran in the Flask path
+    assert tg.db_initialized
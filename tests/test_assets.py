@@ -0,0 +1,72 @@
+import gzip
+import json
+import os
+
+import pytest
+
+import build_assets
+
+
+@pytest.fixture
+def built(tmp_path, monkeypatch):
+    """build_assets run over a small static/ tree in tmp_path"""
+    static = tmp_path / 'static'
+    (static / 'css').mkdir(parents=True)
+    (static / 'js').mkdir()
+    (static / 'css' / 'style.css').write_bytes(b'body { direction: rtl; }\n' * 50)
+    (static / 'js' / 'index.js').write_bytes(b'console.log("vote");\n' * 50)
+    monkeypatch.setattr(build_assets, 'STATIC_DIR', str(static))
+    monkeypatch.setattr(build_assets, 'DIST_DIR', str(static / 'dist'))
+    build_assets.build()
+    with open(static / 'dist' / 'manifest.json', encoding='utf-8') as f:
+        return static / 'dist', json.load(f)
+
+
+def test_build_writes_hashed_and_gzipped_copies(built):
+    dist, manifest = built
+    assert set(manifest) == {'css/style.css', 'js/index.js'}
+    target = manifest['css/style.css']
+    assert target == build_assets.hashed_name('css/style.css', (dist / target).read_bytes())
+    assert gzip.decompress((dist / (target + '.gz')).read_bytes()) == (dist / target).read_bytes()
+
+
+def test_build_is_reproducible(built):
+    dist, _ = built
+    css = dist / 'css'
+    before = {name: (css / name).read_bytes() for name in os.listdir(css)}
+    build_assets.build()
+    assert {name: (css / name).read_bytes() for name in os.listdir(css)} == before
+
+
+@pytest.fixture
+def served(tg, built, monkeypatch):
+    dist, manifest = built
+    monkeypatch.setattr(tg, 'ASSET_DIR', str(dist))
+    monkeypatch.setattr(tg, 'asset_manifest', manifest)
+    monkeypatch.setattr(tg, 'hashed_assets', set(manifest.values()))
+    return manifest
+
+
+def test_asset_url_prefers_hashed_copy(tg, served):
+    with tg.app.test_request_context():
+        assert tg.asset_url('css/style.css') == '/assets/' + served['css/style.css']
+        assert tg.asset_url('js/results.js') == '/static/js/results.js'
+
+
+def test_hashed_asset_serves_precompressed_variant(served, client):
+    url = '/assets/' + served['js/index.js']
+    response = client.get(url, headers={'Accept-Encoding': 'gzip'})
+    assert response.status_code == 200
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert response.mimetype == 'text/javascript'
+    assert 'immutable' in response.headers['Cache-Control']
+    assert 'Accept-Encoding' in response.headers['Vary']
+    assert gzip.decompress(response.data).startswith(b'console.log')
+
+    plain = client.get(url, headers={'Accept-Encoding': 'identity'})
+    assert 'Content-Encoding' not in plain.headers
+    assert plain.data.startswith(b'console.log')
+
+
+def test_unknown_asset_is_404(served, client):
+    assert client.get('/assets/js/index.0000000000.js').status_code == 404
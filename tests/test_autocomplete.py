@@ -0,0 +1,59 @@
+def test_search_folds_case_accents_and_arabic_forms(tg):
+    index = tg.AutocompleteIndex(['Pokémon Legends Z-A', 'أَلْعَاب الفيديو', 'Ghost of Yotei'])
+    assert index.search('pokemon') == ['Pokémon Legends Z-A']
+    assert index.search('POKÉ') == ['Pokémon Legends Z-A']
+    assert index.search('العاب') == ['أَلْعَاب الفيديو']
+
+
+def test_search_ranks_name_prefix_then_word_prefix_then_substring(tg):
+    index = tg.AutocompleteIndex(['Hollow Knight', 'Knights of Honor', 'The Knight Witch', 'Darknight'])
+    assert index.search('knight') == ['Knights of Honor', 'Hollow Knight', 'The Knight Witch', 'Darknight']
+
+
+def test_search_follows_add_rename_and_remove(tg):
+    index = tg.AutocompleteIndex(['Arc Raiders'])
+    index.add('Arcane Odyssey')
+    assert index.search('arc') == ['Arc Raiders', 'Arcane Odyssey']
+    index.rename('Arcane Odyssey', 'Odyssey Arcane')
+    assert index.search('arc') == ['Arc Raiders', 'Odyssey Arcane']
+    index.remove('Arc Raiders')
+    assert index.search('raid') == []
+
+
+def test_empty_term_lists_names_in_order_through_updates(tg):
+    index = tg.AutocompleteIndex(['Mario Kart World', 'Arc Raiders', 'Hades II'])
+    assert index.search('') == ['Arc Raiders', 'Hades II', 'Mario Kart World']
+    index.add('Blue Prince')
+    index.rename('Hades II', 'Zelda Notes')
+    index.remove('Arc Raiders')
+    index.add('Blue Prince')
+    assert index.search('', limit=2) == ['Blue Prince', 'Mario Kart World']
+    assert index.search('') == ['Blue Prince', 'Mario Kart World', 'Zelda Notes']
+
+
+def test_short_terms_match_word_prefixes_only(tg):
+    index = tg.AutocompleteIndex(['Hollow Knight', 'Knights of Honor', 'Darknight', 'Kingdom Come'])
+    assert index.search('kn') == ['Knights of Honor', 'Hollow Knight']
+    assert index.search('k') == ['Kingdom Come', 'Knights of Honor', 'Hollow Knight']
+    # From an n-gram on, substrings match too
+    assert index.search('kni') == ['Knights of Honor', 'Hollow Knight', 'Darknight']
+
+
+def test_routes_answer_from_the_index(tg, client, admin_client):
+    # Admin writes show up without a reload
+    assert admin_client.post('/admin/game', json={'name': 'Suggestion Quest'}).json['status'] == 'success'
+    assert client.get('/suggestions', query_string={'category_id': 1, 'search': 'quest'}).json == ['Suggestion Quest']
+    assert client.get('/games', query_string={'search': 'suggestion'}).json == ['Suggestion Quest']
+    assert client.get('/suggestions', query_string={'search': 'quest'}).json == []
+
+    assert admin_client.post('/admin/publisher', json={'name': 'Autocomplete Works'}).json['status'] == 'success'
+    assert client.get('/publishers', query_string={'search': 'autocomplete w'}).json == ['Autocomplete Works']
+    assert client.get('/suggestions', query_string={'category_id': 5, 'search': 'complete'}).json == ['Autocomplete Works']
+
+
+def test_autocomplete_and_admin_search_fold_arabic_alike(tg):
+    assert tg.SEARCH_FOLD is tg.ARABIC_LETTER_FOLD
+    for source, target in tg.SEARCH_FOLD:
+        assert tg.normalize_text(f'ب{source}ب') == tg.normalize_text(f'ب{target}ب')
+    word = 'ٱلمُتَّحِدَة ـ أُمّ'
+    assert tg.normalize_text(word) == tg.normalize_text(word.translate(tg.SEARCH_FOLD_TABLE))
@@ -0,0 +1,140 @@
+import json
+import os
+
+import pytest
+
+
+def ballot_selections(tg, name):
+    with tg.get_conn() as conn:
+        rows = conn.execute("""
+            SELECT category_id, rank, selection FROM vote_details
+            WHERE voter_name = ? ORDER BY category_id, rank
+        """, (name,)).fetchall()
+    return [tuple(row) for row in rows]
+
+
+@pytest.fixture
+def journal(tg, tmp_path, monkeypatch):
+    """A ballot journal whose writer thread does nothing - tests drain it by hand"""
+    monkeypatch.setattr(tg.BallotJournal, 'run', lambda self: None)
+    journal = tg.BallotJournal(str(tmp_path / 'journal'))
+    monkeypatch.setattr(tg, 'ballot_journal', journal)
+    yield journal
+    journal.file.close()
+
+
+def test_commit_ballot_batch_drops_only_the_duplicate(tg):
+    entry = ('batch queue voter', [(1, 1, 'Queued Title', 5)], [('games', 'Queued Title')])
+    other = ('batch queue other', [(1, 1, 'Queued Title', 5)], [('games', 'Queued Title')])
+    written = tg.commit_ballot_batch([entry, entry, other])
+
+    assert [name for name, _, _ in written] == ['batch queue voter', 'batch queue other']
+    assert ballot_selections(tg, 'batch queue voter') == [(1, 1, 'Queued Title')]
+    assert ballot_selections(tg, 'batch queue other') == [(1, 1, 'Queued Title')]
+
+
+def test_commit_ballot_batch_dead_letters_rejected_ballots(tg):
+    good = ('queue good', [(1, 1, 'Queued Good Title', 5)], [('games', 'Queued Good Title')])
+    poison = ('queue poison', [(1, 1, 'Poison Title', {'not': 'a number'})], [('games', 'Poison Title')])
+    written = tg.commit_ballot_batch([good, poison, good])
+
+    assert [name for name, _, _ in written] == ['queue good']
+    assert ballot_selections(tg, 'queue good') == [(1, 1, 'Queued Good Title')]
+    assert ballot_selections(tg, 'queue poison') == []
+    # The poison ballot's savepoint also undid its catalog auto-add
+    with tg.get_conn() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM games WHERE name = 'Poison Title'").fetchone()[0] == 0
+
+    with open(tg.BALLOT_DEAD_LETTER_FILE, encoding='utf-8') as f:
+        dead = [json.loads(line) for line in f]
+    assert [entry['name'] for entry in dead] == ['queue poison']
+    assert dead[0]['error']
+
+
+def test_queued_submit_is_pending_until_drained(tg, client, journal):
+    response = client.post('/submit', json={'name': 'queued voter', 'votes': {'1': ['Queued Game']}})
+    assert response.json == {'status': 'success', 'queued': True}
+    assert client.post('/check-name', json={'name': 'queued voter'}).json['status'] == 'pending'
+    assert client.post('/submit', json={'name': 'queued voter', 'votes': {'1': ['Queued Game']}}).status_code == 403
+    assert ballot_selections(tg, 'queued voter') == []
+
+    assert journal.drain_once() == 1
+    assert ballot_selections(tg, 'queued voter') == [(1, 1, 'Queued Game')]
+    assert client.post('/check-name', json={'name': 'queued voter'}).json['status'] == 'exists'
+    assert os.path.getsize(journal.path) == 0
+
+
+def test_replay_orphaned_journals(tg, tmp_path):
+    directory = tmp_path / 'orphans'
+    directory.mkdir()
+    entries = [
+        {'name': 'orphan voter', 'votes': [[1, 1, 'Orphan Game', 5]], 'catalog': [['games', 'Orphan Game']]},
+        {'name': 'orphan voter', 'votes': [[1, 1, 'Orphan Game', 5]], 'catalog': [['games', 'Orphan Game']]},
+    ]
+    lines = ''.join(json.dumps(entry) + '\n' for entry in entries) + '{"name": "torn'
+    (directory / 'ballots-1-1.journal').write_text(lines, encoding='utf-8')
+
+    tg.replay_orphaned_journals(str(directory))
+
+    assert ballot_selections(tg, 'orphan voter') == [(1, 1, 'Orphan Game')]
+    assert list(directory.iterdir()) == []
+
+
+def test_replay_skips_journals_held_by_a_live_worker(tg, journal):
+    journal.append('live voter', [(1, 1, 'Live Game', 5)], [('games', 'Live Game')])
+    tg.replay_orphaned_journals(os.path.dirname(journal.path))
+    assert os.path.exists(journal.path)
+    assert ballot_selections(tg, 'live voter') == []
+    journal.drain_once()
+
+
+def test_new_journal_is_locked_before_replay_can_see_it(tg, tmp_path, monkeypatch):
+    """Another worker replaying while this one creates its journal must leave it alone"""
+    directory = str(tmp_path / 'journal')
+    real_flock, seen = tg.fcntl.flock, []
+
+    def flock_after_replay(fd, operation):
+        if not seen:
+            seen.append(os.listdir(directory))
+            tg.replay_orphaned_journals(directory)
+        return real_flock(fd, operation)
+
+    monkeypatch.setattr(tg.BallotJournal, 'run', lambda self: None)
+    monkeypatch.setattr(tg.fcntl, 'flock', flock_after_replay)
+    journal = tg.BallotJournal(directory)
+    monkeypatch.setattr(tg.fcntl, 'flock', real_flock)
+    try:
+        assert not any(name.endswith('.journal') for name in seen[0])
+        assert os.listdir(directory) == [os.path.basename(journal.path)]
+
+        journal.append('racing voter', [(1, 1, 'Racing Game', 5)], [('games', 'Racing Game')])
+        tg.replay_orphaned_journals(directory)
+        assert os.path.getsize(journal.path) > 0
+        assert journal.drain_once() == 1
+        assert ballot_selections(tg, 'racing voter') == [(1, 1, 'Racing Game')]
+    finally:
+        journal.file.close()
+
+
+def test_replay_skips_journals_another_worker_already_removed(tg, tmp_path, monkeypatch):
+    directory = tmp_path / 'orphans'
+    directory.mkdir()
+    entry = {'name': 'replayed twice', 'votes': [[1, 1, 'Twice Game', 5]], 'catalog': [['games', 'Twice Game']]}
+    path = directory / 'ballots-2-2.journal'
+    path.write_text(json.dumps(entry) + '\n', encoding='utf-8')
+    gone = str(directory / 'ballots-3-3.journal')
+
+    # The other worker finishes and unlinks the file while this one waits for its lock
+    real_flock = tg.fcntl.flock
+
+    def flock_after_removal(fd, operation):
+        if os.path.exists(path):
+            os.remove(path)
+        return real_flock(fd, operation)
+
+    real_glob = tg.glob.glob
+    monkeypatch.setattr(tg.glob, 'glob', lambda pattern: [gone] + real_glob(pattern))
+    monkeypatch.setattr(tg.fcntl, 'flock', flock_after_removal)
+    tg.replay_orphaned_journals(str(directory))
+
+    assert ballot_selections(tg, 'replayed twice') == []
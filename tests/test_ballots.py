@@ -0,0 +1,66 @@
+import pytest
+
+
+def submit(client, name, votes):
+    return client.post('/submit', json={'name': name, 'votes': votes})
+
+
+def ballot_selections(tg, name):
+    with tg.get_conn() as conn:
+        rows = conn.execute("""
+            SELECT category_id, rank, selection FROM vote_details
+            WHERE voter_name = ? ORDER BY category_id, rank
+        """, (name,)).fetchall()
+    return [tuple(row) for row in rows]
+
+
+@pytest.mark.parametrize('votes, message', [
+    ([], 'Invalid votes payload'),
+    ({'x': ['A']}, 'Invalid category'),
+    ({'999': ['A']}, 'Invalid category'),
+    ({'9': ['A', 'B']}, '5 مراكز'),
+    ({'9': ['A', '', 'C', '', '']}, 'المركز 2'),
+    ({'1': ['A', 'B']}, 'اختيار واحد'),
+    ({'1': ['']}, 'No selections submitted'),
+])
+def test_parse_ballot_rejects_invalid_payloads(tg, votes, message):
+    with pytest.raises(ValueError, match=message):
+        tg.parse_ballot(votes)
+
+
+def test_parse_ballot_flattens_rows_and_dedupes_catalog_adds(tg):
+    vote_rows, catalog_rows = tg.parse_ballot({
+        '9': ['Alpha', 'Beta', 'Gamma', '', 'Delta'],
+        '1': ['Alpha'],
+        '5': ['Some Publisher'],
+    })
+    assert vote_rows == [
+        (9, 1, 'Alpha', 5), (9, 2, 'Beta', 4), (9, 3, 'Gamma', 3), (9, 5, 'Delta', 1),
+        (1, 1, 'Alpha', 5), (5, 1, 'Some Publisher', 5),
+    ]
+    assert catalog_rows == [
+        ('games', 'Alpha'), ('games', 'Beta'), ('games', 'Gamma'), ('games', 'Delta'),
+        ('publishers', 'Some Publisher'),
+    ]
+
+
+def test_submit_writes_the_whole_ballot_once(tg, client):
+    votes = {'9': ['Batch One', 'Batch Two', 'Batch Three', '', ''], '5': ['Batch Publisher']}
+    assert submit(client, 'batch voter', votes).status_code == 200
+    assert ballot_selections(tg, 'batch voter') == [
+        (5, 1, 'Batch Publisher'), (9, 1, 'Batch One'), (9, 2, 'Batch Two'), (9, 3, 'Batch Three'),
+    ]
+    assert client.get('/publishers', query_string={'search': 'batch'}).json == ['Batch Publisher']
+
+    # The UNIQUE ballot row turns a second ballot into a 403 and writes nothing
+    response = submit(client, 'batch voter', {'1': ['Another Game']})
+    assert response.status_code == 403
+    assert len(ballot_selections(tg, 'batch voter')) == 4
+
+
+def test_deleting_last_vote_frees_the_name(tg, client, admin_client):
+    assert submit(client, 'freed voter', {'1': ['Freed Game']}).status_code == 200
+    with tg.get_conn() as conn:
+        (vote_id,) = conn.execute("SELECT id FROM vote_details WHERE voter_name = ?", ('freed voter',)).fetchone()
+    assert admin_client.delete(f'/admin/vote/{vote_id}').status_code == 200
+    assert submit(client, 'freed voter', {'1': ['Freed Game']}).status_code == 200
@@ -0,0 +1,102 @@
+import gzip
+import zlib
+
+import pytest
+
+
+def marked_encoders(tg, marker):
+    """gzip underneath, with a marker byte so the test can tell which encoder ran"""
+    compress, stream = tg.gzip_encoders()
+    return (lambda data: marker + compress(data)), stream
+
+
+@pytest.fixture
+def encoders(tg, monkeypatch):
+    # brotli/zstandard may not be installed; stand-ins make the choice observable
+    fake = {'gzip': tg.gzip_encoders(), 'br': marked_encoders(tg, b'B'), 'zstd': marked_encoders(tg, b'Z')}
+    monkeypatch.setattr(tg, 'response_encoders', fake)
+    monkeypatch.setattr(tg, 'compressed_bodies', tg.CompressedBodyCache(16))
+    monkeypatch.setattr(tg, 'COMPRESS_MIN_SIZE', 64)
+    return fake
+
+
+@pytest.fixture
+def large_catalog(client, admin_client):
+    for i in range(12):
+        admin_client.post('/admin/game', json={'name': f'Compression Chronicles Volume {i}'})
+    return {'search': 'compression chronicles', 'limit': 50}
+
+
+@pytest.mark.parametrize('accept, expected', [
+    ('gzip, deflate, br, zstd', 'br'),
+    ('gzip, zstd', 'zstd'),
+    ('gzip', 'gzip'),
+    ('br;q=0.5, zstd;q=0.8, gzip;q=1.0', 'gzip'),
+    ('zstd;q=0.9, br;q=0.2', 'zstd'),
+])
+def test_accept_encoding_picks_best_available(encoders, client, large_catalog, accept, expected):
+    response = client.get('/games', query_string=large_catalog, headers={'Accept-Encoding': accept})
+    assert response.headers['Content-Encoding'] == expected
+    assert 'Accept-Encoding' in response.headers['Vary']
+    data = response.data
+    if expected != 'gzip':
+        assert data[:1] == {'br': b'B', 'zstd': b'Z'}[expected]
+        data = data[1:]
+    assert gzip.decompress(data) == client.get('/games', query_string=large_catalog).data
+
+
+def test_identity_and_small_bodies_stay_uncompressed(encoders, client, large_catalog):
+    plain = client.get('/games', query_string=large_catalog, headers={'Accept-Encoding': 'identity'})
+    assert 'Content-Encoding' not in plain.headers
+    assert 'Accept-Encoding' in plain.headers['Vary']
+
+    small = client.get('/games', query_string={'search': 'compression chronicles', 'limit': 1},
+                       headers={'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in small.headers
+
+
+def test_compressed_variant_carries_weak_etag(encoders, client, large_catalog):
+    plain = client.get('/games', query_string=large_catalog, headers={'Accept-Encoding': 'identity'})
+    strong = plain.headers['ETag']
+    assert not strong.startswith('W/')
+
+    compressed = client.get('/games', query_string=large_catalog, headers={'Accept-Encoding': 'gzip'})
+    assert compressed.headers['ETag'] == 'W/' + strong
+    # The weak tag still revalidates against the same content
+    revalidated = client.get('/games', query_string=large_catalog,
+                             headers={'Accept-Encoding': 'gzip', 'If-None-Match': compressed.headers['ETag']})
+    assert revalidated.status_code == 304
+
+
+def test_compressed_body_is_cached_per_etag_and_encoding(tg, encoders, client, large_catalog, monkeypatch):
+    calls = []
+    compress, stream = encoders['gzip']
+    monkeypatch.setitem(encoders, 'gzip', (lambda data: calls.append(1) or compress(data), stream))
+    for _ in range(3):
+        client.get('/games', query_string=large_catalog, headers={'Accept-Encoding': 'gzip'})
+    assert len(calls) == 1
+
+
+def test_streamed_export_is_compressed_in_flushed_chunks(encoders, admin_client):
+    plain = admin_client.get('/admin/export/categories').data
+    response = admin_client.get('/admin/export/categories', headers={'Accept-Encoding': 'gzip'})
+    assert response.is_streamed
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Content-Length' not in response.headers
+    assert zlib.decompress(response.data, 31) == plain
+
+
+@pytest.mark.parametrize('package, encoding', [('brotli', 'br'), ('zstandard', 'zstd')])
+def test_optional_encoders_round_trip(tg, monkeypatch, package, encoding):
+    module = pytest.importorskip(package)
+    monkeypatch.setattr(tg, 'response_encoders', None)
+    compress, stream = tg.available_encoders()[encoding]
+    data = b'{"name": "Ghost of Yotei"}\n' * 100
+    compress_chunk, finish = stream()
+    streamed = compress_chunk(data[:1000]) + compress_chunk(data[1000:]) + finish()
+    if encoding == 'br':
+        assert module.decompress(compress(data)) == data == module.decompress(streamed)
+    else:
+        decompressor = module.ZstdDecompressor()
+        assert decompressor.decompress(compress(data)) == data
+        assert decompressor.decompressobj().decompress(streamed) == data
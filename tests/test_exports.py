@@ -0,0 +1,88 @@
+import csv
+import gzip
+import io
+import json
+
+import pytest
+
+
+def submit(client, name, votes):
+    return client.post('/submit', json={'name': name, 'votes': votes})
+
+
+def test_stream_query_yields_header_then_rows_in_batches(tg, monkeypatch):
+    monkeypatch.setattr(tg, 'EXPORT_BATCH_SIZE', 2)
+    with tg.get_conn() as conn:
+        expected = [tuple(row) for row in conn.execute("SELECT id, name_ar FROM categories ORDER BY id")]
+        rows = tg.stream_query(conn, "SELECT id, name_ar FROM categories ORDER BY id")
+        assert next(rows) == ['id', 'name_ar']
+        assert [tuple(row) for row in rows] == expected
+
+
+def test_excel_export_is_admin_only(client):
+    assert client.get('/download-excel').status_code == 403
+
+
+def test_excel_export_workbook(tg, client, admin_client):
+    openpyxl = pytest.importorskip('openpyxl')
+    assert submit(client, 'excel voter', {'1': ['Excel Game']}).status_code == 200
+
+    response = admin_client.get('/download-excel')
+    assert response.status_code == 200
+    assert response.mimetype == tg.EXCEL_MIMETYPE
+    workbook = openpyxl.load_workbook(io.BytesIO(response.data), read_only=True)
+    assert workbook.sheetnames == [name for name, _ in tg.EXPORT_SHEETS] + ['Summary']
+
+    votes = list(workbook['All Votes'].values)
+    assert votes[0][:4] == ('voter_name', 'category', 'rank', 'selection')
+    assert any(row[0] == 'excel voter' and row[3] == 'Excel Game' for row in votes[1:])
+
+    summary = dict(list(workbook['Summary'].values)[1:])
+    with tg.get_conn() as conn:
+        assert summary['Total Voters'] == conn.execute("SELECT COUNT(*) FROM ballots").fetchone()[0]
+
+
+def test_csv_export_with_since(tg, client, admin_client):
+    assert submit(client, 'csv voter', {'1': ['Csv Game'], '5': ['Csv Publisher']}).status_code == 200
+    response = admin_client.get('/admin/export/votes')
+    assert response.status_code == 200
+    assert response.mimetype == 'text/csv'
+    rows = list(csv.reader(io.StringIO(response.get_data(as_text=True))))
+    header, rows = rows[0], rows[1:]
+    assert header[:2] == ['id', 'voter_name']
+    mine = [row for row in rows if row[1] == 'csv voter']
+    assert len(mine) == 2
+
+    first_id = int(mine[0][0])
+    newer = admin_client.get('/admin/export/votes', query_string={'since': first_id})
+    ids = [int(row[0]) for row in list(csv.reader(io.StringIO(newer.get_data(as_text=True))))[1:]]
+    assert ids and min(ids) > first_id
+
+
+def test_ndjson_export(tg, client, admin_client):
+    assert submit(client, 'ndjson voter', {'1': ['Ndjson Game']}).status_code == 200
+    response = admin_client.get('/admin/export/votes', query_string={'format': 'ndjson'})
+    assert response.mimetype == 'application/x-ndjson'
+    records = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    mine = next(record for record in records if record['voter_name'] == 'ndjson voter')
+    assert mine['selection'] == 'Ndjson Game'
+
+    rankings = admin_client.get('/admin/export/rankings', query_string={'format': 'ndjson'})
+    assert any(r['selection'] == 'Ndjson Game' for r in map(json.loads, rankings.get_data(as_text=True).splitlines()))
+
+
+def test_export_gzip_matches_plain_body(admin_client):
+    plain = admin_client.get('/admin/export/categories').data
+    compressed = admin_client.get('/admin/export/categories', headers={'Accept-Encoding': 'gzip'})
+    assert compressed.headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(compressed.data) == plain
+
+
+@pytest.mark.parametrize('path, args', [
+    ('/admin/export/nope', {}),
+    ('/admin/export/votes', {'format': 'xml'}),
+    ('/admin/export/votes', {'since': 'abc'}),
+    ('/admin/export/rankings', {'since': 1}),
+])
+def test_export_rejects_bad_requests(admin_client, path, args):
+    assert admin_client.get(path, query_string=args).status_code == 400
@@ -0,0 +1,23 @@
+import os
+import runpy
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_conf(monkeypatch, **env):
+    for key, value in env.items():
+        monkeypatch.setenv(key, value)
+    return runpy.run_path(os.path.join(ROOT, 'gunicorn.conf.py'))
+
+
+def test_threaded_workers_by_default(monkeypatch):
+    for key in ('PORT', 'WEB_CONCURRENCY', 'GUNICORN_THREADS'):
+        monkeypatch.delenv(key, raising=False)
+    conf = load_conf(monkeypatch)
+    assert conf['worker_class'] == 'gthread'
+    assert (conf['workers'], conf['threads'], conf['bind']) == (2, 16, '0.0.0.0:5000')
+
+
+def test_environment_overrides(monkeypatch):
+    conf = load_conf(monkeypatch, PORT='8080', WEB_CONCURRENCY='4', GUNICORN_THREADS='8')
+    assert (conf['workers'], conf['threads'], conf['bind']) == (4, 8, '0.0.0.0:8080')
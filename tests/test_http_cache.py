@@ -0,0 +1,52 @@
+import pytest
+
+
+@pytest.fixture
+def fresh_categories(tg, monkeypatch):
+    monkeypatch.setattr(tg, 'categories_snapshot', None)
+    return tg
+
+
+def test_categories_etag_round_trip(fresh_categories, client):
+    response = client.get('/categories')
+    assert response.status_code == 200
+    etag = response.headers['ETag']
+    assert response.headers['Last-Modified']
+    assert 'public' in response.headers['Cache-Control']
+    assert 'no-cache' in response.headers['Cache-Control']
+
+    revalidated = client.get('/categories', headers={'If-None-Match': etag})
+    assert revalidated.status_code == 304
+    assert revalidated.data == b''
+
+    since = client.get('/categories', headers={'If-Modified-Since': response.headers['Last-Modified']})
+    assert since.status_code == 304
+
+
+def test_categories_rebuild_keeps_last_modified_when_unchanged(tg):
+    first = tg.build_categories_snapshot(1, None)
+    second = tg.build_categories_snapshot(2, {**first, 'last_modified': tg.http_now().replace(year=2000)})
+    assert second['etag'] == first['etag']
+    assert second['last_modified'].year == 2000
+
+
+def test_catalog_etag_follows_index_content(tg, client, admin_client):
+    response = client.get('/games', query_string={'search': 'cache'})
+    etag = response.headers['ETag']
+    assert client.get('/games', query_string={'search': 'cache'},
+                      headers={'If-None-Match': etag}).status_code == 304
+
+    assert admin_client.post('/admin/game', json={'name': 'Cache Busting Quest'}).status_code == 200
+    after = client.get('/games', query_string={'search': 'cache'}, headers={'If-None-Match': etag})
+    assert after.status_code == 200
+    assert after.headers['ETag'] != etag
+    assert 'Cache Busting Quest' in after.json
+
+
+def test_index_etag_ignores_load_order(tg):
+    first = tg.AutocompleteIndex(['Alpha Quest', 'Beta Quest'])
+    second = tg.AutocompleteIndex(['Beta Quest', 'Alpha Quest'])
+    assert first.etag() == second.etag()
+    second.add('Gamma Quest')
+    second.remove('Gamma Quest')
+    assert first.etag() == second.etag()
@@ -0,0 +1,73 @@
+import io
+
+import pytest
+
+
+def upload(admin_client, table, filename, text):
+    return admin_client.post(f'/admin/import/{table}', data={'file': (io.BytesIO(text.encode('utf-8')), filename)},
+                             content_type='multipart/form-data')
+
+
+def test_parse_catalog_upload(tg):
+    assert tg.parse_catalog_upload('﻿Alpha\n\n  Beta  \n') == ['Alpha', '  Beta  ']
+    assert tg.parse_catalog_upload('id,name\n1,Alpha\n2,"Beta, Deluxe"\n,\n', 'titles.csv') == ['Alpha', 'Beta, Deluxe']
+    assert tg.parse_catalog_upload('Alpha\nBeta\n', 'titles.CSV') == ['Alpha', 'Beta']
+
+
+def test_import_counts(tg, client, admin_client):
+    assert admin_client.post('/admin/game', json={'name': 'Import Existing Title'}).status_code == 200
+
+    text = '\n'.join([
+        'Import New Title',
+        'import  new   title',    # same folding as the line above
+        'IMPORT EXISTING TITLE',  # already in the table
+        '"/*;',                   # nothing left after sanitizing
+        'Import Second Title',
+    ])
+    response = upload(admin_client, 'games', 'titles.txt', text)
+    assert response.status_code == 200
+    assert response.json['received'] == 5
+    assert response.json['inserted'] == 2
+    assert response.json['skipped'] == {'invalid': 1, 'duplicate': 1, 'existing': 1}
+
+    # Imported names are searchable straight away
+    assert client.get('/games', query_string={'search': 'import second'}).json == ['Import Second Title']
+
+    again = upload(admin_client, 'games', 'titles.txt', text)
+    assert again.json['inserted'] == 0
+    assert again.json['skipped'] == {'invalid': 1, 'duplicate': 0, 'existing': 4}
+
+
+def test_import_csv_into_publishers(tg, admin_client):
+    response = upload(admin_client, 'publishers', 'publishers.csv', 'name,country\nImport Studio One,JP\nImport Studio Two,SE\n')
+    assert response.json['inserted'] == 2
+    with tg.get_conn() as conn:
+        names = {row[0] for row in conn.execute("SELECT name FROM publishers WHERE name LIKE 'Import Studio%'")}
+    assert names == {'Import Studio One', 'Import Studio Two'}
+
+
+@pytest.mark.parametrize('table, body, status', [
+    ('votes', 'Alpha', 400),
+    ('games', b'\xff\xfe'.decode('latin-1'), 400),
+])
+def test_import_rejects_bad_requests(admin_client, table, body, status):
+    data = {'file': (io.BytesIO(body.encode('latin-1')), 'titles.txt')}
+    response = admin_client.post(f'/admin/import/{table}', data=data, content_type='multipart/form-data')
+    assert response.status_code == status
+
+
+def test_import_size_limit(tg, admin_client, monkeypatch):
+    monkeypatch.setattr(tg, 'IMPORT_MAX_BYTES', 10)
+    assert upload(admin_client, 'games', 'titles.txt', 'Far Too Long A Title').status_code == 413
+
+
+def test_import_is_admin_only(client):
+    assert client.post('/admin/import/games').status_code == 403
+
+
+def test_import_catalog_command(tg, tmp_path):
+    path = tmp_path / 'titles.txt'
+    path.write_text('Command Import Title\n', encoding='utf-8')
+    result = tg.app.test_cli_runner().invoke(args=['import-catalog', 'games_2026', str(path)])
+    assert result.exit_code == 0, result.output
+    assert '1 inserted of 1' in result.output
@@ -0,0 +1,94 @@
+import sqlite3
+
+import pytest
+
+LEGACY_VOTES = [
+    # id, voter_name, category_id, rank, selection, points
+    (3, 'legacy a', 1, 1, 'Legacy Game', 5),
+    (4, 'legacy a', 5, 1, 'Legacy Studio', 5),
+    (5, 'legacy a', 8, 1, 'Legacy Sequel', 5),
+    (7, 'legacy b', 1, 1, 'Legacy Game', 5),
+    (8, 'legacy b', 9, 1, 'Legacy Game', 5),
+    (9, 'legacy b', 9, 2, 'Legacy Other', 4),
+]
+
+
+@pytest.fixture
+def legacy_db(tg, tmp_path, monkeypatch):
+    """A database with the old name-based votes table, opened by this thread"""
+    path = str(tmp_path / 'legacy.db')
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE games (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT UNIQUE NOT NULL,
+                            created_at DATETIME DEFAULT CURRENT_TIMESTAMP);
+        INSERT INTO games (name) VALUES ('Legacy Other');
+        CREATE TABLE votes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            voter_name TEXT NOT NULL,
+            category_id INTEGER NOT NULL,
+            rank INTEGER CHECK (rank BETWEEN 1 AND 5),
+            selection TEXT NOT NULL,
+            points INTEGER DEFAULT 0,
+            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE(voter_name, category_id, rank)
+        );
+    """)
+    conn.executemany("""
+        INSERT INTO votes (id, voter_name, category_id, rank, selection, points) VALUES (?, ?, ?, ?, ?, ?)
+    """, LEGACY_VOTES)
+    conn.commit()
+    conn.close()
+
+    # This thread's connection is bound to the session database; swap it out
+    saved = getattr(tg.sqlite_local, 'conn', None), getattr(tg.sqlite_local, 'pid', None)
+    tg.sqlite_local.conn = None
+    monkeypatch.setattr(tg, 'DB_PATH', path)
+    yield tg
+    tg.sqlite_local.conn.close()
+    tg.sqlite_local.conn, tg.sqlite_local.pid = saved
+
+
+def query(tg, sql):
+    with tg.get_conn() as conn:
+        return [tuple(row) for row in conn.execute(sql).fetchall()]
+
+
+def test_init_db_upgrades_legacy_votes(legacy_db):
+    tg = legacy_db
+    tg.init_db()
+
+    columns = [row[1] for row in query(tg, "PRAGMA table_info(votes)")]
+    assert 'voter_name' not in columns and 'selection' not in columns
+    assert {'voter_id', 'item_id'} <= set(columns)
+
+    # Same rows, same ids, read back through the name view
+    assert query(tg, """
+        SELECT id, voter_name, category_id, rank, selection, points FROM vote_details ORDER BY id
+    """) == LEGACY_VOTES
+    assert sorted(name for (name,) in query(tg, "SELECT voter_name FROM ballots")) == ['legacy a', 'legacy b']
+    # Selections were backfilled into the catalog of their category
+    assert ('Legacy Studio',) in query(tg, "SELECT name FROM publishers")
+    assert ('Legacy Sequel',) in query(tg, "SELECT name FROM games_2026")
+    assert query(tg, "SELECT COUNT(*) FROM games WHERE name = 'Legacy Other'") == [(1,)]
+
+    assert sorted(query(tg, "SELECT category_id, item_id, points, voters, votes, rank_sum FROM vote_tallies")) == \
+        sorted(query(tg, """
+            SELECT category_id, item_id, SUM(points), COUNT(DISTINCT voter_id), COUNT(*), SUM(rank)
+            FROM votes GROUP BY category_id, item_id
+        """))
+
+    # New votes continue after the highest legacy id
+    with tg.get_conn() as conn:
+        conn.execute("INSERT INTO votes (voter_id, category_id, rank, item_id, points) VALUES (1, 2, 1, 1, 5)")
+        new_id = conn.execute("SELECT MAX(id) FROM votes").fetchone()[0]
+        conn.rollback()
+    assert new_id == 10
+
+
+def test_upgrade_runs_once(legacy_db):
+    tg = legacy_db
+    tg.init_db()
+    before = query(tg, "SELECT id, voter_id, category_id, rank, item_id, points FROM votes ORDER BY id")
+    tg.init_db()
+    assert query(tg, "SELECT id, voter_id, category_id, rank, item_id, points FROM votes ORDER BY id") == before
+    assert len(before) == len(LEGACY_VOTES)
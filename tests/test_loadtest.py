@@ -0,0 +1,41 @@
+import random
+import threading
+
+import pytest
+from werkzeug.serving import make_server
+
+import loadtest
+
+
+@pytest.fixture
+def live_server(tg):
+    server = make_server('127.0.0.1', 0, tg.app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+
+
+def test_stats_classify_outcomes():
+    stats = loadtest.Stats()
+    for status in (200, 429, 503, 500, None):
+        stats.record('/submit', 0.01, status)
+    assert dict(stats.outcomes[(None, '/submit')]) == {'ok': 1, 'shed': 2, 'error': 1, 'failed': 1}
+
+
+def test_percentile():
+    values = sorted(range(1, 101))
+    assert loadtest.percentile(values, 50) == 51
+    assert loadtest.percentile(values, 99) == 99
+    assert loadtest.percentile([], 95) == 0.0
+
+
+def test_voter_session_submits_a_valid_ballot(tg, live_server):
+    stats = loadtest.Stats()
+    titles = loadtest.load_titles(live_server, stats)
+    client = loadtest.Client(live_server, stats, timeout=10)
+    loadtest.voter_session(client, titles, 'loadtest voter', random.Random(1), think=0)
+
+    assert dict(stats.outcomes[(None, '/submit')]) == {'ok': 1}
+    assert tg.voter_registry.has_voted('loadtest voter')
+    assert all(set(outcomes) == {'ok'} for outcomes in stats.outcomes.values())
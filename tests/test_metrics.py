@@ -0,0 +1,83 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+
+@pytest.fixture
+def metrics_dir(tg, tmp_path, monkeypatch):
+    monkeypatch.setattr(tg, 'METRICS_DIR', str(tmp_path))
+    return tmp_path
+
+
+def series(body, name):
+    """{label string: value} for one metric in a Prometheus text body"""
+    values = {}
+    for line in body.splitlines():
+        if line.startswith(name + '{') or line.startswith(name + ' '):
+            key, value = line.rsplit(' ', 1)
+            values[key[len(name):]] = float(value)
+    return values
+
+
+def test_requests_are_counted_per_endpoint(metrics_dir, client):
+    for _ in range(3):
+        client.get('/categories')
+    body = client.get('/metrics').get_data(as_text=True)
+
+    requests = series(body, 'tg_http_requests_total')
+    assert requests['{endpoint="get_categories",method="GET",status="200"}'] >= 3
+    assert '# TYPE tg_http_request_duration_seconds histogram' in body
+    count = series(body, 'tg_http_request_duration_seconds_count')['{endpoint="get_categories"}']
+    assert series(body, 'tg_http_request_duration_seconds_bucket')['{endpoint="get_categories",le="+Inf"}'] == count
+
+
+def test_named_queries_are_timed(metrics_dir, client):
+    client.get('/categories')
+    body = client.get('/metrics').get_data(as_text=True)
+    assert series(body, 'tg_db_query_duration_seconds_count')['{query="categories.list"}'] >= 1
+
+
+@pytest.mark.parametrize('path, endpoint', [
+    # Raw execute calls, not named queries
+    ('/admin/view-table?table=votes', 'view_table'),
+    # Statements run while the body streams, after the view returned
+    ('/admin/export/votes', 'export_dataset'),
+])
+def test_every_statement_counts_toward_request_totals(metrics_dir, admin_client, path, endpoint):
+    response = admin_client.get(path)
+    assert response.status_code == 200
+    response.get_data()
+    response.close()
+    body = admin_client.get('/metrics').get_data(as_text=True)
+    assert series(body, 'tg_db_queries_per_request_sum')[f'{{endpoint="{endpoint}"}}'] >= 1
+    assert series(body, 'tg_db_time_per_request_seconds_count')[f'{{endpoint="{endpoint}"}}'] >= 1
+
+
+def test_token_is_required_when_configured(tg, metrics_dir, client, monkeypatch):
+    monkeypatch.setattr(tg, 'METRICS_TOKEN', 'secret')
+    assert client.get('/metrics').status_code == 403
+    assert client.get('/metrics', headers={'Authorization': 'Bearer secret'}).status_code == 200
+
+
+def test_dead_worker_counts_are_kept_once(tg, metrics_dir, client):
+    # A pid that is certainly gone
+    dead = subprocess.Popen([sys.executable, '-c', 'pass'])
+    dead.wait()
+    snapshot = {
+        'counters': [['tg_http_requests_total', [['endpoint', 'retired_test'], ['method', 'GET'], ['status', '200']], 7]],
+        'gauges': [['tg_http_requests_in_flight', [], 3]],
+        'histograms': [],
+    }
+    (metrics_dir / f'worker-{dead.pid}.json').write_text(json.dumps(snapshot))
+
+    for _ in range(2):
+        body = client.get('/metrics').get_data(as_text=True)
+        assert series(body, 'tg_http_requests_total')['{endpoint="retired_test",method="GET",status="200"}'] == 7
+    assert not os.path.exists(metrics_dir / f'worker-{dead.pid}.json')
+    assert os.path.exists(metrics_dir / 'retired.json')
+    # Gauges of dead workers are dropped, live ones carry their pid
+    gauges = series(body, 'tg_http_requests_in_flight')
+    assert list(gauges) == [f'{{worker="{os.getpid()}"}}']
@@ -0,0 +1,38 @@
+import pytest
+
+
+@pytest.fixture
+def queries(tg, monkeypatch):
+    monkeypatch.setattr(tg, 'QUERIES', dict(tg.QUERIES))
+    return tg
+
+
+def test_register_query_compiles_for_the_backend(queries, monkeypatch):
+    queries.register_query('test.sqlite', "SELECT ? WHERE ? = 1")
+    assert queries.QUERIES['test.sqlite'] == "SELECT ? WHERE ? = 1"
+
+    monkeypatch.setattr(queries, 'DB_TYPE', 'postgres')
+    queries.register_query('test.postgres', "SELECT ? WHERE ? = 1")
+    queries.register_query('test.override', "SELECT ?", "SELECT %s::text")
+    assert queries.QUERIES['test.postgres'] == "SELECT %s WHERE %s = 1"
+    assert queries.QUERIES['test.override'] == "SELECT %s::text"
+
+
+def test_fetch_helpers_return_plain_tuples(queries):
+    queries.register_query('test.values', "SELECT value FROM (SELECT 1 AS value UNION ALL SELECT 2) WHERE value >= ? ORDER BY value")
+    with queries.get_conn() as conn:
+        assert queries.fetch_all(conn, 'test.values', (1,)) == [(1,), (2,)]
+        assert queries.fetch_one(conn, 'test.values', (2,)) == (2,)
+        assert queries.fetch_value(conn, 'test.values', (3,), default='none') == 'none'
+
+
+def test_check_vote_reads_through_the_registry(client):
+    votes = {'9': ['Registry One', 'Registry Two', 'Registry Three', '', ''], '1': ['Registry One']}
+    assert client.post('/submit', json={'name': 'registry voter', 'votes': votes}).status_code == 200
+    response = client.post('/check-vote', json={'name': 'registry voter'}).json
+    assert response['status'] == 'exists'
+    assert response['vote_count'] == 4
+    assert {'rank': 2, 'selection': 'Registry Two', 'points': 4} in [
+        {key: vote[key] for key in ('rank', 'selection', 'points')} for vote in response['votes']
+    ]
+    assert client.post('/check-vote', json={'name': 'nobody at all'}).json == {'status': 'new'}
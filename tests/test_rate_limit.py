@@ -0,0 +1,70 @@
+import threading
+
+import pytest
+
+
+@pytest.fixture
+def limited(tg, monkeypatch):
+    monkeypatch.setattr(tg, 'RATE_LIMIT_ENABLED', True)
+    monkeypatch.setattr(tg, 'rate_limit_store', tg.MemoryBucketStore())
+    monkeypatch.setitem(tg.RATE_LIMITS, 'lookup', (0.001, 2))
+    return tg
+
+
+def check_name(client, remote_addr='10.0.0.1', headers=None):
+    return client.post('/check-name', json={'name': 'someone'}, headers=headers or {},
+                       environ_base={'REMOTE_ADDR': remote_addr})
+
+
+def test_buckets_are_per_client(limited, client):
+    assert [check_name(client).status_code for _ in range(3)] == [200, 200, 429]
+    assert check_name(client, remote_addr='10.0.0.2').status_code == 200
+
+
+def test_proxied_clients_are_keyed_on_the_appended_hop(limited, client, monkeypatch):
+    monkeypatch.setattr(limited, 'RATE_LIMIT_TRUST_PROXY', True)
+    # Client-supplied entries to the left of the proxy's change every request
+    statuses = [check_name(client, headers={'X-Forwarded-For': f'spoofed-{i}, 203.0.113.7'}).status_code
+                for i in range(3)]
+    assert statuses == [200, 200, 429]
+    assert check_name(client, headers={'X-Forwarded-For': '203.0.113.8'}).status_code == 200
+
+    monkeypatch.setattr(limited, 'RATE_LIMIT_PROXY_HOPS', 2)
+    assert check_name(client, headers={'X-Forwarded-For': '198.51.100.1, 203.0.113.7'}).status_code == 200
+
+
+def test_rejections_say_when_to_retry(limited, client):
+    for _ in range(2):
+        check_name(client)
+    response = check_name(client)
+    assert response.status_code == 429
+    assert int(response.headers['Retry-After']) >= 1
+
+
+def test_unlimited_routes_are_untouched(limited, client):
+    for _ in range(5):
+        assert client.get('/categories', environ_base={'REMOTE_ADDR': '10.0.0.1'}).status_code == 200
+
+
+def test_shared_store_is_seen_by_every_worker(tg, tmp_path):
+    path = str(tmp_path / 'buckets.db')
+    first, second = tg.SQLiteBucketStore(path), tg.SQLiteBucketStore(path)
+    assert first.take('lookup:10.0.0.9', 0.001, 2)[0]
+    assert second.take('lookup:10.0.0.9', 0.001, 2)[0]
+    assert not first.take('lookup:10.0.0.9', 0.001, 2)[0]
+    assert second.take('lookup:10.0.0.10', 0.001, 2)[0]
+
+
+def test_load_is_shed_when_every_slot_is_busy(limited, client, monkeypatch):
+    monkeypatch.setattr(limited, 'inflight_slots', threading.BoundedSemaphore(1))
+    monkeypatch.setattr(limited, 'LOAD_SHED_WAIT', 0.01)
+    limited.inflight_slots.acquire()
+    try:
+        response = check_name(client)
+        assert response.status_code == 503
+        assert response.headers['Retry-After'] == '1'
+    finally:
+        limited.inflight_slots.release()
+    # Slots are handed back after each request
+    assert check_name(client, remote_addr='10.0.0.3').status_code == 200
+    assert check_name(client, remote_addr='10.0.0.3').status_code == 200
@@ -0,0 +1,41 @@
+import pytest
+
+
+@pytest.fixture
+def slow_log(tg, tmp_path, monkeypatch):
+    """Log every statement as slow, into a fresh log and metrics directory"""
+    monkeypatch.setattr(tg, 'METRICS_DIR', str(tmp_path))
+    monkeypatch.setattr(tg, 'SLOW_QUERY_MS', 0)
+    monkeypatch.setattr(tg, 'slow_query_log', tg.SlowQueryLog())
+    # /categories is answered from a snapshot once built - start without one
+    monkeypatch.setattr(tg, 'categories_snapshot', None)
+    return tg.slow_query_log
+
+
+def test_normalize_sql_strips_literals_and_collapses_groups(tg):
+    assert tg.normalize_sql("SELECT * FROM t WHERE a = 'x''y' AND b = 42 AND c = %s") == \
+        "SELECT * FROM t WHERE a = ? AND b = ? AND c = ?"
+    assert tg.normalize_sql("INSERT INTO t VALUES (1, 'a'), (2, 'b'), (3, 'c')") == \
+        "INSERT INTO t VALUES (?, ?), ..."
+    assert tg.normalize_sql("SELECT t2.id FROM t2") == "SELECT t2.id FROM t2"
+
+
+def test_params_shape(tg):
+    assert tg.params_shape((1, 'a', None)) == '(int, str, NoneType)'
+    assert tg.params_shape([(1,), (2,)], many=True) == '2 x (int)'
+    assert tg.params_shape({'key': 'a'}) == '{key: str}'
+
+
+def test_slow_statements_are_listed_with_plans(slow_log, client, admin_client):
+    client.get('/categories')
+    response = admin_client.get('/admin/slow-queries')
+    assert response.status_code == 200
+    queries = response.json['queries']
+    categories = next(q for q in queries if 'FROM categories' in q['sql'] and 'get_categories' in q['routes'])
+    assert categories['count'] >= 1
+    assert categories['plan']
+    assert categories['avg_ms'] >= 0
+
+
+def test_slow_queries_are_admin_only(client):
+    assert client.get('/admin/slow-queries').status_code == 403
@@ -0,0 +1,37 @@
+import threading
+
+
+def test_connection_is_tuned(tg):
+    with tg.get_conn() as conn:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == 'wal'
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+        assert conn.execute("PRAGMA busy_timeout").fetchone()[0] == tg.SQLITE_BUSY_TIMEOUT_MS
+        assert conn.execute("PRAGMA temp_store").fetchone()[0] == 2  # MEMORY
+
+
+def test_connection_is_reused_per_thread(tg):
+    with tg.get_conn() as outer:
+        with tg.get_conn() as inner:
+            assert inner is outer
+    with tg.get_conn() as again:
+        assert again is outer
+
+    seen = []
+    def worker():
+        with tg.get_conn() as conn:
+            seen.append(conn)
+    thread = threading.Thread(target=worker)
+    thread.start()
+    thread.join()
+    assert seen[0] is not outer
+
+
+def test_uncommitted_work_is_rolled_back_when_the_outer_block_exits(tg):
+    with tg.get_conn() as conn:
+        conn.execute("INSERT INTO games (name) VALUES ('Never Committed')")
+        with tg.get_conn():
+            pass
+        # Still inside the outer block - nothing rolled back yet
+        assert conn.in_transaction
+    with tg.get_conn() as conn:
+        assert conn.execute("SELECT 1 FROM games WHERE name = 'Never Committed'").fetchone() is None
@@ -0,0 +1,67 @@
+import pytest
+
+
+@pytest.fixture
+def fresh_standings(tg, monkeypatch):
+    monkeypatch.setattr(tg, 'standings_snapshot', None)
+    monkeypatch.setattr(tg, 'STANDINGS_MIN_INTERVAL', 0)
+    return tg
+
+
+def standing(body, category_id, selection):
+    category = next(c for c in body['categories'] if c['id'] == category_id)
+    return next((s for s in category['standings'] if s['selection'] == selection), None)
+
+
+def test_standings_are_admin_only_by_default(fresh_standings, client):
+    assert client.get('/standings').status_code == 403
+    assert client.get('/standings/1').status_code == 403
+
+
+def test_standings_etag_round_trip(fresh_standings, client, admin_client):
+    first = admin_client.get('/standings')
+    assert first.status_code == 200
+    etag, weak = first.get_etag()
+    assert etag and not weak
+    assert 'no-cache' in first.headers['Cache-Control']
+    assert 'private' in first.headers['Cache-Control']
+
+    cached = admin_client.get('/standings', headers={'If-None-Match': f'"{etag}"'})
+    assert cached.status_code == 304
+    assert cached.data == b''
+
+    # A new ballot moves the data version, so the next request rebuilds and revalidation misses
+    assert client.post('/submit', json={'name': 'standings voter', 'votes': {'1': ['Standings Game']}}).status_code == 200
+    fresh = admin_client.get('/standings', headers={'If-None-Match': f'"{etag}"'})
+    assert fresh.status_code == 200
+    assert fresh.get_etag()[0] != etag
+    assert standing(fresh.json, 1, 'Standings Game')['points'] >= 5
+
+
+def test_category_standings(fresh_standings, admin_client):
+    response = admin_client.get('/standings/1')
+    assert response.status_code == 200
+    assert response.json['category']['id'] == 1
+    assert admin_client.get('/standings/9999').status_code == 404
+
+
+def test_snapshot_is_reused_until_data_changes(fresh_standings, admin_client, monkeypatch):
+    builds = []
+    build = fresh_standings.build_standings_snapshot
+    monkeypatch.setattr(fresh_standings, 'build_standings_snapshot', lambda version: builds.append(version) or build(version))
+
+    for _ in range(3):
+        assert admin_client.get('/standings').status_code == 200
+    assert len(builds) == 1
+
+    fresh_standings.bump_data_version('votes')
+    assert admin_client.get('/standings').status_code == 200
+    assert len(builds) == 2
+
+
+def test_public_standings_are_cacheable(fresh_standings, client, monkeypatch):
+    monkeypatch.setattr(fresh_standings, 'PUBLIC_STANDINGS', True)
+    response = client.get('/standings')
+    assert response.status_code == 200
+    assert 'public' in response.headers['Cache-Control']
+    assert response.cache_control.max_age == 0
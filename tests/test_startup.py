@@ -0,0 +1,76 @@
+import sys
+
+import pytest
+
+import startup_budget
+
+
+@pytest.fixture
+def uninitialized(tg, monkeypatch):
+    calls = []
+    monkeypatch.setattr(tg, 'db_initialized', False)
+    monkeypatch.setattr(tg, 'init_db', lambda: calls.append('init_db'))
+    monkeypatch.setattr(tg, 'detect_search_backend', lambda: calls.append('detect_search_backend'))
+    return calls
+
+
+def test_first_request_initializes_once(tg, uninitialized, client, monkeypatch):
+    monkeypatch.setattr(tg, 'INIT_DB_ON_FIRST_REQUEST', True)
+    client.get('/categories')
+    client.get('/categories')
+    assert uninitialized == ['init_db']
+
+
+def test_workers_skip_schema_init_when_init_db_ran_at_deploy(tg, uninitialized, client, monkeypatch):
+    monkeypatch.setattr(tg, 'INIT_DB_ON_FIRST_REQUEST', False)
+    client.get('/categories')
+    assert uninitialized == ['detect_search_backend']
+
+
+def failing_once(calls, name):
+    def step():
+        calls.append(name)
+        if calls.count(name) == 1:
+            raise RuntimeError('database is starting up')
+    return step
+
+
+@pytest.mark.parametrize('init_on_first_request, step', [
+    (True, 'init_db'),
+    (False, 'detect_search_backend'),
+])
+def test_failed_init_is_retried_by_the_next_request(tg, uninitialized, client, monkeypatch,
+                                                    init_on_first_request, step):
+    monkeypatch.setattr(tg, 'INIT_DB_ON_FIRST_REQUEST', init_on_first_request)
+    monkeypatch.setattr(tg, step, failing_once(uninitialized, step))
+
+    response = client.get('/categories')
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '1'
+    assert tg.db_initialized is False
+
+    assert client.get('/categories').status_code == 200
+    assert client.get('/categories').status_code == 200
+    assert uninitialized == [step, step]
+    assert tg.db_initialized is True
+
+
+def test_failed_ballot_queue_start_is_retried(tg, uninitialized, client, monkeypatch):
+    monkeypatch.setattr(tg, 'INIT_DB_ON_FIRST_REQUEST', True)
+    monkeypatch.setattr(tg, 'BALLOT_QUEUE', True)
+    monkeypatch.setattr(tg, 'start_ballot_queue', failing_once(uninitialized, 'start_ballot_queue'))
+    assert client.get('/categories').status_code == 503
+    assert client.get('/categories').status_code == 200
+    assert uninitialized == ['init_db', 'start_ballot_queue', 'init_db', 'start_ballot_queue']
+
+
+def test_init_db_command(tg):
+    result = tg.app.test_cli_runner().invoke(args=['init-db'])
+    assert result.exit_code == 0
+    assert 'Database initialized' in result.output
+
+
+@pytest.mark.skipif(sys.platform == 'win32', reason='probe reads RSS through resource')
+def test_import_does_not_load_export_libraries(tmp_path):
+    result = startup_budget.probe(str(tmp_path))
+    assert result['modules'] == []
@@ -0,0 +1,68 @@
+def submit(client, name, votes):
+    return client.post('/submit', json={'name': name, 'votes': votes})
+
+
+def tallies(tg):
+    with tg.get_conn() as conn:
+        rows = conn.execute("""
+            SELECT category_id, item_id, points, voters, votes, rank_sum FROM vote_tallies
+        """).fetchall()
+    return sorted(tuple(row) for row in rows)
+
+
+def recomputed(tg):
+    with tg.get_conn() as conn:
+        rows = conn.execute("""
+            SELECT category_id, item_id, SUM(points), COUNT(DISTINCT voter_id), COUNT(*), SUM(rank)
+            FROM votes GROUP BY category_id, item_id
+        """).fetchall()
+    return sorted(tuple(row) for row in rows)
+
+
+def vote_id(tg, voter_name, category_id, rank):
+    with tg.get_conn() as conn:
+        return conn.execute("""
+            SELECT id FROM vote_details WHERE voter_name = ? AND category_id = ? AND rank = ?
+        """, (voter_name, category_id, rank)).fetchone()[0]
+
+
+def test_tallies_follow_submit_edit_and_delete(tg, client, admin_client):
+    assert submit(client, 'tally a', {'9': ['Tally One', 'Tally Two', 'Tally Three', '', ''], '1': ['Tally One']}).status_code == 200
+    assert submit(client, 'tally b', {'9': ['Tally Two', 'Tally One', 'Tally Four', 'Tally Five', ''], '1': ['Tally One']}).status_code == 200
+    assert tallies(tg) == recomputed(tg)
+
+    # Same selection, new rank
+    response = admin_client.put(f"/admin/vote/{vote_id(tg, 'tally a', 9, 3)}", json={'selection': 'Tally Three', 'rank': 4})
+    assert response.status_code == 200
+    assert tallies(tg) == recomputed(tg)
+
+    # New selection that the voter already ranked elsewhere - voters must not double count
+    response = admin_client.put(f"/admin/vote/{vote_id(tg, 'tally b', 9, 3)}", json={'selection': 'Tally Two', 'rank': 3})
+    assert response.status_code == 200
+    assert tallies(tg) == recomputed(tg)
+
+    assert admin_client.delete(f"/admin/vote/{vote_id(tg, 'tally b', 9, 1)}").status_code == 200
+    assert admin_client.delete(f"/admin/vote/{vote_id(tg, 'tally a', 1, 1)}").status_code == 200
+    assert tallies(tg) == recomputed(tg)
+
+
+def test_tallies_follow_title_merge(tg, client, admin_client):
+    assert submit(client, 'tally merge a', {'9': ['Tally Merge', 'Tally Other', 'Tally Third', '', '']}).status_code == 200
+    assert submit(client, 'tally merge b', {'9': ['TallyMerge', 'Tally Other', 'Tally Third', '', '']}).status_code == 200
+    response = admin_client.post('/admin/titles/merge', json={
+        'table': 'games', 'canonical': 'Tally Merge', 'variants': ['TallyMerge']
+    })
+    assert response.status_code == 200
+    assert tallies(tg) == recomputed(tg)
+
+
+def test_rebuild_tallies_command_recomputes_from_votes(tg, client):
+    assert submit(client, 'tally rebuild', {'1': ['Tally Rebuild']}).status_code == 200
+    with tg.get_conn() as conn:
+        conn.execute("UPDATE vote_tallies SET points = points + 100")
+        conn.commit()
+    assert tallies(tg) != recomputed(tg)
+
+    result = tg.app.test_cli_runner().invoke(args=['rebuild-tallies'])
+    assert result.exit_code == 0
+    assert tallies(tg) == recomputed(tg)
@@ -0,0 +1,129 @@
+import pytest
+
+
+def submit(client, name, votes):
+    return client.post('/submit', json={'name': name, 'votes': votes})
+
+
+def ballot_selections(tg, name):
+    with tg.get_conn() as conn:
+        rows = conn.execute("""
+            SELECT category_id, rank, selection FROM vote_details
+            WHERE voter_name = ? ORDER BY category_id, rank
+        """, (name,)).fetchall()
+    return [tuple(row) for row in rows]
+
+
+def game_names(tg, key):
+    with tg.get_conn() as conn:
+        rows = conn.execute("SELECT name FROM games").fetchall()
+    return sorted(name for (name,) in rows if tg.title_key(name) == key)
+
+
+def add_games(admin_client, *names):
+    for name in names:
+        assert admin_client.post('/admin/game', json={'name': name}).status_code == 200
+
+
+@pytest.mark.parametrize('spelling, key', [
+    ('Hades II', 'hades 2'),
+    ('hades 2', 'hades 2'),
+    ("Assassin's Creed: Shadows", 'assassins creed shadows'),
+    ('Mega Man X', 'mega man x'),
+    ('Final Fantasy VII', 'final fantasy 7'),
+])
+def test_title_key(tg, spelling, key):
+    assert tg.title_key(spelling) == key
+
+
+def test_ballot_uses_catalog_spelling(tg, client, admin_client):
+    add_games(admin_client, 'Spelling Saga II')
+    assert submit(client, 'spelling voter', {'1': ['spelling saga 2']}).status_code == 200
+    assert ballot_selections(tg, 'spelling voter') == [(1, 1, 'Spelling Saga II')]
+    assert game_names(tg, 'spelling saga 2') == ['Spelling Saga II']
+
+
+def test_ballot_rejects_one_catalog_title_in_two_ranks(client, admin_client):
+    add_games(admin_client, 'Rank Repeat II')
+    response = submit(client, 'rank repeat voter', {'9': ['Rank Repeat II', 'rank repeat 2', 'Arc Raiders', '', '']})
+    assert response.status_code == 400
+
+
+def test_merge_moves_votes_and_aliases_new_ballots(tg, client, admin_client):
+    add_games(admin_client, 'Merge Quest')
+    assert submit(client, 'merge a', {'1': ['Merge Quest']}).status_code == 200
+    # Typed while the catalog held only the canonical's distant spelling
+    assert submit(client, 'merge b', {'1': ['MergeQuest'], '2': ['MergeQuest']}).status_code == 200
+
+    duplicates = admin_client.get('/admin/titles/duplicates', query_string={'table': 'games'}).json['groups']
+    assert not any({g['name'] for g in group} == {'Merge Quest', 'MergeQuest'} for group in duplicates)
+
+    response = admin_client.post('/admin/titles/merge', json={
+        'table': 'games', 'canonical': 'Merge Quest', 'variants': ['MergeQuest']
+    })
+    assert response.status_code == 200
+    assert response.json['merged'] == ['MergeQuest']
+    assert response.json['aliases'] == ['mergequest']
+    assert response.json['votes_moved'] == 2
+    assert ballot_selections(tg, 'merge b') == [(1, 1, 'Merge Quest'), (2, 1, 'Merge Quest')]
+    assert game_names(tg, 'mergequest') == []
+
+    aliases = admin_client.get('/admin/titles/aliases', query_string={'table': 'games'}).json['aliases']
+    assert {'alias': 'mergequest', 'canonical': 'Merge Quest'} in aliases
+
+    # The merged spelling now resolves to the canonical title
+    assert submit(client, 'merge c', {'1': ['mergequest']}).status_code == 200
+    assert ballot_selections(tg, 'merge c') == [(1, 1, 'Merge Quest')]
+
+
+def test_duplicates_groups_spellings_most_voted_first(tg, client, admin_client):
+    add_games(admin_client, 'Twin Title II', 'twin title 2')
+    assert submit(client, 'twin voter', {'1': ['twin title 2']}).status_code == 200
+    groups = admin_client.get('/admin/titles/duplicates', query_string={'table': 'games'}).json['groups']
+    group = next(group for group in groups if group[0]['name'] in ('Twin Title II', 'twin title 2'))
+    assert [g['votes'] for g in group] == sorted((g['votes'] for g in group), reverse=True)
+    assert {g['name'] for g in group} == {'Twin Title II', 'twin title 2'}
+
+
+@pytest.mark.parametrize('payload', [
+    {'table': 'votes', 'canonical': 'A', 'variants': ['B']},
+    {'table': 'games', 'canonical': '', 'variants': ['B']},
+    {'table': 'games', 'canonical': 'A', 'variants': ['A']},
+])
+def test_merge_rejects_bad_requests(admin_client, payload):
+    assert admin_client.post('/admin/titles/merge', json=payload).status_code == 400
+
+
+def test_title_routes_are_admin_only(client):
+    assert client.get('/admin/titles/duplicates').status_code == 403
+    assert client.get('/admin/titles/aliases').status_code == 403
+    assert client.post('/admin/titles/merge', json={}).status_code == 403
+
+
+def test_ballot_dedupes_new_spellings_by_title_key(tg, client):
+    response = submit(client, 'dedupe voter', {'1': ['Brand New Quest II'], '2': ['brand new quest 2']})
+    assert response.status_code == 200
+    assert game_names(tg, 'brand new quest 2') == ['Brand New Quest II']
+    assert ballot_selections(tg, 'dedupe voter') == [(1, 1, 'Brand New Quest II'), (2, 1, 'Brand New Quest II')]
+
+
+def test_ballot_rejects_one_new_title_in_two_ranks(client):
+    response = submit(client, 'repeat voter', {'9': ['Sequel Saga II', 'sequel saga 2', 'Arc Raiders', '', '']})
+    assert response.status_code == 400
+
+
+def test_merge_survives_stale_index(tg, client, admin_client):
+    add_games(admin_client, 'Stale Canon', 'Stale Variant')
+    tg.get_autocomplete('games')
+    response = admin_client.post('/admin/titles/merge', json={
+        'table': 'games', 'canonical': 'Stale Canon', 'variants': ['Stale Variant']
+    })
+    assert response.status_code == 200
+
+    # A worker whose index predates the merge still parses the old spelling
+    with tg.get_conn() as conn:
+        catalog_rows = tg.insert_ballot(conn, 'stale voter', [(1, 1, 'Stale Variant', 5)], [('games', 'Stale Variant')])
+        conn.commit()
+    assert catalog_rows == [('games', 'Stale Canon')]
+    assert ballot_selections(tg, 'stale voter') == [(1, 1, 'Stale Canon')]
+    assert game_names(tg, 'stale variant') == []
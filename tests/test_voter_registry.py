@@ -0,0 +1,36 @@
+import sqlite3
+
+
+def other_worker(tg, sql, params=()):
+    """Commit through a second connection, as another gunicorn worker would"""
+    conn = sqlite3.connect(tg.DB_PATH)
+    conn.execute(sql, params)
+    conn.commit()
+    conn.close()
+
+
+def test_submit_registers_the_voter(tg, client):
+    assert client.post('/check-name', json={'name': 'registry submit'}).json['status'] == 'new'
+    assert client.post('/submit', json={'name': 'registry submit', 'votes': {'1': ['Registry Game']}}).status_code == 200
+    assert 'registry submit' in tg.voter_registry.names
+    assert client.post('/check-name', json={'name': 'registry submit'}).json['status'] == 'exists'
+
+
+def test_catches_up_with_other_workers(tg):
+    tg.voter_registry.has_voted('warm up')
+    other_worker(tg, "INSERT INTO ballots (voter_name) VALUES (?)", ('other worker voter',))
+    assert tg.voter_registry.has_voted('other worker voter')
+
+    # A name freed elsewhere is confirmed against ballots before being reported
+    other_worker(tg, "DELETE FROM ballots WHERE voter_name = ?", ('other worker voter',))
+    assert not tg.voter_registry.has_voted('other worker voter')
+    assert 'other worker voter' not in tg.voter_registry.names
+
+
+def test_negative_answers_skip_the_table_when_nothing_changed(tg, monkeypatch):
+    tg.voter_registry.has_voted('first unknown')
+    reads = []
+    fetch_all = tg.fetch_all
+    monkeypatch.setattr(tg, 'fetch_all', lambda conn, name, *args: reads.append(name) or fetch_all(conn, name, *args))
+    assert not tg.voter_registry.has_voted('second unknown')
+    assert reads == []